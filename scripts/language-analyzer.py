@@ -10,20 +10,40 @@
 3. 缺失的键（代码中使用但语言文件中未定义）
 4. 冗余的键（语言文件中定义但代码中未使用）
 5. i18n最佳实践合规性检查
+6. 跨插件重复语言条目的共享语言包提取方案 (--shared-bundle)
+7. 语言文件运行时开销评估与预算检查 (--footprint)
+8. 将语言文件编译为扁平化的快速加载产物 (compile)
+9. 根据主语言文件生成 LanguageKeys.kt (gen-keys)
+10. 基线模式：CI 中只报告基线之外的新问题 (--write-baseline / --baseline)
+11. 翻译表批量导出/导入，支持 CSV 和 XLIFF (export / import)
+12. 以参考语言为准同步插件的其他语言文件 (sync-locales)
+13. 基于 git 历史标注每个键最后的修改/引用时间 (--history)
+
+分析时会将 modules/* 作为核心层：插件使用的键先在插件语言文件中查找，
+再回退到核心层提供的键，与运行时的解析顺序一致。
 
 @author Gk0Wk
 @since 1.0.0
 """
 
 import re
+import csv
 import yaml
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import argparse
 import shutil
 from datetime import datetime
 import sys
 import os
+import time
+import hashlib
+import json
+import struct
+import subprocess
+import tempfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape, quoteattr
 
 # 设置Windows控制台编码为UTF-8
 if sys.platform == "win32":
@@ -44,19 +64,388 @@ class MultilineDumper(yaml.SafeDumper):
 MultilineDumper.add_representer(str, MultilineDumper.represent_str)
 
 
-@dataclass
+@dataclass(slots=True)
+class LangYamlNode:
+    """语言 YAML 文档中的一个映射键"""
+
+    path: str
+    line: int  # 键所在行号（从0开始）
+    end: int  # 值块结束行号（不含），包括所有子键
+    indent: int
+    is_leaf: bool
+
+
+class LangYamlDocument:
+    """基于行的语言 YAML 文档
+
+    语言文件只使用块映射和字面量块 (|)，按行解析即可得到每个键的位置。
+    修改值或插入键时只改写相关行，保留原有的键顺序、注释和引号风格。
+    """
+
+    KEY_PATTERN = re.compile(r"""^(\s*)([^\s'"#][^:]*?|'[^']*'|"[^"]*")\s*:(?:\s+(.*))?$""")
+
+    def __init__(self, text: str):
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        self.lines = text.splitlines()
+        self.indent_step = 2
+        self.nodes = self._index()
+
+    def _index(self) -> dict[str, LangYamlNode]:
+        """一次遍历建立 键路径 → 节点 索引"""
+        nodes: dict[str, LangYamlNode] = {}
+        stack: list[LangYamlNode] = []
+        last_content_line = -1
+        step_detected = False
+
+        def close(node: LangYamlNode):
+            node.end = last_content_line + 1
+
+        for index, line in enumerate(self.lines):
+            stripped = line.strip()
+            if not stripped:
+                continue
+
+            indent = len(line) - len(line.lstrip(" "))
+
+            # 叶子值的续行（字面量块或多行纯量）
+            if stack and stack[-1].is_leaf and indent > stack[-1].indent:
+                last_content_line = index
+                continue
+
+            if stripped.startswith("#") or stripped == "---":
+                continue
+
+            match = self.KEY_PATTERN.match(line)
+            if not match:
+                last_content_line = index
+                continue
+
+            while stack and stack[-1].indent >= indent:
+                close(stack.pop())
+
+            # 以第一个子键的缩进作为文档的缩进宽度
+            if stack and not step_detected:
+                self.indent_step = indent - stack[-1].indent
+                step_detected = True
+
+            key = match.group(2).strip()
+            if key[:1] in ("'", '"'):
+                key = key[1:-1]
+            value = (match.group(3) or "").strip()
+            path = f"{stack[-1].path}.{key}" if stack else key
+
+            node = LangYamlNode(
+                path=path,
+                line=index,
+                end=index + 1,
+                indent=indent,
+                is_leaf=bool(value) and not value.startswith("#"),
+            )
+            nodes[path] = node
+            stack.append(node)
+            last_content_line = index
+
+        while stack:
+            close(stack.pop())
+
+        return nodes
+
+    @staticmethod
+    def render_value(value: str, indent: int) -> list[str]:
+        """渲染键后的值：返回 [同一行的值部分, 续行...]"""
+        if "\n" in value and not value.endswith("\n\n") and not value.startswith(" "):
+            header = "|" if value.endswith("\n") else "|-"
+            pad = " " * (indent + 2)
+            body = [f"{pad}{line}" if line else "" for line in value.rstrip("\n").split("\n")]
+            return [header] + body
+
+        dumped = yaml.dump(
+            value, Dumper=yaml.SafeDumper, allow_unicode=True, width=float("inf")
+        )
+        if dumped.endswith("\n...\n"):
+            dumped = dumped[: -len("\n...\n")]
+        return [dumped.rstrip("\n")]
+
+    @staticmethod
+    def trailing_comment(value: str) -> str:
+        """值文本末尾的行内注释（含前导空白，如 "   # 注释"），没有时返回空串
+
+        引号内的 # 不算注释；字面量块头 (| / >) 后的注释同样识别。
+        """
+        end = 0
+        if value[:1] == '"':
+            end = 1
+            while end < len(value) and value[end] != '"':
+                end += 2 if value[end] == "\\" else 1
+            end += 1
+        elif value[:1] == "'":
+            end = 1
+            while end < len(value):
+                if value[end] == "'":
+                    if value[end + 1:end + 2] != "'":
+                        break
+                    end += 1
+                end += 1
+            end += 1
+        match = re.compile(r"\s+#.*$").search(value, end)
+        return match.group(0) if match else ""
+
+    def _find_anchor(self, parts: list[str]) -> tuple[LangYamlNode | None, int]:
+        """找到最深的已存在父节点：(节点或None表示根, 其下第一个缺失片段的下标)"""
+        depth = len(parts) - 1
+        while depth > 0:
+            anchor = self.nodes.get(".".join(parts[:depth]))
+            if anchor is not None:
+                return anchor, depth
+            depth -= 1
+        return None, 0
+
+    def _render_tree(self, tree: dict, indent: int) -> list[str]:
+        """渲染待插入的嵌套键值树"""
+        out = []
+        pad = " " * indent
+        for key, value in tree.items():
+            if isinstance(value, dict):
+                out.append(f"{pad}{key}:")
+                out.extend(self._render_tree(value, indent + self.indent_step))
+            else:
+                rendered = self.render_value(value, indent)
+                out.append(f"{pad}{key}: {rendered[0]}")
+                out.extend(rendered[1:])
+        return out
+
+    def _rebuild(
+        self,
+        replacements: dict[int, tuple[int, list[str]]],
+        insertions: dict[int, dict[str, tuple[int, dict]]],
+    ):
+        """一次遍历应用所有替换和插入，然后重建索引
+
+        replacements: 起始行 → (结束行, 新行)
+        insertions: 插入行 → {父节点路径: (缩进, 待插入的嵌套树)}，按加入顺序输出
+        """
+        new_lines: list[str] = []
+        index = 0
+        total = len(self.lines)
+        while index <= total:
+            for indent, tree in insertions.get(index, {}).values():
+                new_lines.extend(self._render_tree(tree, indent))
+            if index == total:
+                break
+            if index in replacements:
+                end, replacement = replacements[index]
+                new_lines.extend(replacement)
+                index = end
+                continue
+            new_lines.append(self.lines[index])
+            index += 1
+
+        self.lines = new_lines
+        self.nodes = self._index()
+
+    @staticmethod
+    def _add_to_tree(tree: dict, parts: list[str], value: str) -> bool:
+        """将键路径片段加入嵌套树，路径与已有字符串值冲突时返回 False"""
+        for part in parts[:-1]:
+            child = tree.setdefault(part, {})
+            if not isinstance(child, dict):
+                return False
+            tree = child
+        tree[parts[-1]] = value
+        return True
+
+    def apply(self, values: dict[str, str]) -> tuple[int, int]:
+        """批量更新或插入键值，在一次重建中完成所有修改
+
+        已存在的叶子键原地替换值（保留该行末尾的 # 注释）；不存在的键插入到
+        最深的已存在父节点末尾，并按需创建中间层级。
+
+        Returns
+        -------
+        tuple[int, int]
+            (更新的键数, 插入的键数)
+        """
+        replacements: dict[int, tuple[int, list[str]]] = {}
+        insertions: dict[int, dict[str, tuple[int, dict]]] = {}
+        updated = 0
+        inserted = 0
+
+        for path, value in values.items():
+            node = self.nodes.get(path)
+            if node is not None:
+                if not node.is_leaf:
+                    print(f"警告: 键 {path} 是父节点，无法设置为字符串值，跳过")
+                    continue
+                match = self.KEY_PATTERN.match(self.lines[node.line])
+                key_part = match.group(1) + match.group(2)
+                comment = self.trailing_comment(match.group(3) or "")
+                rendered = self.render_value(value, node.indent)
+                replacements[node.line] = (
+                    node.end,
+                    [f"{key_part}: {rendered[0]}{comment}"] + rendered[1:],
+                )
+                updated += 1
+                continue
+
+            parts = path.split(".")
+            anchor, depth = self._find_anchor(parts)
+            if anchor is not None and anchor.is_leaf:
+                print(f"警告: 键 {path} 的父节点 {anchor.path} 是字符串值，跳过")
+                continue
+
+            at = anchor.end if anchor is not None else len(self.lines)
+            indent = anchor.indent + self.indent_step if anchor is not None else 0
+            anchor_path = anchor.path if anchor is not None else ""
+            _, tree = insertions.setdefault(at, {}).setdefault(anchor_path, (indent, {}))
+            if self._add_to_tree(tree, parts[depth:], value):
+                inserted += 1
+
+        self._rebuild(replacements, insertions)
+        return updated, inserted
+
+    def merge_from(
+        self, reference: dict[str, str], placeholder: str | None = None
+    ) -> tuple[list[str], list[str], list[str]]:
+        """将参考语言的键树合并到本文档
+
+        按参考语言的键顺序遍历一次，同时维护每个父节点下“上一个已出现的
+        兄弟节点”的结束行。缺失的键插入到该位置之后，使其结构位置与参考
+        语言一致；所有修改在一次重建中完成，整体为 O(n)。
+
+        Parameters
+        ----------
+        reference : dict[str, str]
+            参考语言按文件顺序排列的 键路径 → 值
+        placeholder : str | None
+            缺失键的占位值；为 None 时使用参考语言的值
+
+        Returns
+        -------
+        tuple[list[str], list[str], list[str]]
+            (插入的键, 参考语言中不存在的孤立键, 结构冲突的键)
+        """
+        insertions: dict[int, dict[str, tuple[int, dict]]] = {}
+        # 父节点路径 → 下一个子节点的插入行
+        cursor: dict[str, int] = {}
+        # 新建的中间节点路径 → 它所在的插入树
+        created: dict[str, dict] = {}
+        inserted: list[str] = []
+        conflicts: list[str] = []
+
+        for path, value in reference.items():
+            parts = path.split(".")
+            node = self.nodes.get(path)
+
+            if node is not None:
+                if not node.is_leaf:
+                    conflicts.append(path)
+                    continue
+                # 更新每一层父节点下的插入位置
+                for depth in range(1, len(parts) + 1):
+                    prefix_node = self.nodes.get(".".join(parts[:depth]))
+                    if prefix_node is not None:
+                        cursor[".".join(parts[: depth - 1])] = prefix_node.end
+                continue
+
+            fill = value if placeholder is None else placeholder
+
+            # 父节点已在本次合并中创建：直接加入其插入树
+            parent_path = ".".join(parts[:-1])
+            if parent_path in created:
+                created[parent_path][parts[-1]] = fill
+                inserted.append(path)
+                continue
+
+            anchor, depth = self._find_anchor(parts)
+            if anchor is not None and anchor.is_leaf:
+                conflicts.append(path)
+                continue
+
+            anchor_path = anchor.path if anchor is not None else ""
+            default_at = anchor.line + 1 if anchor is not None else 0
+            at = cursor.get(anchor_path, default_at)
+            indent = anchor.indent + self.indent_step if anchor is not None else 0
+
+            _, tree = insertions.setdefault(at, {}).setdefault(anchor_path, (indent, {}))
+            for index in range(depth, len(parts) - 1):
+                tree = tree.setdefault(parts[index], {})
+                created[".".join(parts[: index + 1])] = tree
+            tree[parts[-1]] = fill
+            inserted.append(path)
+
+        orphans = [
+            path
+            for path, node in self.nodes.items()
+            if node.is_leaf and path not in reference
+        ]
+
+        if insertions:
+            self._rebuild({}, insertions)
+        return inserted, orphans, conflicts
+
+    def text(self) -> str:
+        """以原文件的换行风格输出文档"""
+        return self.newline.join(self.lines) + self.newline if self.lines else ""
+
+
+@dataclass(slots=True)
 class LanguageAnalysisResult:
-    """语言分析结果"""
+    """语言分析结果
+
+    同一插件的所有语言文件共享同一个 used_keys 对象，键字符串均已驻留。
+    只保留计数模式下 used_keys/defined_keys 为空，数量记录在 *_count 中。
+    """
 
     plugin_name: str
     language_file: str
-    used_keys: set[str]
-    defined_keys: set[str]
-    missing_keys: set[str]
-    redundant_keys: set[str]
+    used_keys: frozenset[str]
+    defined_keys: frozenset[str]
+    missing_keys: frozenset[str]
+    redundant_keys: frozenset[str]
+    used_count: int | None = None
+    defined_count: int | None = None
 
+    def __post_init__(self):
+        if self.used_count is None:
+            self.used_count = len(self.used_keys)
+        if self.defined_count is None:
+            self.defined_count = len(self.defined_keys)
 
-@dataclass
+
+@dataclass(frozen=True)
+class CoreLayerIndex:
+    """modules/* 核心层的语言键索引（只读，所有插件的分析共享同一份）"""
+
+    modules: tuple[str, ...]
+    used_keys: frozenset[str]  # 框架代码中使用的键
+    defined_keys: dict[str, frozenset[str]]  # 语言 → 核心层语言文件中定义的键
+
+    def defined_for(self, locale: str | None) -> frozenset[str]:
+        """核心层为指定语言提供的键；locale 为 None 时返回所有语言的并集"""
+        if locale is not None:
+            return self.defined_keys.get(locale, frozenset())
+        return frozenset().union(*self.defined_keys.values())
+
+
+@dataclass(slots=True)
+class StructureViolation:
+    """LanguageKeys.kt 结构问题：指纹只使用 kind、location 和 subject，提示文本可以随意修改"""
+
+    kind: str  # STRUCTURE_* 之一
+    location: str = ""  # 问题所在文件（相对插件目录的名称），插件级问题为空
+    subject: str = ""  # 问题主体，如缺少的对象名或格式错误的常量值
+    detail: str = ""  # 只用于显示的附加信息（如异常文本），不参与指纹
+
+    @property
+    def message(self) -> str:
+        return STRUCTURE_MESSAGES[self.kind].format(subject=self.subject, detail=self.detail)
+
+    @property
+    def fingerprint_subject(self) -> str:
+        return f"{self.kind}:{self.subject}" if self.subject else self.kind
+
+
+@dataclass(slots=True)
 class I18nBestPracticesResult:
     """i18n最佳实践检查结果"""
 
@@ -66,12 +455,195 @@ class I18nBestPracticesResult:
     direct_template_usage: list[str]  # 直接使用<%xxx%>的文件
     best_practices_violations: list[str]  # 最佳实践违规项
     score: float  # 合规性评分 (0-100)
+    structure_violations: list[StructureViolation] = field(default_factory=list)
+
+
+@dataclass
+class SharedBundleEntry:
+    """可提取到共享语言包的重复条目"""
+
+    locale: str
+    key: str
+    value: str
+    sources: list[str]  # 定义了该条目的插件/模块
+
+    @property
+    def duplicate_count(self) -> int:
+        """移入共享包后可消除的副本数"""
+        return len(self.sources) - 1
+
+
+@dataclass
+class SharedBundlePlan:
+    """共享语言包提取方案"""
+
+    scanned_files: int
+    scanned_entries: int
+    entries: list[SharedBundleEntry]
+    saved_entries: int
+    saved_jar_bytes: int  # 未压缩的 YAML 字节数
+    saved_heap_bytes: int  # 估算的 JVM 堆内存
+
+
+@dataclass
+class LanguageFootprint:
+    """语言文件的运行时开销"""
+
+    plugin_name: str
+    language_file: str
+    size_bytes: int
+    key_count: int
+    max_depth: int
+    multiline_values: int
+    long_values: int
+    parse_ms: float  # 使用当前加载器 (yaml.safe_load) 的解析耗时
+    retained_bytes: int  # 解析结果的 Python 对象大小，作为解析开销的参考
+
+
+@dataclass
+class FootprintBudget:
+    """单个插件语言包的开销预算（None 表示不限制）"""
+
+    max_bytes: int | None = None
+    max_keys: int | None = None
+    max_depth: int | None = None
+    max_parse_ms: float | None = None
+
+
+# 编译产物格式
+COMPILED_LANG_VERSION = 2  # 2: .properties 改为 ASCII + \uXXXX 转义
+COMPILED_LANG_MAGIC = b"NNLG"  # 二进制格式文件头
+COMPILE_MANIFEST_NAME = ".lang-compile-manifest.json"
+COMPILE_FORMATS = {"properties": ".properties", "binary": ".lang.bin"}
+
+
+# LanguageKeys.kt 生成：YAML 顶层节点 → 五层架构对象
+LANGUAGE_KEYS_LAYERS = {
+    "core": "Core",
+    "commands": "Commands",
+    "gui": "Gui",
+    "events": "Events",
+    "log": "Log",
+    "logger": "Log",
+}
+
+# 生成文件的标记：只有带此标记的 LanguageKeys.kt 才会被覆盖，手写文件需显式 --adopt
+LANGUAGE_KEYS_GENERATED_MARKER = "本文件由 scripts/language-analyzer.py gen-keys"
+LANGUAGE_KEYS_OBJECT_PATTERN = re.compile(r"^\s*(?:data\s+)?object\s+(\w+)\s*\{")
+LANGUAGE_KEYS_CONST_PATTERN = re.compile(r'^\s*const\s+val\s+(\w+)\s*=\s*"<%([^"%]+)%>"')
+
+# 生成顺序及分层注释（未映射的顶层节点归入业务领域层）
+LANGUAGE_KEYS_LAYER_BANNERS = [
+    ("Core", "核心系统层 (Core System Layer)"),
+    ("Commands", "命令系统层 (Command System Layer)"),
+    ("Gui", "图形界面层 (GUI Layer)"),
+    ("Events", "业务领域层 (Business Domain Layer)"),
+    ("Log", "日志系统层 (Logging Layer)"),
+]
+
+
+# 代码中的字符串字面量（保留）和注释（去掉），用于只统计真正参与运行的键
+CODE_COMMENT_PATTERN = re.compile(
+    r'''("""[\s\S]*?"""|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')|//[^\n]*|/\*[\s\S]*?\*/'''
+)
+
+
+# 基线文件格式版本（2: 结构问题的指纹改为基于问题类型，与提示文本无关）
+BASELINE_VERSION = 2
+
+# 问题类型（用于生成基线指纹）
+FINDING_MISSING_KEY = "missing-key"
+FINDING_REDUNDANT_KEY = "redundant-key"
+FINDING_DIRECT_TEMPLATE = "direct-template"
+FINDING_STRUCTURE = "structure"
+
+# LanguageKeys.kt 结构问题的类型及提示文本
+STRUCTURE_MISSING_FILE = "missing-file"
+STRUCTURE_UNUSED_FILE = "unused-file"
+STRUCTURE_MISSING_LAYER_DOC = "missing-layer-doc"
+STRUCTURE_NOT_OBJECT = "not-object"
+STRUCTURE_MISSING_LAYER = "missing-layer"
+STRUCTURE_CONST_FORMAT = "const-format"
+STRUCTURE_READ_ERROR = "read-error"
+STRUCTURE_MESSAGES = {
+    STRUCTURE_MISSING_FILE: "缺少 i18n/LanguageKeys.kt 文件",
+    STRUCTURE_UNUSED_FILE: "有 LanguageKeys.kt 文件但没有在代码中使用",
+    STRUCTURE_MISSING_LAYER_DOC: "LanguageKeys.kt 缺少五层架构分类说明",
+    STRUCTURE_NOT_OBJECT: "LanguageKeys.kt 应该使用 object LanguageKeys 声明",
+    STRUCTURE_MISSING_LAYER: "LanguageKeys.kt 缺少 {subject} 对象分类",
+    STRUCTURE_CONST_FORMAT: "常量值 '{subject}' 应该使用 <%xxx%> 格式",
+    STRUCTURE_READ_ERROR: "读取 {subject} 文件失败: {detail}",
+}
+
+
+def finding_fingerprint(kind: str, plugin_name: str, location: str, subject: str) -> str:
+    """生成问题的稳定指纹：与行号、输出顺序和平台路径分隔符无关"""
+    raw = "\x1f".join((kind, plugin_name, location.replace("\\", "/"), subject))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:20]
+
+
+# import 的 CSV 翻译表必需的列
+IMPORT_CSV_COLUMNS = ("plugin", "key", "target_locale", "target")
+
+# 键历史索引
+KEY_HISTORY_VERSION = 1
+KEY_HISTORY_PATHSPECS = [
+    ":(glob)plugins/*/src/main/resources/lang/*.yml",
+    ":(glob)plugins/*/src/main/resources/lang/*.yaml",
+    ":(glob)plugins/*/src/**/*.kt",
+    ":(glob)plugins/*/src/**/*.java",
+]
+# 临时 diff 驱动：YAML 以顶层键为“函数”，使 --function-context 输出完整的顶层节点，
+# 从而能还原嵌套键路径；代码文件每行都是“函数”，避免输出多余的上下文
+KEY_HISTORY_ATTRIBUTES = """\
+*.yml diff=nnlang
+*.yaml diff=nnlang
+*.kt diff=nnline
+*.java diff=nnline
+"""
+KEY_HISTORY_DIFF_CONFIG = [
+    "-c",
+    "diff.nnlang.xfuncname=^[^ \t#-][^:]*:",
+    "-c",
+    "diff.nnline.xfuncname=^.*$",
+]
+
+
+@dataclass(slots=True)
+class KeyHistoryEntry:
+    """键的历史：语言文件中最后一次新增/修改，以及代码中最后一次引用变化"""
+
+    lang_commit: str | None = None
+    lang_time: int | None = None
+    code_commit: str | None = None
+    code_time: int | None = None
+
+
+# JVM 字符串/映射内存估算常量（64位 JVM，开启压缩指针）
+JVM_STRING_OVERHEAD = 24 + 16  # String 对象头 + byte[] 数组头
+JVM_MAP_ENTRY_OVERHEAD = 32  # HashMap.Node
 
 
 class LanguageAnalyzer:
     """语言模板分析器"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        baseline: set[str] | None = None,
+        use_core_layer: bool = True,
+        counts_only: bool = False,
+    ):
+        # 基线中的问题指纹，命中的问题不会出现在结果和报告中
+        self.baseline = baseline or set()
+        self.suppressed_count = 0
+
+        # 是否将 modules/* 作为核心层参与键解析，索引按项目根目录缓存
+        self.use_core_layer = use_core_layer
+        self._core_layers: dict[Path, CoreLayerIndex] = {}
+
+        # 结果中只保留键数量和缺失/冗余差异，不保留完整的键集合
+        self.counts_only = counts_only
+
         # 语言模板匹配模式：<%path.path.key%>
         # 修正正则表达式，匹配字母、数字、下划线和点号
         self.template_pattern = re.compile(r"<%([a-zA-Z0-9_.]+)%>")
@@ -100,6 +672,18 @@ class LanguageAnalyzer:
             print("错误: 未找到 plugins 目录")
             return results, best_practices_results
 
+        # 核心层索引只构建一次，所有插件共享
+        core_layer = self.get_core_layer(project_root) if self.use_core_layer else None
+        if core_layer is not None:
+            provided = len(core_layer.defined_for(None))
+            if core_layer.used_keys or provided:
+                print(
+                    f"核心层: {len(core_layer.modules)} 个模块，使用 {len(core_layer.used_keys)} 个键，"
+                    f"提供 {provided} 个键"
+                )
+            else:
+                print(f"核心层: {len(core_layer.modules)} 个模块，未使用也未提供语言键")
+
         # 遍历每个插件
         for plugin_dir in plugins_dir.iterdir():
             if plugin_dir.is_dir() and (plugin_dir.name != "build"):
@@ -107,7 +691,7 @@ class LanguageAnalyzer:
                 if target_plugins and plugin_dir.name not in target_plugins:
                     continue
 
-                plugin_results = self._analyze_plugin(plugin_dir)
+                plugin_results = self._analyze_plugin(plugin_dir, core_layer)
                 results.extend(plugin_results)
 
                 # 进行i18n最佳实践检查
@@ -116,12 +700,72 @@ class LanguageAnalyzer:
 
         return results, best_practices_results
 
+    def get_core_layer(self, project_root: Path) -> CoreLayerIndex:
+        """获取（必要时构建）modules/* 核心层的键索引"""
+        root = project_root.resolve()
+        if root not in self._core_layers:
+            self._core_layers[root] = self._build_core_layer(root)
+        return self._core_layers[root]
+
+    def _build_core_layer(self, project_root: Path) -> CoreLayerIndex:
+        """扫描 modules/* 的主代码和 lang 资源，建立核心层索引"""
+        modules_dir = project_root / "modules"
+        module_dirs = (
+            sorted(d for d in modules_dir.iterdir() if d.is_dir() and d.name != "build")
+            if modules_dir.is_dir()
+            else []
+        )
+
+        used_keys: set[str] = set()
+        defined_keys: dict[str, set[str]] = {}
+        for module_dir in module_dirs:
+            # 只扫描 src/main 且忽略注释，测试代码和文档注释中的示例键
+            # （如 <%player%>）不参与运行时解析
+            used_keys |= self._find_used_keys(module_dir, ("src/main",), strip_comments=True)
+
+            lang_dir = module_dir / "src" / "main" / "resources" / "lang"
+            for lang_file in self._iter_lang_files(lang_dir):
+                defined_keys.setdefault(lang_file.stem, set()).update(
+                    self._parse_lang_file(lang_file)
+                )
+
+        return CoreLayerIndex(
+            modules=tuple(d.name for d in module_dirs),
+            used_keys=frozenset(used_keys),
+            defined_keys={
+                locale: frozenset(keys) for locale, keys in defined_keys.items()
+            },
+        )
+
+    def _is_baselined(
+        self, kind: str, plugin_name: str, location: str, subject: str
+    ) -> bool:
+        """判断问题是否已记录在基线中（命中时计入被忽略数量）"""
+        if not self.baseline:
+            return False
+        if finding_fingerprint(kind, plugin_name, location, subject) in self.baseline:
+            self.suppressed_count += 1
+            return True
+        return False
+
     def _check_i18n_best_practices(self, plugin_dir: Path) -> I18nBestPracticesResult:
         """检查i18n最佳实践合规性"""
         plugin_name = plugin_dir.name
         violations = []
+        structure_violations: list[StructureViolation] = []
         score = 100.0
 
+        def add_structure_violation(violation: StructureViolation, penalty: float) -> bool:
+            nonlocal score
+            if self._is_baselined(
+                FINDING_STRUCTURE, plugin_name, violation.location, violation.fingerprint_subject
+            ):
+                return False
+            structure_violations.append(violation)
+            violations.append(violation.message)
+            score -= penalty
+            return True
+
         # 检查是否有LanguageKeys.kt文件
         language_keys_file = None
         i18n_dir = plugin_dir / "src" / "main" / "kotlin"
@@ -131,11 +775,14 @@ class LanguageAnalyzer:
         if has_language_keys_file:
             language_keys_file = str(language_keys_files[0])
         else:
-            violations.append("缺少 i18n/LanguageKeys.kt 文件")
-            score -= 40
+            add_structure_violation(StructureViolation(STRUCTURE_MISSING_FILE), 40)
 
         # 检查直接使用<%xxx%>的文件
-        direct_template_files = self._find_direct_template_usage(plugin_dir)
+        direct_template_files = [
+            file
+            for file in self._find_direct_template_usage(plugin_dir)
+            if not self._is_baselined(FINDING_DIRECT_TEMPLATE, plugin_name, file, "")
+        ]
         if direct_template_files:
             violations.append(
                 f"发现 {len(direct_template_files)} 个文件直接使用 <%xxx%> 而不是 LanguageKeys 常量"
@@ -146,16 +793,14 @@ class LanguageAnalyzer:
         if has_language_keys_file:
             language_keys_usage = self._check_language_keys_usage(plugin_dir)
             if not language_keys_usage:
-                violations.append("有 LanguageKeys.kt 文件但没有在代码中使用")
-                score -= 20
+                add_structure_violation(StructureViolation(STRUCTURE_UNUSED_FILE), 20)
 
         # 检查LanguageKeys文件的结构规范
         if has_language_keys_file:
-            structure_violations = self._check_language_keys_structure(
-                Path(language_keys_file)
-            )
-            violations.extend(structure_violations)
-            score -= len(structure_violations) * 5
+            for violation in self._check_language_keys_structure(
+                Path(language_keys_file), plugin_dir
+            ):
+                add_structure_violation(violation, 5)
 
         # 确保评分不小于0
         score = max(0, score)
@@ -167,6 +812,7 @@ class LanguageAnalyzer:
             direct_template_usage=direct_template_files,
             best_practices_violations=violations,
             score=score,
+            structure_violations=structure_violations,
         )
 
     def _find_direct_template_usage(self, plugin_dir: Path) -> list[str]:
@@ -246,192 +892,1775 @@ class LanguageAnalyzer:
             return traverse_code_files(src_dir)
         return False
 
-    def _check_language_keys_structure(self, language_keys_file: Path) -> list[str]:
+    def _check_language_keys_structure(
+        self, language_keys_file: Path, plugin_dir: Path
+    ) -> list[StructureViolation]:
         """检查LanguageKeys文件的结构规范"""
         violations = []
+        location = language_keys_file.name
 
         try:
             with open(language_keys_file, "r", encoding="utf-8", errors="ignore") as f:
                 content = f.read()
 
-            # 检查是否有五层架构注释
-            if "五层架构" not in content:
-                violations.append("LanguageKeys.kt 缺少五层架构分类说明")
+            # 检查是否有五层架构注释
+            if "五层架构" not in content:
+                violations.append(StructureViolation(STRUCTURE_MISSING_LAYER_DOC, location))
+
+            # 检查是否有object LanguageKeys声明
+            if "object LanguageKeys" not in content:
+                violations.append(StructureViolation(STRUCTURE_NOT_OBJECT, location))
+
+            # 检查是否有标准的分层对象
+            expected_objects = ["Core", "Commands", "Gui", "Events", "Log"]
+            for obj in expected_objects:
+                if f"object {obj}" not in content:
+                    violations.append(StructureViolation(STRUCTURE_MISSING_LAYER, location, obj))
+
+            # 检查常量值格式
+            const_pattern = re.compile(r'const val \w+ = "(.*?)"')
+            const_matches = const_pattern.findall(content)
+
+            for const_value in const_matches:
+                if const_value.startswith("<%") and const_value.endswith("%>"):
+                    continue  # 正确的格式
+                elif const_value == "Reloading ExternalBook plugin...":
+                    continue  # 允许的英文常量
+                else:
+                    violations.append(
+                        StructureViolation(STRUCTURE_CONST_FORMAT, location, const_value)
+                    )
+
+        except Exception as e:
+            # 异常文本因平台和运行而异，只用文件路径作为指纹主体
+            violations.append(
+                StructureViolation(
+                    STRUCTURE_READ_ERROR,
+                    location,
+                    language_keys_file.relative_to(plugin_dir).as_posix(),
+                    str(e),
+                )
+            )
+
+        return violations
+
+    def _analyze_plugin(
+        self, plugin_dir: Path, core_layer: CoreLayerIndex | None = None
+    ) -> list[LanguageAnalysisResult]:
+        """分析单个插件
+
+        键按“插件语言文件优先，其次核心层”解析：核心层提供的键不算缺失，
+        核心层代码使用的键也不算冗余。
+        """
+        results = []
+        plugin_name = plugin_dir.name
+
+        # 查找代码文件中使用的语言键（同一插件的所有语言文件共享）
+        used_keys = frozenset(self._find_used_keys(plugin_dir))
+        # print(f"在代码中找到 {len(used_keys)} 个语言键")
+
+        # if used_keys:
+        #     print(f"使用的键: {', '.join(sorted(used_keys))}")
+
+        # 查找语言文件
+        lang_dir = plugin_dir / "src" / "main" / "resources" / "lang"
+        if not lang_dir.exists() or not lang_dir.is_dir():
+            print(f"警告: 未找到语言文件目录 {lang_dir}")
+            if used_keys:
+                results.append(
+                    self._make_result(
+                        plugin_name,
+                        "无语言文件",
+                        used_keys,
+                        frozenset(),
+                        self._filter_baselined_keys(
+                            FINDING_MISSING_KEY,
+                            plugin_name,
+                            "无语言文件",
+                            used_keys - core_layer.defined_for(None)
+                            if core_layer
+                            else used_keys,
+                        ),
+                        frozenset(),
+                    )
+                )
+            return results
+
+        # 分析每个语言文件
+        for lang_file in self._iter_lang_files(lang_dir):
+            print(f"\n分析语言文件: {lang_file.name}")
+
+            defined_keys = frozenset(self._parse_lang_file(lang_file))
+            print(f"语言文件中定义了 {len(defined_keys)} 个键")
+
+            missing_keys = used_keys - defined_keys
+            redundant_keys = defined_keys - used_keys
+            if core_layer is not None:
+                missing_keys -= core_layer.defined_for(lang_file.stem)
+                redundant_keys -= core_layer.used_keys
+
+            missing_keys = self._filter_baselined_keys(
+                FINDING_MISSING_KEY, plugin_name, lang_file.name, missing_keys
+            )
+            redundant_keys = self._filter_baselined_keys(
+                FINDING_REDUNDANT_KEY, plugin_name, lang_file.name, redundant_keys
+            )
+
+            print(f"缺失的键: {len(missing_keys)} 个")
+            if missing_keys:
+                for key in sorted(missing_keys):
+                    print(f"  - {key}")
+
+            print(f"冗余的键: {len(redundant_keys)} 个")
+            if redundant_keys:
+                for key in sorted(redundant_keys):
+                    print(f"  - {key}")
+
+            results.append(
+                self._make_result(
+                    plugin_name,
+                    lang_file.name,
+                    used_keys,
+                    defined_keys,
+                    missing_keys,
+                    redundant_keys,
+                )
+            )
+
+        return results
+
+    def _make_result(
+        self,
+        plugin_name: str,
+        language_file: str,
+        used_keys: frozenset[str],
+        defined_keys: frozenset[str],
+        missing_keys: frozenset[str],
+        redundant_keys: frozenset[str],
+    ) -> LanguageAnalysisResult:
+        """创建分析结果；只保留计数模式下丢弃完整的键集合"""
+        if self.counts_only:
+            return LanguageAnalysisResult(
+                plugin_name=plugin_name,
+                language_file=language_file,
+                used_keys=frozenset(),
+                defined_keys=frozenset(),
+                missing_keys=missing_keys,
+                redundant_keys=redundant_keys,
+                used_count=len(used_keys),
+                defined_count=len(defined_keys),
+            )
+        return LanguageAnalysisResult(
+            plugin_name=plugin_name,
+            language_file=language_file,
+            used_keys=used_keys,
+            defined_keys=defined_keys,
+            missing_keys=missing_keys,
+            redundant_keys=redundant_keys,
+        )
+
+    def _filter_baselined_keys(
+        self, kind: str, plugin_name: str, language_file: str, keys: frozenset[str]
+    ) -> frozenset[str]:
+        """去掉已记录在基线中的缺失/冗余键"""
+        if not self.baseline:
+            return keys
+        return frozenset(
+            key
+            for key in keys
+            if not self._is_baselined(kind, plugin_name, language_file, key)
+        )
+
+    def _iter_lang_files(self, lang_dir: Path) -> list[Path]:
+        """列出语言目录中需要分析的语言文件（跳过隐藏文件和备份文件）"""
+        if not lang_dir.exists() or not lang_dir.is_dir():
+            return []
+
+        return [
+            lang_file
+            for lang_file in lang_dir.iterdir()
+            if lang_file.is_file()
+            and lang_file.suffix.lower() in self.lang_extensions
+            and not lang_file.name.startswith(".")
+            and "backup" not in lang_file.name.lower()
+        ]
+
+    def _find_used_keys(
+        self,
+        plugin_dir: Path,
+        source_dirs: tuple[str, ...] = ("src", "bin"),
+        strip_comments: bool = False,
+    ) -> set[str]:
+        """在插件的所有代码文件中查找使用的语言键（strip_comments 时忽略注释中的键）"""
+        used_keys = set()
+
+        def traverse_code_files(directory: Path):
+            """递归遍历代码文件"""
+            try:
+                for item in directory.iterdir():
+                    if item.is_dir():
+                        traverse_code_files(item)
+                    elif item.is_file() and item.suffix.lower() in self.code_extensions:
+                        keys = self._extract_keys_from_file(item, strip_comments)
+                        used_keys.update(keys)
+            except PermissionError:
+                print(f"警告: 无权限访问目录 {directory}")
+
+        # 默认从 src 目录开始遍历，也检查 bin 目录（编译后的代码）
+        for source_dir in source_dirs:
+            directory = plugin_dir / source_dir
+            if directory.exists():
+                traverse_code_files(directory)
+
+        # 去掉一些在注释中可能出现的键
+        used_keys -= {
+            "key",
+            "...",
+            "..",
+            "xxx",
+            "xx",
+        }
+
+        return used_keys
+
+    def _extract_keys_from_file(self, file_path: Path, strip_comments: bool = False) -> set[str]:
+        """从单个代码文件中提取语言键"""
+        keys = set()
+
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                content = f.read()
+                if strip_comments:
+                    content = CODE_COMMENT_PATTERN.sub(lambda m: m.group(1) or "", content)
+                matches = self.template_pattern.findall(content)
+                keys.update(map(sys.intern, matches))
+        except Exception as e:
+            print(f"警告: 读取文件失败 {file_path}: {e}")
+
+        return keys
+
+    def _parse_lang_file(self, file_path: Path) -> set[str]:
+        """解析语言文件，提取所有定义的键"""
+        keys = set()
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+                if data:
+                    self._extract_keys_from_yaml(data, "", keys)
+        except Exception as e:
+            print(f"警告: 解析语言文件失败 {file_path}: {e}")
+
+        return keys
+
+    def _extract_keys_from_yaml(self, data, prefix: str, keys: set[str]):
+        """递归提取 YAML 中的所有键路径"""
+        if isinstance(data, dict):
+            for key, value in data.items():
+                key_str = str(key)
+                full_key = key_str if not prefix else f"{prefix}.{key_str}"
+
+                if isinstance(value, (dict, list)):
+                    self._extract_keys_from_yaml(value, full_key, keys)
+                else:
+                    keys.add(sys.intern(full_key))
+        elif isinstance(data, list):
+            for index, value in enumerate(data):
+                self._extract_keys_from_yaml(value, f"{prefix}[{index}]", keys)
+
+    def _parse_lang_entries(
+        self, file_path: Path, skipped: list[str] | None = None, strict: bool = False
+    ) -> dict[str, str]:
+        """解析语言文件，按文件顺序提取所有 键路径 → 值
+
+        列表中的字符串值没有可按键寻址的路径，不会出现在结果中；传入
+        skipped 时将其路径（如 help.lines[0]）追加到 skipped。解析失败时
+        打印警告并返回空结果；strict 为 True 时改为抛出异常。
+        """
+        entries: dict[str, str] = {}
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+                if data:
+                    self._extract_entries_from_yaml(data, "", entries, skipped)
+        except Exception as e:
+            if strict:
+                raise
+            print(f"警告: 解析语言文件失败 {file_path}: {e}")
+
+        return entries
+
+    def _extract_entries_from_yaml(
+        self, data, prefix: str, entries: dict[str, str], skipped: list[str] | None = None
+    ):
+        """递归提取 YAML 中的所有键路径及其值（列表中的标量值记入 skipped）"""
+        if isinstance(data, dict):
+            for key, value in data.items():
+                key_str = str(key)
+                full_key = key_str if not prefix else f"{prefix}.{key_str}"
+
+                if isinstance(value, (dict, list)):
+                    self._extract_entries_from_yaml(value, full_key, entries, skipped)
+                else:
+                    entries[full_key] = "" if value is None else str(value)
+        elif isinstance(data, list):
+            for index, value in enumerate(data):
+                if isinstance(value, (dict, list)):
+                    self._extract_entries_from_yaml(value, f"{prefix}[{index}]", entries, skipped)
+                elif skipped is not None:
+                    skipped.append(f"{prefix}[{index}]")
+
+    def _collect_lang_sources(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        include_core: bool = True,
+    ) -> list[tuple[str, Path]]:
+        """收集所有插件及（include_core 时）modules/i18n 核心的语言文件：(来源名, 文件路径)"""
+        sources: list[tuple[str, Path]] = []
+
+        core_resources = project_root / "modules" / "i18n" / "src" / "main" / "resources"
+        core_dirs = (core_resources / "lang", core_resources / "examples") if include_core else ()
+        for core_dir in core_dirs:
+            for lang_file in sorted(self._iter_lang_files(core_dir)):
+                sources.append(("modules/i18n", lang_file))
+
+        for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+            lang_dir = plugin_dir / "src" / "main" / "resources" / "lang"
+            for lang_file in sorted(self._iter_lang_files(lang_dir)):
+                sources.append((plugin_dir.name, lang_file))
+
+        return sources
+
+    def _iter_plugin_dirs(
+        self, project_root: Path, target_plugins: list[str] | None = None
+    ) -> list[Path]:
+        """按名称顺序列出 plugins 目录下需要处理的插件目录"""
+        plugins_dir = project_root / "plugins"
+        if not plugins_dir.exists() or not plugins_dir.is_dir():
+            return []
+
+        return [
+            plugin_dir
+            for plugin_dir in sorted(plugins_dir.iterdir())
+            if plugin_dir.is_dir()
+            and plugin_dir.name != "build"
+            and (not target_plugins or plugin_dir.name in target_plugins)
+        ]
+
+    def plan_shared_bundle(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        min_sources: int = 2,
+    ) -> SharedBundlePlan:
+        """规划共享语言包：找出多个插件/核心中完全相同的 键/值 对
+
+        所有条目按 (语言, 键, 值) 放入哈希桶，一次遍历即可完成分组，
+        耗时与语言条目总数近似线性。
+        """
+        sources = self._collect_lang_sources(project_root, target_plugins)
+
+        # (locale, key, value) → 定义该条目的来源列表
+        buckets: dict[tuple[str, str, str], list[str]] = {}
+        scanned_entries = 0
+
+        for source_name, lang_file in sources:
+            locale = lang_file.stem
+            entries = self._parse_lang_entries(lang_file)
+            scanned_entries += len(entries)
+            for key, value in entries.items():
+                holders = buckets.setdefault((locale, key, value), [])
+                if not holders or holders[-1] != source_name:
+                    holders.append(source_name)
+
+        shared_entries: list[SharedBundleEntry] = []
+        saved_entries = 0
+        saved_jar_bytes = 0
+        saved_heap_bytes = 0
+
+        for (locale, key, value), holders in buckets.items():
+            if len(holders) < min_sources:
+                continue
+
+            entry = SharedBundleEntry(
+                locale=locale, key=key, value=value, sources=holders
+            )
+            shared_entries.append(entry)
+
+            duplicates = entry.duplicate_count
+            saved_entries += duplicates
+            saved_jar_bytes += duplicates * self._estimate_yaml_bytes(key, value)
+            saved_heap_bytes += duplicates * self._estimate_jvm_entry_bytes(key, value)
+
+        shared_entries.sort(key=lambda e: (e.locale, e.key))
+
+        return SharedBundlePlan(
+            scanned_files=len(sources),
+            scanned_entries=scanned_entries,
+            entries=shared_entries,
+            saved_entries=saved_entries,
+            saved_jar_bytes=saved_jar_bytes,
+            saved_heap_bytes=saved_heap_bytes,
+        )
+
+    @staticmethod
+    def _estimate_yaml_bytes(key: str, value: str) -> int:
+        """估算条目在 YAML 文件中占用的字节数（按扁平 `key: value` 行计算）"""
+        return len(key.encode("utf-8")) + len(value.encode("utf-8")) + 3
+
+    @staticmethod
+    def _estimate_jvm_string_bytes(text: str) -> int:
+        """估算 JVM 中一个 String 的内存（Latin-1 紧凑字符串或 UTF-16）"""
+        per_char = 1 if all(ord(ch) < 256 for ch in text) else 2
+        return JVM_STRING_OVERHEAD + per_char * len(text)
+
+    def _estimate_jvm_entry_bytes(self, key: str, value: str) -> int:
+        """估算一个已加载语言条目在 JVM 堆中的内存"""
+        return (
+            self._estimate_jvm_string_bytes(key)
+            + self._estimate_jvm_string_bytes(value)
+            + JVM_MAP_ENTRY_OVERHEAD
+        )
+
+    def write_shared_bundle(self, plan: SharedBundlePlan, output_dir: Path):
+        """将共享语言包方案按语言写出为 YAML 文件"""
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # 同一个键在不同插件中可能有多个共享值，优先保留共享来源最多的那个；
+        # 一个键是另一个键的前缀（如 a.b 与 a.b.c）时无法同时写入嵌套 YAML，
+        # 同样保留先写入的（共享来源更多的）键并报告被跳过的键
+        by_locale: dict[str, dict] = {}
+        seen: set[tuple[str, str]] = set()
+        branches: dict[tuple[str, str], str] = {}  # 已写入键的上级路径 → 该键
+        for entry in sorted(plan.entries, key=lambda e: -e.duplicate_count):
+            if (entry.locale, entry.key) in seen:
+                print(f"警告: {entry.locale} 中的键 {entry.key} 存在多个共享值，已跳过 {entry.value!r}")
+                continue
+
+            parts = entry.key.split(".")
+            prefixes = [".".join(parts[:i]) for i in range(1, len(parts))]
+            conflict = next(
+                (prefix for prefix in prefixes if (entry.locale, prefix) in seen), None
+            )
+            if conflict is None:
+                conflict = branches.get((entry.locale, entry.key))
+            if conflict is not None:
+                print(
+                    f"警告: {entry.locale} 中的键 {entry.key} 与 {conflict} 存在前缀冲突，"
+                    "已从共享语言包中跳过"
+                )
+                continue
+            seen.add((entry.locale, entry.key))
+            for prefix in prefixes:
+                branches.setdefault((entry.locale, prefix), entry.key)
+
+            current = by_locale.setdefault(entry.locale, {})
+            for part in parts[:-1]:
+                current = current.setdefault(part, {})
+            current[parts[-1]] = entry.value
+
+        # 输出按键排序，保证方案可复现
+        by_locale = {
+            locale: self._sort_tree(tree) for locale, tree in by_locale.items()
+        }
+
+        for locale, tree in sorted(by_locale.items()):
+            bundle_file = output_dir / f"{locale}.yml"
+            with open(bundle_file, "w", encoding="utf-8") as f:
+                yaml.dump(
+                    tree,
+                    f,
+                    Dumper=MultilineDumper,
+                    default_flow_style=False,
+                    allow_unicode=True,
+                    sort_keys=False,
+                    indent=2,
+                    width=120,
+                )
+            print(f"已写出共享语言包: {bundle_file}")
+
+    def _sort_tree(self, tree: dict) -> dict:
+        """递归按键排序嵌套字典"""
+        return {
+            key: self._sort_tree(value) if isinstance(value, dict) else value
+            for key, value in sorted(tree.items())
+        }
+
+    def generate_shared_bundle_report(self, plan: SharedBundlePlan):
+        """生成共享语言包提取报告"""
+        print("\n" + "=" * 80)
+        print("共享语言包提取方案")
+        print("=" * 80)
+
+        print(f"扫描的语言文件数: {plan.scanned_files}")
+        print(f"扫描的语言条目数: {plan.scanned_entries}")
+
+        if not plan.entries:
+            print("[OK] 没有发现跨插件重复的语言条目")
+            print("=" * 80)
+            return
+
+        by_locale: dict[str, list[SharedBundleEntry]] = {}
+        for entry in plan.entries:
+            by_locale.setdefault(entry.locale, []).append(entry)
+
+        for locale, entries in sorted(by_locale.items()):
+            print(f"\n语言: {locale} ({len(entries)} 个可共享条目)")
+            print("-" * 60)
+            for entry in sorted(entries, key=lambda e: (-e.duplicate_count, e.key)):
+                print(f"  {entry.key} = {entry.value!r}")
+                print(f"    来源 ({len(entry.sources)}): {', '.join(entry.sources)}")
+
+        print("\n" + "=" * 80)
+        print("预计收益:")
+        print(f"  可共享条目数: {len(plan.entries)}")
+        print(f"  可消除的重复条目数: {plan.saved_entries}")
+        print(f"  JAR 体积节省 (未压缩): {plan.saved_jar_bytes / 1024:.1f} KB")
+        print(f"  服务器堆内存节省 (估算): {plan.saved_heap_bytes / 1024:.1f} KB")
+        print("=" * 80)
+
+    def measure_footprint(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        long_value_threshold: int = 200,
+    ) -> list[LanguageFootprint]:
+        """统计每个插件语言文件的大小、键数量、嵌套深度及实际解析耗时
+
+        只统计插件打包的语言包；modules/i18n 的示例文件不是插件，不计入
+        统计和预算。
+        """
+        footprints = []
+
+        for source_name, lang_file in self._collect_lang_sources(
+            project_root, target_plugins, include_core=False
+        ):
+            try:
+                raw = lang_file.read_bytes()
+                text = raw.decode("utf-8")
+
+                start = time.perf_counter()
+                data = yaml.safe_load(text)
+                parse_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                print(f"警告: 解析语言文件失败 {lang_file}: {e}")
+                continue
+
+            entries: dict[str, str] = {}
+            if data:
+                self._extract_entries_from_yaml(data, "", entries)
+
+            footprints.append(
+                LanguageFootprint(
+                    plugin_name=source_name,
+                    language_file=lang_file.name,
+                    size_bytes=len(raw),
+                    key_count=len(entries),
+                    max_depth=self._yaml_depth(data),
+                    multiline_values=sum(1 for v in entries.values() if "\n" in v),
+                    long_values=sum(
+                        1 for v in entries.values() if len(v) > long_value_threshold
+                    ),
+                    parse_ms=parse_ms,
+                    retained_bytes=self._retained_size(data),
+                )
+            )
+
+        return footprints
+
+    def _yaml_depth(self, data) -> int:
+        """计算 YAML 数据的最大嵌套深度（叶子所在层数）"""
+        if isinstance(data, dict):
+            return 1 + max((self._yaml_depth(v) for v in data.values()), default=0)
+        if isinstance(data, list):
+            return 1 + max((self._yaml_depth(v) for v in data), default=0)
+        return 0
+
+    def _retained_size(self, data) -> int:
+        """递归估算解析结果占用的 Python 对象内存"""
+        size = sys.getsizeof(data)
+        if isinstance(data, dict):
+            for key, value in data.items():
+                size += sys.getsizeof(key) + self._retained_size(value)
+        elif isinstance(data, list):
+            for value in data:
+                size += self._retained_size(value)
+        return size
+
+    def check_footprint_budget(
+        self, footprints: list[LanguageFootprint], budget: FootprintBudget
+    ) -> list[str]:
+        """按插件汇总语言包开销，返回超出预算的描述"""
+        violations = []
+
+        plugins: dict[str, list[LanguageFootprint]] = {}
+        for footprint in footprints:
+            plugins.setdefault(footprint.plugin_name, []).append(footprint)
+
+        for plugin_name, plugin_footprints in plugins.items():
+            total_bytes = sum(f.size_bytes for f in plugin_footprints)
+            max_keys = max(f.key_count for f in plugin_footprints)
+            max_depth = max(f.max_depth for f in plugin_footprints)
+            total_parse_ms = sum(f.parse_ms for f in plugin_footprints)
+
+            if budget.max_bytes is not None and total_bytes > budget.max_bytes:
+                violations.append(
+                    f"{plugin_name}: 语言包大小 {total_bytes} 字节超过预算 {budget.max_bytes}"
+                )
+            if budget.max_keys is not None and max_keys > budget.max_keys:
+                violations.append(
+                    f"{plugin_name}: 单个语言文件键数量 {max_keys} 超过预算 {budget.max_keys}"
+                )
+            if budget.max_depth is not None and max_depth > budget.max_depth:
+                violations.append(
+                    f"{plugin_name}: 嵌套深度 {max_depth} 超过预算 {budget.max_depth}"
+                )
+            if (
+                budget.max_parse_ms is not None
+                and total_parse_ms > budget.max_parse_ms
+            ):
+                violations.append(
+                    f"{plugin_name}: 解析耗时 {total_parse_ms:.2f}ms 超过预算 {budget.max_parse_ms}ms"
+                )
+
+        return violations
+
+    def generate_footprint_report(self, footprints: list[LanguageFootprint]):
+        """生成语言文件运行时开销报告"""
+        print("\n" + "=" * 80)
+        print("语言文件运行时开销报告")
+        print("=" * 80)
+
+        if not footprints:
+            print("没有找到任何语言文件")
+            return
+
+        print(
+            f"{'插件':<24}{'文件':<12}{'字节':>9}{'键':>7}{'深度':>6}"
+            f"{'多行':>6}{'长值':>6}{'解析ms':>9}{'对象KB':>9}"
+        )
+        print("-" * 88)
+        for f in sorted(footprints, key=lambda x: (-x.size_bytes, x.plugin_name)):
+            print(
+                f"{f.plugin_name:<24}{f.language_file:<12}{f.size_bytes:>9}"
+                f"{f.key_count:>7}{f.max_depth:>6}{f.multiline_values:>6}"
+                f"{f.long_values:>6}{f.parse_ms:>9.2f}{f.retained_bytes / 1024:>9.1f}"
+            )
+
+        print("-" * 88)
+        print("总计:")
+        print(f"  语言文件数: {len(footprints)}")
+        print(f"  总字节数: {sum(f.size_bytes for f in footprints) / 1024:.1f} KB")
+        print(f"  总键数: {sum(f.key_count for f in footprints)}")
+        print(f"  总解析耗时: {sum(f.parse_ms for f in footprints):.2f} ms")
+        print(
+            f"  解析结果对象大小 (估算): {sum(f.retained_bytes for f in footprints) / 1024:.1f} KB"
+        )
+        print("=" * 80)
+
+    def compile_lang_files(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        fmt: str = "properties",
+        output_subdir: str = "build/generated/i18n/lang",
+        force: bool = False,
+    ) -> tuple[int, int, list[str]]:
+        """将每个插件的 lang/*.yml 编译为扁平化、按键排序的快速加载产物
+
+        每个输出目录中保存一份清单，记录源文件哈希；只有源文件内容变化
+        （或产物缺失、格式变化）的语言才会重新编译。解析失败的语言文件
+        不写出产物，清单保留上次成功编译的记录，下次运行会重新尝试。
+
+        Returns
+        -------
+        tuple[int, int, list[str]]
+            (重新编译的文件数, 跳过的文件数, 解析失败的文件及原因)
+        """
+        compiled = 0
+        skipped = 0
+        failed: list[str] = []
+        extension = COMPILE_FORMATS[fmt]
+
+        for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+            lang_dir = plugin_dir / "src" / "main" / "resources" / "lang"
+            lang_files = sorted(self._iter_lang_files(lang_dir))
+            if not lang_files:
+                continue
+
+            output_dir = plugin_dir / output_subdir
+            manifest_file = output_dir / COMPILE_MANIFEST_NAME
+            manifest = self._load_compile_manifest(manifest_file)
+            new_manifest: dict[str, dict] = {}
+
+            for lang_file in lang_files:
+                raw = lang_file.read_bytes()
+                source_hash = hashlib.sha256(raw).hexdigest()
+                output_file = output_dir / f"{lang_file.stem}{extension}"
+
+                record = {
+                    "source": lang_file.name,
+                    "sha256": source_hash,
+                    "format": fmt,
+                    "version": COMPILED_LANG_VERSION,
+                }
+                previous = manifest.get(lang_file.stem, {})
+                if (
+                    not force
+                    and previous == record
+                    and output_file.exists()
+                ):
+                    new_manifest[lang_file.stem] = record
+                    skipped += 1
+                    continue
+
+                # 解析失败时不写出空产物，也不记录新的源文件哈希
+                try:
+                    entries = self._parse_lang_entries(lang_file, strict=True)
+                except Exception as e:
+                    failed.append(f"{plugin_dir.name}/{lang_file.name}: {e}")
+                    print(f"错误: 解析语言文件失败 {plugin_dir.name}/{lang_file.name}: {e}")
+                    if previous:
+                        new_manifest[lang_file.stem] = previous
+                    continue
+                new_manifest[lang_file.stem] = record
+
+                # 格式变化时删除旧格式的产物
+                previous_ext = COMPILE_FORMATS.get(previous.get("format", ""), "")
+                if previous_ext and previous_ext != extension:
+                    (output_dir / f"{lang_file.stem}{previous_ext}").unlink(
+                        missing_ok=True
+                    )
+
+                if fmt == "binary":
+                    payload = self._encode_binary_lang(entries)
+                else:
+                    payload = self._encode_properties_lang(entries)
+
+                output_dir.mkdir(parents=True, exist_ok=True)
+                output_file.write_bytes(payload)
+                compiled += 1
+                print(
+                    f"编译: {plugin_dir.name}/{lang_file.name} -> "
+                    f"{output_file.relative_to(plugin_dir)} ({len(entries)} 个键)"
+                )
+
+            # 清理已删除语言的旧产物
+            for stale_locale, stale_record in manifest.items():
+                if stale_locale in new_manifest:
+                    continue
+                stale_ext = COMPILE_FORMATS.get(stale_record.get("format", ""), "")
+                stale_file = output_dir / f"{stale_locale}{stale_ext}"
+                if stale_ext and stale_file.exists():
+                    stale_file.unlink()
+                    print(f"删除过期产物: {plugin_dir.name}/{stale_file.name}")
+
+            if new_manifest != manifest:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                with open(manifest_file, "w", encoding="utf-8") as f:
+                    json.dump(new_manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+        return compiled, skipped, failed
+
+    def _load_compile_manifest(self, manifest_file: Path) -> dict[str, dict]:
+        """读取编译清单，损坏或不存在时视为空"""
+        if not manifest_file.exists():
+            return {}
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _escape_properties(text: str, is_key: bool) -> str:
+        """按 java.util.Properties 规则转义键/值
+
+        ASCII 以外的字符转义为 \\uXXXX（基本平面以外的字符转义为代理对），
+        产物为纯 ASCII，Properties.load(InputStream) 按 ISO-8859-1 读取时
+        也不会乱码。
+        """
+        out = []
+        for index, ch in enumerate(text):
+            if ch == "\\":
+                out.append("\\\\")
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\r":
+                out.append("\\r")
+            elif ch == "\t":
+                out.append("\\t")
+            elif ch == "\f":
+                out.append("\\f")
+            elif ch in "=:#!" and (is_key or index == 0):
+                out.append("\\" + ch)
+            elif ch == " " and (is_key or index == 0):
+                out.append("\\ ")
+            elif not " " <= ch <= "~":
+                encoded = ch.encode("utf-16-be")
+                out.extend(
+                    f"\\u{int.from_bytes(encoded[i:i + 2], 'big'):04x}"
+                    for i in range(0, len(encoded), 2)
+                )
+            else:
+                out.append(ch)
+        return "".join(out)
+
+    def _encode_properties_lang(self, entries: dict[str, str]) -> bytes:
+        """编码为按键排序的 .properties 文本（纯 ASCII）"""
+        lines = [
+            f"{self._escape_properties(key, True)}={self._escape_properties(entries[key], False)}"
+            for key in sorted(entries)
+        ]
+        return ("\n".join(lines) + "\n").encode("ascii") if lines else b""
+
+    @staticmethod
+    def _encode_binary_lang(entries: dict[str, str]) -> bytes:
+        """编码为带偏移索引的长度前缀二进制格式（大端序，便于 DataInputStream 读取）
+
+        布局::
+
+            magic "NNLG" | u8 version | u32 count
+            index: count × (u32 key_offset, u32 key_length, u32 value_offset, u32 value_length)
+            data:  UTF-8 键值字节，偏移相对于 data 段起始位置
+
+        索引按键的 UTF-8 字节序排列，加载时可以直接二分查找。
+        """
+        encoded = sorted(
+            (key.encode("utf-8"), value.encode("utf-8"))
+            for key, value in entries.items()
+        )
+
+        index = bytearray()
+        data = bytearray()
+        for key_bytes, value_bytes in encoded:
+            key_offset = len(data)
+            data += key_bytes
+            value_offset = len(data)
+            data += value_bytes
+            index += struct.pack(
+                ">IIII", key_offset, len(key_bytes), value_offset, len(value_bytes)
+            )
+
+        header = COMPILED_LANG_MAGIC + struct.pack(
+            ">BI", COMPILED_LANG_VERSION, len(encoded)
+        )
+        return bytes(header + index + data)
+
+    def generate_language_keys(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        primary_locale: str = "zh_CN",
+        check_only: bool = False,
+        adopt: bool = False,
+    ) -> tuple[list[Path], list[Path]]:
+        """根据插件主语言文件生成 LanguageKeys.kt
+
+        仅当生成内容与现有文件逐字节不同时才写入，内容未变化时不会改动
+        文件的修改时间，因此不会触发 Gradle/Kotlin 重新编译。
+
+        只覆盖带有生成标记的文件；手写的 LanguageKeys.kt 默认跳过，adopt 为
+        True 时才会接管（调用方应通过 target_plugins 逐个指定插件）。重新生成
+        时沿用现有文件中每个键的 object 路径和常量名（包括 TPA 这类缩写的
+        大小写），语言文件中已不存在的手写常量也会保留，不会破坏现有引用。
+
+        Returns
+        -------
+        tuple[list[Path], list[Path]]
+            (内容变化的文件, 内容未变化的文件)；check_only 时不写入任何文件
+        """
+        changed: list[Path] = []
+        unchanged: list[Path] = []
+
+        for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+            lang_file = (
+                plugin_dir / "src" / "main" / "resources" / "lang" / f"{primary_locale}.yml"
+            )
+            if not lang_file.exists():
+                continue
+
+            target_file = self._find_language_keys_file(plugin_dir)
+            if target_file is None:
+                print(f"警告: 无法确定 {plugin_dir.name} 的 LanguageKeys.kt 包名，跳过")
+                continue
+
+            existing_text = (
+                target_file.read_text(encoding="utf-8") if target_file.exists() else None
+            )
+            if (
+                existing_text is not None
+                and LANGUAGE_KEYS_GENERATED_MARKER not in existing_text
+                and not adopt
+            ):
+                print(
+                    f"跳过手写文件: {target_file.relative_to(project_root)} "
+                    f"(使用 --plugins {plugin_dir.name} --adopt 接管)"
+                )
+                continue
+
+            package = self._language_keys_package(target_file, plugin_dir)
+            layout = self._parse_language_keys_layout(existing_text) if existing_text else {}
+            content = self._render_language_keys(
+                plugin_dir, package, lang_file, self._parse_lang_entries(lang_file), layout
+            ).encode("utf-8")
+
+            if target_file.exists() and target_file.read_bytes() == content:
+                unchanged.append(target_file)
+                continue
+
+            changed.append(target_file)
+            if check_only:
+                print(f"过期: {target_file.relative_to(project_root)}")
+                continue
+
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            target_file.write_bytes(content)
+            print(f"已生成: {target_file.relative_to(project_root)}")
+
+        return changed, unchanged
+
+    def _find_language_keys_file(self, plugin_dir: Path) -> Path | None:
+        """定位插件的 LanguageKeys.kt；不存在时根据 build.gradle.kts 的 group 推断"""
+        kotlin_dir = plugin_dir / "src" / "main" / "kotlin"
+        existing = sorted(kotlin_dir.rglob("i18n/LanguageKeys.kt"))
+        if existing:
+            return existing[0]
+
+        build_file = plugin_dir / "build.gradle.kts"
+        if not build_file.exists():
+            return None
+        match = re.search(
+            r'^group\s*=\s*"([\w.]+)"', build_file.read_text(encoding="utf-8"), re.M
+        )
+        if not match:
+            return None
+        return kotlin_dir.joinpath(*match.group(1).split("."), "i18n", "LanguageKeys.kt")
+
+    @staticmethod
+    def _parse_language_keys_layout(text: str) -> dict[str, tuple[tuple[str, ...], str]]:
+        """解析现有 LanguageKeys.kt，返回 键 → (object 路径, 常量名)
+
+        object 路径不含最外层的 LanguageKeys；按行扫描 object 声明和
+        const val 常量，以花括号计数确定嵌套层级。
+        """
+        layout: dict[str, tuple[tuple[str, ...], str]] = {}
+        stack: list[tuple[str, int]] = []  # (object 名, 声明时的花括号深度)
+        depth = 0
+        for line in text.splitlines():
+            code = re.sub(r'"(?:\\.|[^"\\])*"', '""', line.split("//", 1)[0])
+            object_match = LANGUAGE_KEYS_OBJECT_PATTERN.match(code)
+            if object_match:
+                stack.append((object_match.group(1), depth))
+            const_match = LANGUAGE_KEYS_CONST_PATTERN.match(line)
+            if const_match and stack:
+                path = tuple(name for name, _ in stack[1:])
+                layout.setdefault(const_match.group(2), (path, const_match.group(1)))
+            depth += code.count("{") - code.count("}")
+            while stack and depth <= stack[-1][1]:
+                stack.pop()
+        return layout
+
+    def _plugin_display_name(self, plugin_dir: Path) -> str:
+        """读取 build.gradle.kts 中的 pluginName，缺失时由目录名推断"""
+        build_file = plugin_dir / "build.gradle.kts"
+        if build_file.exists():
+            match = re.search(
+                r'^val pluginName\s*=\s*"([^"]+)"',
+                build_file.read_text(encoding="utf-8"),
+                re.M,
+            )
+            if match:
+                return match.group(1)
+        return self._kotlin_object_name(plugin_dir.name)
+
+    @staticmethod
+    def _language_keys_package(target_file: Path, plugin_dir: Path) -> str:
+        """由 LanguageKeys.kt 所在目录推断包名"""
+        kotlin_dir = plugin_dir / "src" / "main" / "kotlin"
+        return ".".join(target_file.parent.relative_to(kotlin_dir).parts)
+
+    @staticmethod
+    def _kotlin_object_name(segment: str) -> str:
+        """键路径片段 → Kotlin object 名 (edit_book → EditBook)"""
+        name = "".join(
+            part[:1].upper() + part[1:] for part in re.split(r"[^A-Za-z0-9]+", segment) if part
+        )
+        return f"_{name}" if not name or name[0].isdigit() else name
+
+    @staticmethod
+    def _kotlin_const_name(segment: str) -> str:
+        """键路径片段 → Kotlin 常量名 (reload_failed → RELOAD_FAILED)"""
+        name = re.sub(r"[^A-Za-z0-9]+", "_", segment)
+        name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name).strip("_").upper()
+        return f"_{name}" if not name or name[0].isdigit() else name
+
+    def _default_language_keys_path(self, key: str) -> tuple[tuple[str, ...], str]:
+        """按命名规则推导键的 (object 路径, 常量名)"""
+        parts = key.split(".")
+        layer = LANGUAGE_KEYS_LAYERS.get(parts[0])
+        if layer is not None and len(parts) > 1:
+            path = [layer] + [self._kotlin_object_name(p) for p in parts[1:-1]]
+        else:
+            path = [self._kotlin_object_name(p) for p in parts[:-1]]
+        return tuple(path), self._kotlin_const_name(parts[-1])
+
+    def _render_language_keys(
+        self,
+        plugin_dir: Path,
+        package: str,
+        lang_file: Path,
+        entries: dict[str, str],
+        layout: dict[str, tuple[tuple[str, ...], str]] | None = None,
+    ) -> str:
+        """渲染 LanguageKeys.kt 源码
+
+        layout 为现有文件的 键 → (object 路径, 常量名)。已有的键沿用原位置和
+        名称；新键按命名规则推导，其所在 object 若在现有文件中被改过名（如
+        Tpa → TPA），沿用改后的名称。
+        """
+        plugin_name = plugin_dir.name
+        layout = layout or {}
+
+        # 默认路径前缀 → 现有文件中的实际路径前缀
+        renames: dict[tuple[str, ...], tuple[str, ...]] = {}
+        for key, (path, _) in layout.items():
+            default_path, _ = self._default_language_keys_path(key)
+            if len(default_path) == len(path):
+                for i in range(1, len(path) + 1):
+                    renames.setdefault(default_path[:i], path[:i])
+
+        def resolve(key: str) -> tuple[tuple[str, ...], str]:
+            if key in layout:
+                return layout[key]
+            path, const_name = self._default_language_keys_path(key)
+            for i in range(len(path), 0, -1):
+                if path[:i] in renames:
+                    return renames[path[:i]] + path[i:], const_name
+            return path, const_name
+
+        # 节点: {"objects": {名称: 子节点}, "consts": {常量名: 键}}
+        def new_node() -> dict:
+            return {"objects": {}, "consts": {}}
+
+        # 列表元素等无法用模板引用的键不生成常量
+        keys = [key for key in entries if self.template_pattern.fullmatch(f"<%{key}%>")]
+        for key in layout:
+            if key not in entries:
+                print(f"警告: {plugin_name} 的 LanguageKeys.kt 引用了语言文件中不存在的键 {key}，保留原常量")
+                keys.append(key)
+
+        root = new_node()
+        for key in keys:
+            path, const_name = resolve(key)
+
+            node = root
+            for name in path:
+                node = node["objects"].setdefault(name, new_node())
+
+            if node["consts"].get(const_name, key) != key:
+                print(f"警告: {plugin_name} 中的键 {key} 与 {node['consts'][const_name]} 常量名冲突，跳过")
+                continue
+            node["consts"][const_name] = key
+
+        def render_node(node: dict, indent: int) -> list[str]:
+            pad = "    " * indent
+            lines = [f'{pad}const val {name} = "<%{key}%>"' for name, key in node["consts"].items()]
+            for name, child in node["objects"].items():
+                if lines:
+                    lines.append("")
+                lines.append(f"{pad}object {name} {{")
+                lines.extend(render_node(child, indent + 1))
+                lines.append(f"{pad}}}")
+            return lines
+
+        display_name = self._plugin_display_name(plugin_dir)
+
+        lines = [
+            f"package {package}",
+            "",
+            "/**",
+            f" * {display_name} 语言键常量类",
+            " *",
+            " * 遵循五层架构的 i18n Key 分类体系，使用 <%key%> 格式便于模板替换。",
+            f" * 本文件由 scripts/language-analyzer.py gen-keys 根据 {lang_file.name} 生成，请勿手动修改。",
+            " *",
+            " * 五层架构分类：",
+            " * 1. 核心系统层 (Core System Layer) - 插件生命周期、配置管理、系统级错误",
+            " * 2. 命令系统层 (Command System Layer) - 命令处理、参数验证、帮助系统",
+            " * 3. 图形界面层 (GUI Layer) - GUI界面、按钮、提示信息",
+            " * 4. 业务领域层 (Business Domain Layer) - 事件处理及其他业务消息",
+            " * 5. 日志系统层 (Logging Layer) - 日志消息",
+            " */",
+            "object LanguageKeys {",
+        ]
+
+        top_consts = render_node({"objects": {}, "consts": root["consts"]}, 1)
+        if top_consts:
+            lines.append("")
+            lines.extend(top_consts)
+
+        layer_names = {name for name, _ in LANGUAGE_KEYS_LAYER_BANNERS}
+        for layer, banner in LANGUAGE_KEYS_LAYER_BANNERS:
+            layer_node = root["objects"].get(layer, new_node())
+            lines.append("")
+            lines.append(f"    // ==================== {banner} ====================")
+            lines.append(f"    object {layer} {{")
+            body = render_node(layer_node, 2)
+            lines.extend(body if body else ["        // 暂无语言键，预留扩展"])
+            lines.append("    }")
+
+            # 业务领域层：未映射到分层的顶层节点
+            if layer == "Events":
+                for name, child in root["objects"].items():
+                    if name in layer_names:
+                        continue
+                    lines.append("")
+                    lines.append(f"    object {name} {{")
+                    lines.extend(render_node(child, 2))
+                    lines.append("    }")
+
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def watch_language_keys(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        primary_locale: str = "zh_CN",
+        interval: float = 0.5,
+        adopt: bool = False,
+    ):
+        """监听主语言文件变化并重新生成 LanguageKeys.kt（轮询修改时间）
+
+        每次变化都经由 generate_language_keys 生成：与单次 gen-keys 相同，
+        只覆盖带生成标记的文件（adopt 为 True 时接管手写文件），并沿用现有
+        文件的 object 路径和常量名。
+        """
+        print(f"监听 {primary_locale}.yml 变化中，按 Ctrl+C 退出...")
+        last_mtimes: dict[Path, int] = {}
+
+        try:
+            while True:
+                changed_plugins = []
+                for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+                    lang_file = (
+                        plugin_dir / "src" / "main" / "resources" / "lang" / f"{primary_locale}.yml"
+                    )
+                    if not lang_file.exists():
+                        continue
+                    mtime = lang_file.stat().st_mtime_ns
+                    if last_mtimes.get(lang_file) != mtime:
+                        last_mtimes[lang_file] = mtime
+                        changed_plugins.append(plugin_dir.name)
+
+                if changed_plugins:
+                    start = time.perf_counter()
+                    changed, _ = self.generate_language_keys(
+                        project_root, changed_plugins, primary_locale, adopt=adopt
+                    )
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"[OK] 检查 {len(changed_plugins)} 个插件，更新 {len(changed)} 个文件 ({elapsed:.1f} ms)")
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n已停止监听")
+
+    def collect_fingerprints(
+        self,
+        results: list[LanguageAnalysisResult],
+        best_practices_results: list[I18nBestPracticesResult],
+    ) -> dict[str, str]:
+        """收集本次分析所有问题的指纹 → 可读描述"""
+        findings: dict[str, str] = {}
+
+        def add(kind: str, plugin_name: str, location: str, subject: str):
+            fingerprint = finding_fingerprint(kind, plugin_name, location, subject)
+            findings[fingerprint] = " | ".join(
+                part for part in (kind, plugin_name, location, subject) if part
+            )
+
+        for result in results:
+            for key in result.missing_keys:
+                add(FINDING_MISSING_KEY, result.plugin_name, result.language_file, key)
+            for key in result.redundant_keys:
+                add(FINDING_REDUNDANT_KEY, result.plugin_name, result.language_file, key)
+
+        for result in best_practices_results:
+            for file in result.direct_template_usage:
+                add(FINDING_DIRECT_TEMPLATE, result.plugin_name, file, "")
+            for violation in result.structure_violations:
+                add(
+                    FINDING_STRUCTURE,
+                    result.plugin_name,
+                    violation.location,
+                    violation.fingerprint_subject,
+                )
+
+        return findings
+
+    @staticmethod
+    def write_baseline(baseline_file: Path, findings: dict[str, str]):
+        """写出基线文件（按指纹排序，便于代码审查时对比）"""
+        data = {
+            "version": BASELINE_VERSION,
+            "findings": dict(sorted(findings.items(), key=lambda item: item[1])),
+        }
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+    @staticmethod
+    def load_baseline(baseline_file: Path) -> set[str]:
+        """读取基线文件中的问题指纹"""
+        with open(baseline_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BASELINE_VERSION:
+            raise ValueError(f"不支持的基线文件版本: {data.get('version')}")
+        return set(data.get("findings", {}))
+
+    def _plugin_locales(self, plugin_dir: Path) -> dict[str, Path]:
+        """插件的 语言 → 语言文件"""
+        lang_dir = plugin_dir / "src" / "main" / "resources" / "lang"
+        return {f.stem: f for f in sorted(self._iter_lang_files(lang_dir))}
+
+    def _iter_translation_rows(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None,
+        source_locale: str,
+        target_locales: list[str] | None,
+    ):
+        """逐个插件生成翻译行：(插件, 目标语言, 键, 原文, 译文或None)
+
+        每次只加载一个插件的语言文件，内存占用与插件数量无关。列表中的
+        字符串值无法按键导入回写，跳过并在标准错误中报告。
+        """
+        for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+            locales = self._plugin_locales(plugin_dir)
+            if source_locale not in locales:
+                continue
 
-            # 检查是否有object LanguageKeys声明
-            if "object LanguageKeys" not in content:
-                violations.append("LanguageKeys.kt 应该使用 object LanguageKeys 声明")
+            skipped: list[str] = []
+            source_entries = self._parse_lang_entries(locales[source_locale], skipped)
+            if skipped:
+                print(
+                    f"警告: {plugin_dir.name} 中 {len(skipped)} 个列表值无法按键导出，已跳过: "
+                    + ", ".join(skipped),
+                    file=sys.stderr,
+                )
+            targets = target_locales or [l for l in locales if l != source_locale]
 
-            # 检查是否有标准的分层对象
-            expected_objects = ["Core", "Commands", "Gui", "Events", "Log"]
-            for obj in expected_objects:
-                if f"object {obj}" not in content:
-                    violations.append(f"LanguageKeys.kt 缺少 {obj} 对象分类")
+            for target_locale in targets:
+                target_entries = (
+                    self._parse_lang_entries(locales[target_locale])
+                    if target_locale in locales
+                    else {}
+                )
+                for key, source_value in source_entries.items():
+                    yield (
+                        plugin_dir.name,
+                        target_locale,
+                        key,
+                        source_value,
+                        target_entries.get(key),
+                    )
 
-            # 检查常量值格式
-            const_pattern = re.compile(r'const val \w+ = "(.*?)"')
-            const_matches = const_pattern.findall(content)
+    def export_translations(
+        self,
+        project_root: Path,
+        output,
+        table_format: str = "csv",
+        target_plugins: list[str] | None = None,
+        source_locale: str = "zh_CN",
+        target_locales: list[str] | None = None,
+    ) -> tuple[int, int]:
+        """流式导出 键 × 语言 翻译表到 CSV 或 XLIFF 1.2
+
+        Returns
+        -------
+        tuple[int, int]
+            (导出的行数, 其中缺失译文的行数)
+        """
+        rows = self._iter_translation_rows(
+            project_root, target_plugins, source_locale, target_locales
+        )
+        exported = 0
+        missing = 0
+
+        if table_format == "xliff":
+            output.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            output.write('<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">\n')
+            current_file = None
+            for plugin_name, target_locale, key, source_value, target_value in rows:
+                if current_file != (plugin_name, target_locale):
+                    if current_file is not None:
+                        output.write("    </body>\n  </file>\n")
+                    current_file = (plugin_name, target_locale)
+                    output.write(
+                        f"  <file original={quoteattr(plugin_name)} datatype=\"plaintext\""
+                        f" source-language={quoteattr(source_locale.replace('_', '-'))}"
+                        f" target-language={quoteattr(target_locale.replace('_', '-'))}>\n"
+                        "    <body>\n"
+                    )
+                state = "translated" if target_value is not None else "needs-translation"
+                output.write(
+                    f"      <trans-unit id={quoteattr(key)}>\n"
+                    f"        <source>{xml_escape(source_value)}</source>\n"
+                    f"        <target state=\"{state}\">{xml_escape(target_value or '')}</target>\n"
+                    "      </trans-unit>\n"
+                )
+                exported += 1
+                missing += target_value is None
+            if current_file is not None:
+                output.write("    </body>\n  </file>\n")
+            output.write("</xliff>\n")
+        else:
+            writer = csv.writer(output)
+            writer.writerow(
+                ["plugin", "key", "source_locale", "target_locale", "source", "target", "state"]
+            )
+            for plugin_name, target_locale, key, source_value, target_value in rows:
+                writer.writerow(
+                    [
+                        plugin_name,
+                        key,
+                        source_locale,
+                        target_locale,
+                        source_value,
+                        target_value or "",
+                        "translated" if target_value is not None else "missing",
+                    ]
+                )
+                exported += 1
+                missing += target_value is None
+
+        return exported, missing
+
+    def _read_import_batches(
+        self, input_file: Path, table_format: str
+    ) -> dict[tuple[str, str], dict[str, str]]:
+        """读取翻译表，按 (插件, 目标语言) 汇总译文：{(插件, 目标语言): {键: 译文}}
+
+        同一文件的行不要求相邻（如在表格软件中按键排序过的 CSV），全部汇总后
+        每个语言文件只写入一次。表头缺少必需列时抛出 ValueError。
+        """
+        batches: dict[tuple[str, str], dict[str, str]] = {}
+
+        def rows():
+            if table_format == "xliff":
+                ns = "{urn:oasis:names:tc:xliff:document:1.2}"
+                plugin_name = target_locale = None
+                for event, elem in ElementTree.iterparse(
+                    input_file, events=("start", "end")
+                ):
+                    tag = elem.tag.replace(ns, "")
+                    if event == "start" and tag == "file":
+                        plugin_name = elem.get("original")
+                        target_locale = (elem.get("target-language") or "").replace("-", "_")
+                        if not plugin_name or not target_locale:
+                            raise ValueError(
+                                f"{input_file}: <file> 缺少 original 或 target-language 属性"
+                            )
+                    elif event == "end" and tag == "trans-unit":
+                        if not elem.get("id"):
+                            raise ValueError(f"{input_file}: <trans-unit> 缺少 id 属性")
+                        target = elem.find(f"{ns}target")
+                        if target is None:
+                            target = elem.find("target")
+                        yield plugin_name, target_locale, elem.get("id"), (
+                            target.text if target is not None else None
+                        )
+                        elem.clear()
+            else:
+                with open(input_file, "r", encoding="utf-8", newline="") as f:
+                    reader = csv.DictReader(f)
+                    missing = [
+                        column
+                        for column in IMPORT_CSV_COLUMNS
+                        if column not in (reader.fieldnames or ())
+                    ]
+                    if missing:
+                        raise ValueError(f"{input_file}: 翻译表缺少列 {', '.join(missing)}")
+                    for row in reader:
+                        yield row["plugin"], row["target_locale"], row["key"], row["target"]
+
+        for plugin_name, target_locale, key, target_value in rows():
+            if not target_value:
+                continue  # 未翻译的行不导入
+            batches.setdefault((plugin_name, target_locale), {})[key] = target_value
+
+        return batches
+
+    @staticmethod
+    def _backup_lang_file(lang_file: Path) -> Path:
+        """复制语言文件为带时间戳的备份，同一秒内多次备份时追加序号，返回备份路径"""
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_file = lang_file.with_suffix(f".backup.{stamp}.yml")
+        counter = 1
+        while backup_file.exists():
+            backup_file = lang_file.with_suffix(f".backup.{stamp}_{counter}.yml")
+            counter += 1
+        shutil.copy2(lang_file, backup_file)
+        return backup_file
+
+    def import_translations(
+        self,
+        project_root: Path,
+        input_file: Path,
+        table_format: str = "csv",
+        target_plugins: list[str] | None = None,
+        backup: bool = True,
+    ) -> tuple[int, int]:
+        """将翻译表写回语言文件，每个文件一次批量修改，保留键顺序和注释
+
+        Returns
+        -------
+        tuple[int, int]
+            (更新的键数, 新增的键数)
+        """
+        total_updated = 0
+        total_inserted = 0
+
+        batches = self._read_import_batches(input_file, table_format)
+        for (plugin_name, target_locale), edits in batches.items():
+            if target_plugins and plugin_name not in target_plugins:
+                continue
 
-            for const_value in const_matches:
-                if const_value.startswith("<%") and const_value.endswith("%>"):
-                    continue  # 正确的格式
-                elif const_value == "Reloading ExternalBook plugin...":
-                    continue  # 允许的英文常量
-                else:
-                    violations.append(f"常量值 '{const_value}' 应该使用 <%xxx%> 格式")
+            plugin_dir = project_root / "plugins" / plugin_name
+            if not plugin_dir.is_dir():
+                print(f"警告: 插件不存在 {plugin_name}，跳过")
+                continue
 
-        except Exception as e:
-            violations.append(f"读取 LanguageKeys.kt 文件失败: {e}")
+            lang_file = plugin_dir / "src" / "main" / "resources" / "lang" / f"{target_locale}.yml"
+            current = self._parse_lang_entries(lang_file) if lang_file.exists() else {}
+            changes = {k: v for k, v in edits.items() if current.get(k) != v}
+            if not changes:
+                continue
 
-        return violations
+            text = ""
+            if lang_file.exists():
+                with open(lang_file, "r", encoding="utf-8", newline="") as f:
+                    text = f.read()
+            document = LangYamlDocument(text)
+            updated, inserted = document.apply(changes)
 
-    def _analyze_plugin(self, plugin_dir: Path) -> list[LanguageAnalysisResult]:
-        """分析单个插件"""
-        results = []
-        plugin_name = plugin_dir.name
+            if backup and lang_file.exists():
+                self._backup_lang_file(lang_file)
 
-        # 查找代码文件中使用的语言键
-        used_keys = self._find_used_keys(plugin_dir)
-        # print(f"在代码中找到 {len(used_keys)} 个语言键")
+            lang_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(lang_file, "w", encoding="utf-8", newline="") as f:
+                f.write(document.text())
+            print(f"导入: {plugin_name}/{lang_file.name} 更新 {updated} 个，新增 {inserted} 个")
+            total_updated += updated
+            total_inserted += inserted
 
-        # if used_keys:
-        #     print(f"使用的键: {', '.join(sorted(used_keys))}")
+        return total_updated, total_inserted
 
-        # 查找语言文件
-        lang_dir = plugin_dir / "src" / "main" / "resources" / "lang"
-        if not lang_dir.exists() or not lang_dir.is_dir():
-            print(f"警告: 未找到语言文件目录 {lang_dir}")
-            if used_keys:
-                results.append(
-                    LanguageAnalysisResult(
-                        plugin_name=plugin_name,
-                        language_file="无语言文件",
-                        used_keys=used_keys,
-                        defined_keys=set(),
-                        missing_keys=used_keys,
-                        redundant_keys=set(),
-                    )
-                )
-            return results
+    def sync_locales(
+        self,
+        project_root: Path,
+        target_plugins: list[str] | None = None,
+        reference_locale: str = "zh_CN",
+        placeholder: str | None = None,
+        check_only: bool = False,
+        backup: bool = True,
+    ) -> tuple[int, int]:
+        """将参考语言的键树合并到插件的其他语言文件
+
+        缺失的键按参考语言中的结构位置插入（值为占位文本或参考语言原文），
+        参考语言中不存在的孤立键只报告不删除。
+
+        Returns
+        -------
+        tuple[int, int]
+            (插入/缺失的键数, 孤立键数)
+        """
+        total_inserted = 0
+        total_orphans = 0
+
+        for plugin_dir in self._iter_plugin_dirs(project_root, target_plugins):
+            locales = self._plugin_locales(plugin_dir)
+            if reference_locale not in locales:
+                continue
 
-        # 分析每个语言文件
-        for lang_file in lang_dir.iterdir():
-            if (
-                lang_file.is_file()
-                and lang_file.suffix.lower() in self.lang_extensions
-                and not lang_file.name.startswith(".")
-                and "backup" not in lang_file.name.lower()
-            ):
-                print(f"\n分析语言文件: {lang_file.name}")
+            reference = self._parse_lang_entries(locales[reference_locale])
 
-                defined_keys = self._parse_lang_file(lang_file)
-                print(f"语言文件中定义了 {len(defined_keys)} 个键")
+            for locale, lang_file in locales.items():
+                if locale == reference_locale:
+                    continue
 
-                missing_keys = used_keys - defined_keys
-                redundant_keys = defined_keys - used_keys
+                with open(lang_file, "r", encoding="utf-8", newline="") as f:
+                    document = LangYamlDocument(f.read())
+                inserted, orphans, conflicts = document.merge_from(reference, placeholder)
 
-                print(f"缺失的键: {len(missing_keys)} 个")
-                if missing_keys:
-                    for key in sorted(missing_keys):
-                        print(f"  - {key}")
+                if not inserted and not orphans and not conflicts:
+                    continue
 
-                print(f"冗余的键: {len(redundant_keys)} 个")
-                if redundant_keys:
-                    for key in sorted(redundant_keys):
-                        print(f"  - {key}")
+                print(f"\n同步: {plugin_dir.name}/{lang_file.name} <- {reference_locale}")
+                for path in inserted:
+                    print(f"  + {path}")
+                for path in orphans:
+                    print(f"  ? {path} (参考语言中不存在)")
+                for path in conflicts:
+                    print(f"  ! {path} (与参考语言结构冲突，跳过)")
 
-                results.append(
-                    LanguageAnalysisResult(
-                        plugin_name=plugin_name,
-                        language_file=lang_file.name,
-                        used_keys=used_keys,
-                        defined_keys=defined_keys,
-                        missing_keys=missing_keys,
-                        redundant_keys=redundant_keys,
-                    )
-                )
+                total_inserted += len(inserted)
+                total_orphans += len(orphans)
 
-        return results
+                if check_only or not inserted:
+                    continue
 
-    def _find_used_keys(self, plugin_dir: Path) -> set[str]:
-        """在插件的所有代码文件中查找使用的语言键"""
-        used_keys = set()
+                if backup:
+                    self._backup_lang_file(lang_file)
+                with open(lang_file, "w", encoding="utf-8", newline="") as f:
+                    f.write(document.text())
+
+        return total_inserted, total_orphans
+
+    def build_key_history(
+        self, project_root: Path, cache_file: Path
+    ) -> dict[str, KeyHistoryEntry] | None:
+        """建立 “插件:键” → 历史 的索引
+
+        只运行一次流式 git log -p，按提交 SHA 缓存到 cache_file；缓存的提交是
+        当前 HEAD 的祖先时，只增量处理新的提交。不是 git 仓库或 git log 失败
+        时返回 None；浅克隆的历史不完整，结果照常返回但不写入缓存。
+        """
+        head = self._git(project_root, "rev-parse", "HEAD")
+        if head is None:
+            print("警告: 无法读取 git 历史，跳过键历史标注")
+            return None
+        shallow = self._git(project_root, "rev-parse", "--is-shallow-repository") == "true"
+        if shallow:
+            print("警告: 当前是浅克隆，键历史只覆盖已获取的提交，结果不会写入缓存")
+
+        cache: dict = {}
+        if cache_file.exists():
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            except Exception:
+                cache = {}
+            if cache.get("version") != KEY_HISTORY_VERSION:
+                cache = {}
+
+        entries: dict[str, list] = cache.get("keys", {})
+        cached_head = cache.get("head")
+
+        if cached_head == head:
+            revision_range = None
+        elif cached_head and self._git(
+            project_root, "merge-base", "--is-ancestor", cached_head, head
+        ) is not None:
+            revision_range = f"{cached_head}..{head}"
+        else:
+            entries = {}
+            revision_range = head
 
-        def traverse_code_files(directory: Path):
-            """递归遍历代码文件"""
+        if revision_range is not None:
+            start = time.perf_counter()
             try:
-                for item in directory.iterdir():
-                    if item.is_dir():
-                        traverse_code_files(item)
-                    elif item.is_file() and item.suffix.lower() in self.code_extensions:
-                        keys = self._extract_keys_from_file(item)
-                        used_keys.update(keys)
-            except PermissionError:
-                print(f"警告: 无权限访问目录 {directory}")
+                commits = self._scan_git_history(project_root, revision_range, entries)
+            except RuntimeError as e:
+                print(f"警告: {e}，跳过键历史标注")
+                return None
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"键历史: 处理 {commits} 个新提交 ({elapsed:.0f} ms)")
+
+        if revision_range is not None and not shallow:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": KEY_HISTORY_VERSION, "head": head, "keys": entries},
+                    f,
+                    ensure_ascii=False,
+                )
 
-        # 从 src 目录开始遍历
-        src_dir = plugin_dir / "src"
-        if src_dir.exists():
-            traverse_code_files(src_dir)
+        return {key: KeyHistoryEntry(*value) for key, value in entries.items()}
 
-        # 也检查 bin 目录（编译后的代码）
-        bin_dir = plugin_dir / "bin"
-        if bin_dir.exists():
-            traverse_code_files(bin_dir)
+    @staticmethod
+    def _git(project_root: Path, *args: str) -> str | None:
+        """运行 git 命令，失败时返回 None"""
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=project_root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip()
+
+    def _scan_git_history(
+        self, project_root: Path, revision_range: str, entries: dict[str, list]
+    ) -> int:
+        """按时间顺序流式解析 git log -p，更新 entries，返回处理的提交数
+
+        entries 的值为 [语言提交, 语言时间, 代码提交, 代码时间]。git log 以
+        非零状态退出时抛出 RuntimeError（此时 entries 只更新了一部分）。
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".gitattributes", delete=False, encoding="utf-8"
+        ) as attributes:
+            attributes.write(KEY_HISTORY_ATTRIBUTES)
+
+        command = [
+            "git",
+            "-c",
+            f"core.attributesFile={attributes.name}",
+            *KEY_HISTORY_DIFF_CONFIG,
+            "log",
+            "--reverse",
+            "--format=%x00%H %ct",
+            "-p",
+            "--function-context",
+            "--unified=0",
+            "--no-color",
+            "--no-renames",
+            "--no-ext-diff",
+            revision_range,
+            "--",
+            *KEY_HISTORY_PATHSPECS,
+        ]
 
-        # 去掉一些在注释中可能出现的键
-        used_keys -= {
-            "key",
-            "...",
-            "..",
-            "xxx",
-            "xx",
-        }
+        commits = 0
+        commit = None
+        commit_time = None
+        plugin_name = None
+        file_kind = None  # "lang" / "code" / None
+        in_header = False
+        # YAML 路径栈: [(缩进, 键路径, 是否叶子)]
+        stack: list[tuple[int, str, bool]] = []
+
+        def touch(key: str, slot: int):
+            record = entries.setdefault(f"{plugin_name}:{key}", [None, None, None, None])
+            record[slot] = commit
+            record[slot + 1] = commit_time
+
+        errors = tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace")
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=project_root,
+                stdout=subprocess.PIPE,
+                stderr=errors,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+            for raw_line in process.stdout:
+                line = raw_line.rstrip("\n").rstrip("\r")
 
-        return used_keys
+                if line.startswith("\x00"):
+                    commit, _, timestamp = line[1:].partition(" ")
+                    commit_time = int(timestamp)
+                    commits += 1
+                    continue
 
-    def _extract_keys_from_file(self, file_path: Path) -> set[str]:
-        """从单个代码文件中提取语言键"""
-        keys = set()
+                if line.startswith("diff --git "):
+                    in_header = True
+                    file_kind = None
+                    continue
 
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-                matches = self.template_pattern.findall(content)
-                keys.update(matches)
-        except Exception as e:
-            print(f"警告: 读取文件失败 {file_path}: {e}")
+                if in_header:
+                    if line.startswith("+++ "):
+                        path = line[4:]
+                        path = path[2:] if path.startswith("b/") else None
+                        parts = path.split("/") if path else []
+                        plugin_name = parts[1] if len(parts) > 2 else None
+                        if plugin_name is None:
+                            file_kind = None
+                        elif "/resources/lang/" in path:
+                            file_kind = "lang"
+                        else:
+                            file_kind = "code"
+                    elif line.startswith("@@"):
+                        in_header = False
+                        stack = []
+                    continue
 
-        return keys
+                if line.startswith("@@"):
+                    stack = []
+                    continue
 
-    def _parse_lang_file(self, file_path: Path) -> set[str]:
-        """解析语言文件，提取所有定义的键"""
-        keys = set()
+                if file_kind is None or not line or line[0] not in " +-":
+                    continue
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                if data:
-                    self._extract_keys_from_yaml(data, "", keys)
-        except Exception as e:
-            print(f"警告: 解析语言文件失败 {file_path}: {e}")
+                marker, text = line[0], line[1:]
 
-        return keys
+                # 代码：新版本中存在的行（新增行和上下文行）才算引用
+                if file_kind == "code":
+                    if marker != "-":
+                        for key in self.template_pattern.findall(text):
+                            touch(key, 2)
+                    continue
 
-    def _extract_keys_from_yaml(self, data, prefix: str, keys: set[str]):
-        """递归提取 YAML 中的所有键路径"""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                key_str = str(key)
-                full_key = key_str if not prefix else f"{prefix}.{key_str}"
+                # 语言文件：只根据新版本的行（上下文和新增行）还原键路径
+                if marker == "-":
+                    continue
+                stripped = text.strip()
+                if not stripped:
+                    continue
+                indent = len(text) - len(text.lstrip(" "))
 
-                if isinstance(value, (dict, list)):
-                    self._extract_keys_from_yaml(value, full_key, keys)
-                else:
-                    keys.add(full_key)
-        elif isinstance(data, list):
-            for index, value in enumerate(data):
-                self._extract_keys_from_yaml(value, f"{prefix}[{index}]", keys)
+                if stack and stack[-1][2] and indent > stack[-1][0]:
+                    if marker == "+":
+                        touch(stack[-1][1], 0)
+                    continue
+                if stripped.startswith("#"):
+                    continue
+
+                match = LangYamlDocument.KEY_PATTERN.match(text)
+                if not match:
+                    continue
+                while stack and stack[-1][0] >= indent:
+                    stack.pop()
+
+                key = match.group(2).strip()
+                if key[:1] in ("'", '"'):
+                    key = key[1:-1]
+                value = (match.group(3) or "").strip()
+                path = f"{stack[-1][1]}.{key}" if stack else key
+                is_leaf = bool(value) and not value.startswith("#")
+                stack.append((indent, path, is_leaf))
+
+                if is_leaf and marker == "+":
+                    touch(path, 0)
+
+            if process.wait() != 0:
+                errors.seek(0)
+                message = errors.read().strip().splitlines()
+                raise RuntimeError(
+                    f"git log 退出码 {process.returncode}"
+                    + (f": {message[-1]}" if message else "")
+                )
+        finally:
+            errors.close()
+            os.unlink(attributes.name)
+
+        return commits
+
+    @staticmethod
+    def _format_key_history(entry: KeyHistoryEntry | None) -> str:
+        """格式化键历史，用于报告中的冗余键标注"""
+
+        def fmt(commit: str | None, timestamp: int | None) -> str:
+            if not commit:
+                return "无记录"
+            return f"{datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')} {commit[:8]}"
+
+        if entry is None:
+            return "语言: 无记录 | 代码: 无记录"
+        return (
+            f"语言: {fmt(entry.lang_commit, entry.lang_time)} | "
+            f"代码: {fmt(entry.code_commit, entry.code_time)}"
+        )
 
     def remove_redundant_keys(
         self, results: list[LanguageAnalysisResult], backup: bool = True
@@ -461,10 +2690,7 @@ class LanguageAnalyzer:
 
             # 备份原文件
             if backup:
-                backup_file = lang_file.with_suffix(
-                    f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}.yml"
-                )
-                shutil.copy2(lang_file, backup_file)
+                backup_file = self._backup_lang_file(lang_file)
                 print(f"已备份到: {backup_file}")
 
             # 读取并解析YAML文件
@@ -559,8 +2785,13 @@ class LanguageAnalyzer:
         self,
         results: list[LanguageAnalysisResult],
         best_practices_results: list[I18nBestPracticesResult],
+        key_history: dict[str, KeyHistoryEntry] | None = None,
     ):
-        """生成分析报告"""
+        """生成分析报告
+
+        提供 key_history 时，为冗余键标注语言文件最后修改和代码最后引用的提交，
+        便于区分早已废弃的键和最近重构时遗留的键。
+        """
         print("\n" + "=" * 80)
         print("语言分析报告")
         print("=" * 80)
@@ -585,8 +2816,8 @@ class LanguageAnalyzer:
 
             for result in plugin_results:
                 print(f"\n语言文件: {result.language_file}")
-                print(f"  使用的键: {len(result.used_keys)}")
-                print(f"  定义的键: {len(result.defined_keys)}")
+                print(f"  使用的键: {result.used_count}")
+                print(f"  定义的键: {result.defined_count}")
 
                 if result.missing_keys:
                     print(f"  ❌ 缺失的键 ({len(result.missing_keys)}):")
@@ -597,7 +2828,11 @@ class LanguageAnalyzer:
                 if result.redundant_keys:
                     print(f"  ⚠️ 冗余的键 ({len(result.redundant_keys)}):")
                     for key in sorted(result.redundant_keys):
-                        print(f"    - {key}")
+                        if key_history is None:
+                            print(f"    - {key}")
+                        else:
+                            history = key_history.get(f"{result.plugin_name}:{key}")
+                            print(f"    - {key}  ({self._format_key_history(history)})")
                     total_redundant += len(result.redundant_keys)
 
                 if not result.missing_keys and not result.redundant_keys:
@@ -609,6 +2844,8 @@ class LanguageAnalyzer:
         print(f"  分析的语言文件数: {len(results)}")
         print(f"  总缺失键数: {total_missing}")
         print(f"  总冗余键数: {total_redundant}")
+        if self.baseline:
+            print(f"  按基线忽略的问题数: {self.suppressed_count}")
 
         if total_missing == 0 and total_redundant == 0:
             print("  [OK] 所有语言文件都完美匹配!")
@@ -713,11 +2950,27 @@ class LanguageAnalyzer:
         print("6. 确保 LanguageKeys.kt 文件包含五层架构分类说明")
 
 
+# 命令行子命令（位置参数）
+COMMANDS = ["analyze", "compile", "gen-keys", "export", "import", "sync-locales"]
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
         description="语言模板分析器 - 分析和清理项目中的语言模板"
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="analyze",
+        help=(
+            "analyze: 分析语言模板(默认); compile: 编译语言文件为快速加载产物; "
+            "gen-keys: 根据主语言文件生成 LanguageKeys.kt; "
+            "export/import: 导出/导入 CSV 或 XLIFF 翻译表; "
+            "sync-locales: 以主语言为准补齐其他语言文件的键"
+        ),
+    )
     parser.add_argument(
         "--remove-redundant",
         action="store_true",
@@ -736,23 +2989,306 @@ def main():
         help="最佳实践合规性评分阈值(默认80.0)",
     )
     parser.add_argument(
-        "--plugins", nargs="*", help="指定要分析的插件名称，如果不指定则分析所有插件"
+        "--plugins",
+        nargs="*",
+        help="指定要分析的插件名称，如果不指定则分析所有插件（命令须写在 --plugins 之前）",
+    )
+    parser.add_argument(
+        "--shared-bundle",
+        action="store_true",
+        help="分析跨插件重复的语言条目，给出共享语言包提取方案",
+    )
+    parser.add_argument(
+        "--shared-bundle-min-sources",
+        type=int,
+        default=2,
+        help="条目至少在多少个插件/模块中重复才提取到共享包(默认2)",
+    )
+    parser.add_argument(
+        "--shared-bundle-output",
+        type=Path,
+        help="将共享语言包方案写出到指定目录（每种语言一个 YAML 文件）",
+    )
+
+    parser.add_argument(
+        "--footprint",
+        action="store_true",
+        help="统计语言文件大小、键数量、嵌套深度和解析耗时，并检查预算",
+    )
+    parser.add_argument(
+        "--long-value-threshold",
+        type=int,
+        default=200,
+        help="超过该字符数的值计为长值(默认200)",
+    )
+    parser.add_argument(
+        "--budget-bytes", type=int, help="单个插件语言包总字节数预算，超出时返回失败"
+    )
+    parser.add_argument(
+        "--budget-keys", type=int, help="单个语言文件键数量预算，超出时返回失败"
+    )
+    parser.add_argument(
+        "--budget-depth", type=int, help="语言文件嵌套深度预算，超出时返回失败"
+    )
+    parser.add_argument(
+        "--budget-parse-ms",
+        type=float,
+        help="单个插件语言包解析耗时预算(毫秒)，超出时返回失败",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=sorted(COMPILE_FORMATS),
+        default="properties",
+        help="compile 的产物格式(默认properties)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="build/generated/i18n/lang",
+        help="compile 产物相对插件目录的输出路径(默认build/generated/i18n/lang)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="compile 时忽略清单，全部重新编译"
+    )
+
+    parser.add_argument(
+        "--primary-locale",
+        default="zh_CN",
+        help="gen-keys 使用的主语言文件，也是 export 的源语言和 sync-locales 的参考语言(默认zh_CN)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="gen-keys/sync-locales 只检查是否过期，不写入文件",
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="gen-keys 持续监听主语言文件变化"
+    )
+    parser.add_argument(
+        "--adopt",
+        action="store_true",
+        help="gen-keys 接管 --plugins 指定插件中手写的 LanguageKeys.kt（默认只覆盖生成的文件）",
+    )
+
+    parser.add_argument(
+        "--locales", nargs="*", help="export 的目标语言，默认导出源语言以外的所有语言"
+    )
+    parser.add_argument(
+        "--table-format",
+        choices=["csv", "xliff"],
+        help="export/import 的翻译表格式，默认根据文件扩展名判断",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="export 输出文件，默认输出到标准输出"
+    )
+    parser.add_argument("--input", type=Path, help="import 读取的翻译表文件")
+    parser.add_argument(
+        "--placeholder",
+        help="sync-locales 插入缺失键时使用的占位文本，默认使用参考语言的原文",
+    )
+    parser.add_argument(
+        "--counts-only",
+        action="store_true",
+        help="结果只保留键数量和缺失/冗余差异，降低大型项目的内存占用",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="根据 git 历史为冗余键标注最后修改/引用的提交",
+    )
+    parser.add_argument(
+        "--history-cache",
+        type=Path,
+        default=Path("build") / "i18n-key-history.json",
+        help="键历史索引缓存文件(默认build/i18n-key-history.json)",
+    )
+    parser.add_argument(
+        "--no-core-layer",
+        action="store_true",
+        help="不将 modules/* 作为核心层参与键解析，只按插件自身的语言文件分析",
+    )
+    parser.add_argument(
+        "--write-baseline",
+        type=Path,
+        metavar="FILE",
+        help="将当前所有问题的指纹写入基线文件",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        metavar="FILE",
+        help="读取基线文件，只报告基线之外的新问题",
     )
 
     args = parser.parse_args()
 
-    print("语言模板分析器")
-    print("分析项目中的语言模板使用情况...")
+    # --plugins 会吞掉其后的所有参数，写在它后面的命令会被当成插件名
+    misplaced = [name for name in args.plugins or () if name in COMMANDS]
+    if misplaced:
+        parser.error(f"命令 {misplaced[0]} 必须写在 --plugins 之前，如: {misplaced[0]} --plugins ...")
+
+    # 导出到标准输出时，提示信息输出到标准错误，避免混入翻译表
+    info_stream = sys.stderr if args.command == "export" and not args.output else sys.stdout
+
+    print("语言模板分析器", file=info_stream)
+    print("分析项目中的语言模板使用情况...", file=info_stream)
 
     # 获取当前脚本所在目录作为项目根目录
     project_root = Path.cwd()
-    print(f"项目根目录: {project_root}")
+    print(f"项目根目录: {project_root}", file=info_stream)
+
+    baseline = None
+    if args.baseline and not args.write_baseline:
+        if not args.baseline.exists():
+            print(f"错误: 基线文件不存在 {args.baseline}")
+            exit(1)
+        try:
+            baseline = LanguageAnalyzer.load_baseline(args.baseline)
+        except ValueError as e:
+            print(f"错误: {e}，请使用 --write-baseline 重新生成基线")
+            exit(1)
+        print(f"已加载基线: {args.baseline} ({len(baseline)} 个问题)")
+
+    analyzer = LanguageAnalyzer(
+        baseline,
+        use_core_layer=not args.no_core_layer,
+        counts_only=args.counts_only,
+    )
+
+    if args.command in ("export", "import"):
+        table_path = args.output if args.command == "export" else args.input
+        table_format = args.table_format or (
+            "xliff"
+            if table_path and table_path.suffix.lower() in (".xlf", ".xliff")
+            else "csv"
+        )
+
+        if args.command == "export":
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as f:
+                    exported, missing = analyzer.export_translations(
+                        project_root, f, table_format, args.plugins,
+                        args.primary_locale, args.locales,
+                    )
+            else:
+                exported, missing = analyzer.export_translations(
+                    project_root, sys.stdout, table_format, args.plugins,
+                    args.primary_locale, args.locales,
+                )
+            print(f"[OK] 导出 {exported} 行，其中 {missing} 行缺失译文", file=sys.stderr)
+            return
+
+        if not args.input or not args.input.exists():
+            print("错误: import 需要通过 --input 指定存在的翻译表文件")
+            exit(1)
+        try:
+            updated, inserted = analyzer.import_translations(
+                project_root, args.input, table_format, args.plugins, not args.no_backup
+            )
+        except (ValueError, ElementTree.ParseError) as e:
+            print(f"错误: {e}")
+            exit(1)
+        print(f"\n[OK] 导入完成: 更新 {updated} 个键，新增 {inserted} 个键")
+        return
+
+    if args.command == "sync-locales":
+        inserted, orphans = analyzer.sync_locales(
+            project_root,
+            args.plugins,
+            args.primary_locale,
+            args.placeholder,
+            check_only=args.check,
+            backup=not args.no_backup,
+        )
+        if args.check and inserted:
+            print(f"\n[XX] 有 {inserted} 个键未同步到其他语言文件")
+            exit(1)
+        print(f"\n[OK] 同步完成: 补齐 {inserted} 个键，发现 {orphans} 个孤立键")
+        return
+
+    if args.command == "gen-keys":
+        if args.adopt and not args.plugins:
+            print("[XX] --adopt 必须配合 --plugins 逐个指定要接管的插件")
+            exit(1)
+        if args.watch:
+            analyzer.watch_language_keys(
+                project_root, args.plugins, args.primary_locale, adopt=args.adopt
+            )
+            return
+
+        start = time.perf_counter()
+        changed, unchanged = analyzer.generate_language_keys(
+            project_root, args.plugins, args.primary_locale, check_only=args.check, adopt=args.adopt
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if args.check and changed:
+            print(f"\n[XX] 有 {len(changed)} 个 LanguageKeys.kt 与语言文件不一致")
+            exit(1)
+        print(
+            f"\n[OK] 生成完成: 更新 {0 if args.check else len(changed)} 个，"
+            f"未变化 {len(unchanged)} 个 ({elapsed:.1f} ms)"
+        )
+        return
+
+    if args.command == "compile":
+        start = time.perf_counter()
+        compiled, skipped, failed = analyzer.compile_lang_files(
+            project_root, args.plugins, args.format, args.output_dir, args.force
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if failed:
+            print(f"\n[XX] 有 {len(failed)} 个语言文件解析失败，未编译:")
+            for message in failed:
+                print(f"  {message}")
+            exit(1)
+        print(
+            f"\n[OK] 编译完成: 重新编译 {compiled} 个，未变化跳过 {skipped} 个 ({elapsed:.1f} ms)"
+        )
+        return
+
+    # 如果只规划共享语言包
+    if args.shared_bundle:
+        plan = analyzer.plan_shared_bundle(
+            project_root, args.plugins, args.shared_bundle_min_sources
+        )
+        analyzer.generate_shared_bundle_report(plan)
+        if args.shared_bundle_output:
+            analyzer.write_shared_bundle(plan, args.shared_bundle_output)
+        return
+
+    # 如果只统计语言文件开销
+    if args.footprint:
+        footprints = analyzer.measure_footprint(
+            project_root, args.plugins, args.long_value_threshold
+        )
+        analyzer.generate_footprint_report(footprints)
+
+        budget = FootprintBudget(
+            max_bytes=args.budget_bytes,
+            max_keys=args.budget_keys,
+            max_depth=args.budget_depth,
+            max_parse_ms=args.budget_parse_ms,
+        )
+        violations = analyzer.check_footprint_budget(footprints, budget)
+        if violations:
+            print(f"\n[XX] 有 {len(violations)} 项超出语言包预算:")
+            for violation in violations:
+                print(f"  - {violation}")
+            exit(1)
+        print("\n[OK] 所有语言包都在预算之内!")
+        exit(0)
 
-    analyzer = LanguageAnalyzer()
     results, best_practices_results = analyzer.analyze_project(
         project_root, args.plugins
     )
 
+    # 如果需要写出基线
+    if args.write_baseline:
+        findings = analyzer.collect_fingerprints(results, best_practices_results)
+        analyzer.write_baseline(args.write_baseline, findings)
+        print(f"\n[OK] 已将 {len(findings)} 个问题写入基线: {args.write_baseline}")
+        return
+
     # 如果只检查最佳实践
     if args.check_best_practices:
         analyzer.generate_best_practices_report(best_practices_results)
@@ -775,7 +3311,13 @@ def main():
             exit(0)
 
     # 生成完整报告
-    analyzer.generate_report(results, best_practices_results)
+    key_history = None
+    if args.history:
+        cache_file = args.history_cache
+        if not cache_file.is_absolute():
+            cache_file = project_root / cache_file
+        key_history = analyzer.build_key_history(project_root, cache_file)
+    analyzer.generate_report(results, best_practices_results, key_history)
 
     # 如果指定了删除冗余键
     if args.remove_redundant:
@@ -4,14 +4,33 @@
 GitHub Wiki 文档准备脚本 (多模块版本)
 将 docs/ 目录下的多模块文档转换为 GitHub Wiki 格式
 动态检测所有模块并自动生成Wiki文档
+
+docs/ 下的页面在内存中渲染并验证链接后，增量写入 wiki/ 目录（或输出为
+zip 归档、git fast-import 流），同时生成全文搜索索引并检查文档中引用的
+Kotlin API 是否仍然存在。各阶段的细节见对应函数的说明。
 """
 
+import argparse
+import contextlib
+import hashlib
+import json
 import os
+import posixpath
 import re
 import shutil
+import subprocess
 import sys
+import time
+import unicodedata
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import NamedTuple
+from urllib.parse import unquote
 
 # 设置输出编码
 if sys.platform.startswith("win"):
@@ -66,6 +85,109 @@ FILE_NAME_MAPPING = {
     "scheduler-lifecycle-best-practices.md": "调度器生命周期最佳实践",
 }
 
+# Markdown 分词与导航模式
+FENCE_PATTERN = re.compile(r"^\s*(`{3,}|~{3,})")
+HEADING_PATTERN = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+REFERENCE_DEFINITION_PATTERN = re.compile(
+    r"^ {0,3}\[([^\]]+)\]:[ \t]*(\S+)(?:[ \t]+(?:\"[^\"]*\"|'[^']*'|\([^)]*\)))?[ \t]*$"
+)
+INLINE_PATTERN = re.compile(r"(?P<code>`+)|\[(?P<label>[^\]]+)\]\((?P<target>[^)]+)\)")
+THEMATIC_BREAK_PREFIX = "---"
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+BACK_TO_INDEX_PATTERN = re.compile(r"---\n\n\*\*返回目录\*\* → \[📚 README\]\([^)]+\)")
+
+# 已更名文档的链接别名（docs 相对路径）
+LINK_ALIASES = {
+    "core/schedule.md": "core/scheduler.md",
+}
+
+# git fast-import 输出
+DEFAULT_WIKI_BRANCH = "master"
+DEFAULT_COMMITTER = ("github-actions[bot]", "41898282+github-actions[bot]@users.noreply.github.com")
+HOME_TIMESTAMP_PATTERN = re.compile(r"^🔄 \*\*最后更新\*\*: .*$", re.MULTILINE)
+
+# 资源文件（图片、示例配置等）按内容哈希命名存放
+ASSET_DIR = "assets"
+ASSET_HASH_LENGTH = 16
+# 带 URL scheme 的链接（http:、mailto:、data: 等）不是本地文件
+URL_SCHEME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+
+# 全文搜索索引
+SEARCH_INDEX_DIR = "_search"
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_SHARDS = 16
+SEARCH_MAX_OFFSETS = 3
+SEARCH_BODY_WEIGHT = 1
+SEARCH_HEADING_WEIGHTS = {1: 8, 2: 5, 3: 3}
+SEARCH_DEFAULT_HEADING_WEIGHT = 2
+SEARCH_TERM_PATTERN = re.compile(
+    r"[A-Za-z0-9_]{2,}|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+)
+
+# Kotlin 符号索引（校验文档中的 API 引用）
+DEFAULT_KOTLIN_ROOTS = (Path("modules"), Path("buildSrc"))
+DEFAULT_SYMBOL_CACHE_PATH = Path("build") / "kotlin-symbols.json"
+KOTLIN_SKIP_DIRS = {"build", "out", "node_modules"}
+# 单次扫描：注释和字符串只用于跳过，import 记录外部名称，其余为声明
+KOTLIN_LEXICAL_PATTERN = re.compile(
+    r'''
+    /\*.*?\*/ | //[^\n]* | """.*?""" | "(?:\\.|[^"\\\n])*" | '(?:\\.|[^'\\\n])*'
+    | ^[ \t]*import[ \t]+(?P<import>[\w.]+)(?:[ \t]+as[ \t]+(?P<alias>\w+))?
+    | \b(?P<kind>class|interface|object|typealias|fun|val|var)[ \t]+
+      (?:<[^>\n]*>[ \t]*)?
+      (?:[\w.]+(?:<[^>\n]*>)?\??\.)?
+      (?P<name>[A-Za-z_]\w*)
+    ''',
+    re.DOTALL | re.MULTILINE | re.VERBOSE,
+)
+KOTLIN_KEYWORDS = {"class", "interface", "object", "fun", "val", "var", "constructor", "operator", "infix"}
+# 文档中的行内代码引用：Name、Name.member、name()、Name.member()
+API_REFERENCE_SKIP_SUFFIXES = (".kt", ".kts", ".java", ".md", ".yml", ".yaml", ".json", ".gradle")
+API_REFERENCE_PATTERN = re.compile(r"^(?P<head>[A-Za-z_]\w*)(?P<tail>(?:\.[A-Za-z_]\w*)*)(?P<call>\(\))?$")
+# 项目之外的已知类型（Kotlin/Java 标准库、Bukkit/Paper、Adventure、协程），
+# 源码中未 import 时也不报告；项目特有的名称用 --symbol-allowlist 文件补充
+KNOWN_EXTERNAL_SYMBOLS = frozenset({
+    # Kotlin / Java 标准库
+    "Any", "Unit", "Nothing", "String", "Int", "Long", "Short", "Byte", "Double", "Float",
+    "Boolean", "Char", "Array", "List", "MutableList", "Map", "MutableMap", "Set", "MutableSet",
+    "Collection", "Iterable", "Sequence", "Pair", "Triple", "Result", "Lazy", "Regex",
+    "Comparable", "Comparator", "Enum", "Throwable", "Exception", "Error", "Thread", "Runnable",
+    "System", "Math", "Optional", "UUID", "File", "Path", "Files", "URL", "URI",
+    "Duration", "Instant", "LocalDate", "LocalDateTime", "TimeUnit", "ThreadLocal",
+    "AutoCloseable", "Closeable", "Charset", "StandardCharsets", "Logger", "Level",
+    "ConcurrentHashMap", "CompletableFuture", "AtomicInteger", "AtomicLong", "AtomicBoolean",
+    "AtomicReference", "WeakReference", "ReentrantLock", "Executor", "ExecutorService",
+    # Bukkit / Paper
+    "Bukkit", "Server", "Plugin", "JavaPlugin", "PluginManager", "Player", "OfflinePlayer",
+    "CommandSender", "ConsoleCommandSender", "Entity", "LivingEntity", "World", "Location",
+    "Block", "BlockFace", "Chunk", "Material", "ItemStack", "ItemMeta", "SkullMeta", "Inventory",
+    "InventoryView", "InventoryHolder", "InventoryType", "ClickType", "InventoryAction",
+    "Sound", "SoundCategory", "Particle", "Color", "ChatColor", "GameMode", "Enchantment",
+    "PotionEffect", "PotionEffectType", "NamespacedKey", "PersistentDataContainer",
+    "PersistentDataType", "BukkitRunnable", "BukkitTask", "BukkitScheduler", "Listener",
+    "EventHandler", "EventPriority", "Event", "Cancellable", "HandlerList",
+    "PlayerJoinEvent", "PlayerQuitEvent", "PlayerInteractEvent", "PlayerMoveEvent",
+    "AsyncPlayerChatEvent", "AsyncChatEvent", "InventoryClickEvent", "InventoryCloseEvent",
+    "InventoryDragEvent", "InventoryOpenEvent", "BlockBreakEvent", "BlockPlaceEvent",
+    "EntityDamageEvent", "EntityDamageByEntityEvent", "PlayerDeathEvent",
+    "YamlConfiguration", "ConfigurationSection", "FileConfiguration",
+    # Adventure
+    "Component", "TextComponent", "TextColor", "NamedTextColor", "TextDecoration", "Style",
+    "MiniMessage", "LegacyComponentSerializer", "Audience", "Title", "BossBar", "Key",
+    "ClickEvent", "HoverEvent",
+    # kotlinx.coroutines
+    "GlobalScope", "CoroutineScope", "CoroutineContext", "CoroutineStart", "CoroutineDispatcher",
+    "Dispatchers", "Job", "SupervisorJob", "Deferred", "Flow", "StateFlow", "SharedFlow",
+    "MutableStateFlow", "MutableSharedFlow", "Channel", "Mutex",
+})
+# 以这些后缀结尾的类型名视为 JDK/平台的异常类型
+KNOWN_EXTERNAL_SUFFIXES = ("Exception", "Error")
+
+# 增量构建清单
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_PATH = Path("build") / "wiki-manifest.json"
+DEFAULT_INDEX_CACHE_PATH = Path("build") / "wiki-docs-index.json"
+
 # 子目录文件名映射（按目录分类）
 SUBDIR_FILE_NAME_MAPPING = {
     "api": {
@@ -106,45 +228,128 @@ SUBDIR_FILE_NAME_MAPPING = {
 }
 
 
-def discover_modules():
-    """动态发现docs目录下的所有模块"""
-    docs_dir = Path("docs")
+def scan_docs_tree(source_root: Path, cache_path: Path | None = None) -> dict[str, list[str]]:
+    """单次递归 os.scandir 遍历 docs 目录，返回 模块 → 模块内 .md 相对路径列表
+
+    模块内顺序：顶层文件在前，子目录按 SUBDIR_FILE_NAME_MAPPING 中的顺序、
+    其余子目录按遍历顺序递归展开。传入 cache_path 时按目录缓存列表：目录
+    修改时间未变（没有新增、删除或重命名条目）时复用缓存而不再 scandir。
+    """
+    source_root = Path(source_root)
+    cache: dict[str, dict] = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+    new_cache: dict[str, dict] = {}
+
+    def list_dir(rel: str) -> tuple[list[str], list[str]]:
+        path = source_root / rel if rel else source_root
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = cache.get(rel)
+        if cached and cached.get("mtime_ns") == mtime_ns:
+            new_cache[rel] = cached
+            return cached["dirs"], cached["files"]
+
+        dirs, files = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # 跳过隐藏目录和特殊目录
+                if entry.name.startswith(".") or entry.name == "__pycache__":
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+        new_cache[rel] = {"mtime_ns": mtime_ns, "dirs": dirs, "files": files}
+        return dirs, files
+
+    def walk(module_id: str, rel: str, out: list[str]):
+        dirs, files = list_dir(f"{module_id}/{rel}".rstrip("/"))
+        out.extend(f"{rel}{name}" for name in files if name.endswith(".md"))
+        if not rel:
+            known = [d for d in SUBDIR_FILE_NAME_MAPPING if d in dirs]
+            dirs = known + [d for d in dirs if d not in SUBDIR_FILE_NAME_MAPPING]
+        for name in dirs:
+            walk(module_id, f"{rel}{name}/", out)
+
+    modules: dict[str, list[str]] = {}
+    module_ids, _ = list_dir("")
+    for module_id in module_ids:
+        md_paths: list[str] = []
+        walk(module_id, "", md_paths)
+        modules[module_id] = md_paths
+
+    if cache_path is not None and new_cache != cache:
+        save_manifest(cache_path, new_cache)
+    return modules
+
+
+def discover_modules(store=None, source_root: Path = Path("docs"), cache_path: Path | None = None):
+    """动态发现docs目录下的所有模块（传入 DocumentStore 时经由其读取 README）"""
+    docs_dir = Path(source_root)
     if not docs_dir.exists():
         print(f"❌ docs 目录不存在: {docs_dir.absolute()}")
         return {}
 
     modules = {}
 
-    # 遍历docs目录下的所有子目录
-    for module_dir in docs_dir.iterdir():
-        if not module_dir.is_dir():
-            continue
-
-        module_id = module_dir.name
-
-        # 跳过隐藏目录和特殊目录
-        if module_id.startswith(".") or module_id in ["__pycache__"]:
-            continue
-
+    # 单次遍历整个docs目录树
+    for module_id, md_paths in scan_docs_tree(docs_dir, cache_path).items():
         print(f"🔍 发现模块: {module_id}")
 
-        # 获取模块中的所有Markdown文件
-        md_files = list(module_dir.glob("*.md"))
-        if not md_files:
+        # 获取模块中的所有Markdown文件（包括子目录）
+        if not md_paths:
             print(f"  ⚠️ 模块 {module_id} 中没有找到Markdown文件，跳过")
             continue
 
         # 生成模块配置
-        module_config = generate_module_config(module_id, md_files)
+        module_config = generate_module_config(module_id, md_paths, store, docs_dir)
         modules[module_id] = module_config
 
-        print(f"  ✅ 发现 {len(md_files)} 个文档文件")
+        print(f"  ✅ 发现 {len(md_paths)} 个文档文件")
 
     return modules
 
 
-def generate_module_config(module_id, md_files):
-    """为模块生成配置（包含已知子目录）"""
+def derive_page_title(rel_path: str) -> str:
+    """由模块内相对路径推导页面标题（映射表作为覆盖）
+
+    - 顶层文件：FILE_NAME_MAPPING，否则由文件名生成（quick-start.md → Quick Start）
+    - 已知子目录（api/guides/...）：SUBDIR_FILE_NAME_MAPPING[子目录][其下相对路径]，
+      否则由子目录之后的各级目录名和文件名生成
+    - 其他子目录：由各级目录名和文件名生成；子目录 README 取目录名
+    """
+    def title(part: str) -> str:
+        return part.replace(".md", "").replace("-", " ").title()
+
+    parts = rel_path.split("/")
+    if len(parts) == 1:
+        return FILE_NAME_MAPPING.get(rel_path, title(rel_path))
+
+    group, rest = parts[0], parts[1:]
+    sub_mapping = SUBDIR_FILE_NAME_MAPPING.get(group)
+    if sub_mapping is not None:
+        override = sub_mapping.get("/".join(rest))
+        if override:
+            return override
+    else:
+        rest = parts
+
+    names = [title(part) for part in rest[:-1]]
+    if rest[-1] != "README.md" or not names:
+        names.append(title(rest[-1] if rest[-1] != "README.md" or sub_mapping is None else group))
+    return "-".join(names)
+
+
+def generate_module_config(module_id, md_paths, store=None, source_root: Path = Path("docs")):
+    """为模块生成配置（md_paths 为模块内全部 .md 的相对路径，含子目录）
+
+    页面名称由相对路径推导，FILE_NAME_MAPPING 和 SUBDIR_FILE_NAME_MAPPING
+    只作为覆盖。
+    """
     # 模块名称
     module_name = f"{module_id.upper()}模块"
 
@@ -152,48 +357,24 @@ def generate_module_config(module_id, md_files):
     icon = MODULE_ICONS.get(module_id, "📄")
 
     # 模块描述 (尝试从README.md中提取)
-    description = get_module_description(module_id, md_files)
+    module_dir = Path(source_root) / module_id
+    description = get_module_description(
+        module_id, [module_dir / rel for rel in md_paths if "/" not in rel], store
+    )
 
     # 生成文件映射
     files: dict[str, str] = {}
     links: dict[str, str] = {}
 
-    # 顶层 .md 文件
-    for md_file in md_files:
-        file_name = md_file.name
-
+    for rel_path in md_paths:
         # 生成Wiki页面名称
-        if file_name == "README.md":
-            wiki_name = f"{module_name}.md"
+        if rel_path == "README.md":
             link_name = module_name
         else:
-            # 获取中文描述
-            chinese_name = FILE_NAME_MAPPING.get(
-                file_name, file_name.replace(".md", "").replace("-", " ").title()
-            )
-            wiki_name = f"{module_name}-{chinese_name}.md"
-            link_name = f"{module_name}-{chinese_name}"
-
-        files[file_name] = wiki_name
-        links[file_name] = link_name
+            link_name = f"{module_name}-{derive_page_title(rel_path)}"
 
-    # 已知子目录（如 api）
-    module_dir = Path("docs") / module_id
-    for subdir, sub_mapping in SUBDIR_FILE_NAME_MAPPING.items():
-        sd = module_dir / subdir
-        if not sd.exists() or not sd.is_dir():
-            continue
-        for md_path in sd.glob("*.md"):
-            rel_key = f"{subdir}/{md_path.name}"  # 用于链接替换
-            title_key = md_path.name
-            chinese_name = sub_mapping.get(
-                title_key, title_key.replace(".md", "").replace("-", " ").title()
-            )
-            wiki_name = f"{module_name}-{chinese_name}.md"
-            link_name = wiki_name.replace(".md", "")
-
-            files[rel_key] = wiki_name
-            links[rel_key] = link_name
+        files[rel_path] = f"{link_name}.md"
+        links[rel_path] = link_name
 
     return {
         "name": module_name,
@@ -204,7 +385,7 @@ def generate_module_config(module_id, md_files):
     }
 
 
-def get_module_description(module_id, md_files):
+def get_module_description(module_id, md_files, store=None):
     """尝试从README.md中提取模块描述"""
     readme_file = None
     for md_file in md_files:
@@ -214,14 +395,16 @@ def get_module_description(module_id, md_files):
 
     if readme_file:
         try:
-            with open(readme_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                # 尝试提取第一行非标题的内容作为描述
-                lines = content.split("\n")
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith("#") and not line.startswith("---"):
-                        return line[:50] + "..." if len(line) > 50 else line
+            if store is not None:
+                content = store.read(readme_file)
+            else:
+                with open(readme_file, "r", encoding="utf-8") as f:
+                    content = f.read()
+            # 尝试提取第一行非标题、非代码块的正文作为描述
+            for _, line in iter_prose_lines(tokenize_markdown(content)):
+                line = line.strip()
+                if line and not line.startswith(THEMATIC_BREAK_PREFIX):
+                    return line[:50] + "..." if len(line) > 50 else line
         except Exception as e:
             print(f"  ⚠️ 读取 {readme_file} 失败: {e}")
 
@@ -229,12 +412,292 @@ def get_module_description(module_id, md_files):
     return f"{module_id.title()} 模块文档"
 
 
+class MarkdownToken(NamedTuple):
+    """Markdown 分词结果
+
+    kind 取值：
+    - text：普通文本
+    - fence：围栏代码块中的一整行（含起止围栏行）
+    - code：行内代码
+    - link：行内链接 [label](target)
+    - refdef：引用定义 [label]: target
+    - heading：标题标记（零宽，随后是标题行的行内分词）
+    """
+
+    kind: str
+    line: int
+    text: str
+    label: str = ""
+    target: str = ""
+    level: int = 0
+
+
+@lru_cache(maxsize=512)
+def tokenize_markdown(content: str) -> tuple[MarkdownToken, ...]:
+    """按行将 Markdown 文本切分为分词序列，所有分词的 text 拼接即为原文
+
+    链接改写、链接验证和模块描述提取共用此分词器：围栏代码块和行内代码
+    单独成词，其中类似 [x](y) 的文本不会被当作链接。结果按内容缓存，同一
+    页面在一次构建中只解析一次。
+    """
+    tokens: list[MarkdownToken] = []
+    fence: str | None = None
+
+    for line_no, line in enumerate(content.splitlines(keepends=True), 1):
+        body = line.rstrip("\r\n")
+
+        fence_match = FENCE_PATTERN.match(body)
+        if fence is not None:
+            tokens.append(MarkdownToken("fence", line_no, line))
+            if fence_match and fence_match.group(1)[0] == fence[0] \
+                    and len(fence_match.group(1)) >= len(fence) \
+                    and not body.strip().strip(fence[0]):
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            tokens.append(MarkdownToken("fence", line_no, line))
+            continue
+
+        refdef_match = REFERENCE_DEFINITION_PATTERN.match(body)
+        if refdef_match:
+            tokens.append(MarkdownToken(
+                "refdef", line_no, line, label=refdef_match.group(1), target=refdef_match.group(2)
+            ))
+            continue
+
+        heading_match = HEADING_PATTERN.match(body)
+        if heading_match:
+            tokens.append(MarkdownToken(
+                "heading", line_no, "",
+                label=(heading_match.group(2) or "").strip(),
+                level=len(heading_match.group(1)),
+            ))
+
+        tokens.extend(_tokenize_inline(line, line_no))
+
+    return tuple(tokens)
+
+
+def _tokenize_inline(line: str, line_no: int) -> list[MarkdownToken]:
+    """切分一行中的行内代码、链接和普通文本"""
+    tokens: list[MarkdownToken] = []
+    position = 0
+    text_start = 0
+
+    while True:
+        match = INLINE_PATTERN.search(line, position)
+        if not match:
+            break
+
+        start, end = match.span()
+        if match.group("code"):
+            # 行内代码：寻找等长的结束反引号串，找不到时按普通文本处理
+            ticks = match.group("code")
+            closing = re.compile(rf"(?<!`){ticks}(?!`)").search(line, end)
+            if not closing:
+                position = end
+                continue
+            end = closing.end()
+            token = MarkdownToken("code", line_no, line[start:end])
+        else:
+            token = MarkdownToken(
+                "link", line_no, line[start:end],
+                label=match.group("label"), target=match.group("target"),
+            )
+
+        if start > text_start:
+            tokens.append(MarkdownToken("text", line_no, line[text_start:start]))
+        tokens.append(token)
+        position = text_start = end
+
+    if text_start < len(line):
+        tokens.append(MarkdownToken("text", line_no, line[text_start:]))
+    return tokens
+
+
+def render_tokens(tokens, rewrite_target) -> str:
+    """拼接分词为文本；rewrite_target(token) 返回新的链接目标或 None（保持原样）"""
+    parts = []
+    for token in tokens:
+        if token.kind == "link":
+            target = rewrite_target(token)
+            parts.append(token.text if target is None else f"[{token.label}]({target})")
+        elif token.kind == "refdef":
+            target = rewrite_target(token)
+            if target is None:
+                parts.append(token.text)
+            else:
+                head, sep, tail = token.text.partition("]:")
+                parts.append(head + sep + tail.replace(token.target, target, 1))
+        else:
+            parts.append(token.text)
+    return "".join(parts)
+
+
+def iter_prose_lines(tokens):
+    """逐行返回围栏代码块和标题之外的正文 (行号, 文本)"""
+    line_no = 0
+    parts: list[str] = []
+    skip = False
+    for token in tokens:
+        if token.line != line_no:
+            if parts and not skip:
+                yield line_no, "".join(parts).rstrip("\r\n")
+            line_no, parts, skip = token.line, [], False
+        if token.kind in ("fence", "heading", "refdef"):
+            skip = True
+        parts.append(token.text)
+    if parts and not skip:
+        yield line_no, "".join(parts).rstrip("\r\n")
+
+
+def github_slug(text: str) -> str:
+    """按 GitHub（github-slugger）规则生成标题锚点
+
+    转小写，保留字母（含中日韩文字）、数字、组合标记、连接标点、连字符
+    和空格，去掉其余标点与符号（包括 emoji），空格替换为连字符。
+    """
+    kept = []
+    for char in text.lower():
+        if char == " ":
+            kept.append("-")
+        elif char == "-" or unicodedata.category(char)[0] in "LNM" or unicodedata.category(char) == "Pc":
+            kept.append(char)
+    return "".join(kept)
+
+
+def heading_plain_text(label: str) -> str:
+    """去掉标题中的行内 Markdown（链接取文本、行内代码去反引号、HTML 标签）"""
+    parts = []
+    for token in _tokenize_inline(label, 0):
+        if token.kind == "link":
+            parts.append(token.label)
+        elif token.kind == "code":
+            parts.append(token.text.strip("`").strip())
+        else:
+            parts.append(token.text)
+    return HTML_TAG_PATTERN.sub("", "".join(parts))
+
+
+def build_anchor_index(tokens) -> frozenset[str]:
+    """计算页面所有标题的锚点，重复标题依次追加 -1、-2 后缀"""
+    anchors: set[str] = set()
+    occurrences: dict[str, int] = {}
+    for token in tokens:
+        if token.kind != "heading":
+            continue
+        base = github_slug(heading_plain_text(token.label))
+        slug = base
+        while slug in anchors:
+            occurrences[base] = occurrences.get(base, 0) + 1
+            slug = f"{base}-{occurrences[base]}"
+        anchors.add(slug)
+    return frozenset(anchors)
+
+
+class LinkResolver:
+    """由全局链接映射一次性构建的链接解析器
+
+    - 相对链接先按当前文件目录解析，再规范化为 docs 相对路径
+      （如 gui/../core/README.md → core/README.md）后直接查表
+    - 各模块 README 建立索引，未知页面/缺失的资源回退到目标模块主页
+    - LINK_ALIASES 修正已更名的文档路径
+    - assets 中的资源文件（docs 相对路径 → 哈希路径）改写为 Wiki 中的哈希路径
+    - 解析结果按 (模块, 源文件目录, 原始链接) 缓存，同一链接只解析一次
+    """
+
+    def __init__(self, global_links: dict[str, str], assets: dict[str, str] | None = None):
+        self.global_links = global_links
+        self.assets = assets or {}
+        self.module_readmes = {
+            key.split("/", 1)[0]: target
+            for key, target in global_links.items()
+            if key.count("/") == 1 and key.endswith("/README.md")
+        }
+        self._cache: dict[tuple[str, str, str], str | None] = {}
+
+    def resolve(self, module_id: str, source_dir: str, link: str) -> str | None:
+        """解析链接目标，返回 Wiki 页面名（含锚点）；无需改写时返回 None"""
+        cache_key = (module_id, source_dir, link)
+        try:
+            return self._cache[cache_key]
+        except KeyError:
+            target = self._cache[cache_key] = self._resolve(module_id, source_dir, link)
+            return target
+
+    def _resolve(self, module_id: str, source_dir: str, link: str) -> str | None:
+        # 外部链接（包括 mailto: 等其他 scheme）
+        if link.startswith("http") or "://" in link or URL_SCHEME_PATTERN.match(link):
+            return None
+
+        # 分离锚点
+        base, sep, anchor = link.partition("#")
+        base = normalize_rel_path(base.partition("?")[0])
+
+        # 纯锚点链接保持原样
+        if not base:
+            return None
+
+        # 基于当前文件目录解析相对路径，并规范化为 docs 相对路径
+        abs_rel = posixpath.normpath(posixpath.join(source_dir, base))
+        docs_key = posixpath.normpath(f"{module_id}/{abs_rel}")
+        suffix = f"#{anchor}" if sep and anchor else ""
+
+        target = None
+        if base.endswith(".md"):
+            # 候选键：规范化路径 → 原始相对键（如子目录页面引用模块顶层页面）
+            # → 按 docs 根目录解释（子目录中少写一级 ../ 的跨模块链接）
+            for key in (docs_key, f"{module_id}/{base}", abs_rel):
+                target = self.global_links.get(key) or self.global_links.get(
+                    LINK_ALIASES.get(key, "")
+                )
+                if target:
+                    break
+        elif docs_key in self.assets:
+            return f"{self.assets[docs_key]}{suffix}"
+
+        # 未收集到的资源或未知页面：回退到目标模块（跨模块）或本模块的 README
+        if not target:
+            target_module = docs_key.split("/", 1)[0]
+            target = self.module_readmes.get(target_module) or self.module_readmes.get(module_id)
+
+        if not target:
+            return None
+        return f"{target}{suffix}"
+
+
+def normalize_rel_path(rel: str) -> str:
+    """目录链接转 README.md，去掉当前目录前缀"""
+    if rel.endswith("/"):
+        rel = rel + "README.md"
+    if rel.startswith("./"):
+        rel = rel[2:]
+    return rel
+
+
+def asset_key(module_id: str, source_dir: str, link: str) -> str | None:
+    """资源链接（带扩展名的非 Markdown 本地文件）的 docs 相对路径，其他链接返回 None
+
+    带 URL scheme 的链接不算资源；?query 和 #fragment 部分被忽略。返回的
+    路径可能以 ../ 开头（指向 docs 目录之外），由调用方决定如何处理。
+    """
+    if "://" in link or URL_SCHEME_PATTERN.match(link):
+        return None
+    base = normalize_rel_path(link.partition("#")[0].partition("?")[0])
+    if not base or base.endswith(".md") or not posixpath.splitext(base)[1]:
+        return None
+    return posixpath.normpath(f"{module_id}/{posixpath.join(source_dir, base)}")
+
+
 def update_links_in_content(
     content,
     module_config,
     module_id: str,
     current_source_rel: str,
     global_links: dict[str, str],
+    resolver: LinkResolver | None = None,
+    links: list | None = None,
 ):
     """更新文档内容中的链接（支持跨模块/子目录，保留锚点）
 
@@ -250,158 +713,62 @@ def update_links_in_content(
         当前处理文件相对模块目录的路径（如 'README.md' 或 'api/pages.md'）
     global_links : dict[str, str]
         全局链接映射：'module_id/relative/path.md' → 'Wiki页面名(无.md)'
+    resolver : LinkResolver, optional
+        由 global_links 构建的共享解析器；批量转换时应传入同一个实例以复用缓存
+    links : list, optional
+        传入时追加每个链接的 (源文件行号, 链接文本, 渲染后的链接目标)，供链接验证使用
     """
-    link_mapping = module_config.get("links", {})
-
-    def normalize_rel_path(rel: str) -> str:
-        # 目录链接转 README.md
-        if rel.endswith("/"):
-            rel = rel + "README.md"
-        # 去掉当前目录前缀
-        if rel.startswith("./"):
-            rel = rel[2:]
-        return rel
-
-    # 更新 Markdown 链接 [text](link)
-    def replace_link(match):
-        text = match.group(1)
-        link = match.group(2).strip()
-
-        # 外部链接或锚点链接
-        if link.startswith("http") or "://" in link:
-            return match.group(0)
+    if resolver is None:
+        resolver = LinkResolver(global_links)
+    source_dir = posixpath.dirname(current_source_rel)
 
-        # 分离锚点
-        anchor = None
-        if "#" in link:
-            base, anchor = link.split("#", 1)
-        else:
-            base = link
+    # 更新 Markdown 链接 [text](link) 与引用定义；“下一步”导航链接也在这一遍中
+    # 解析，代码块和行内代码中的内容保持原样
+    def rewrite_target(token):
+        target = resolver.resolve(module_id, source_dir, token.target.strip())
+        if links is not None:
+            links.append((token.line, token.label, token.target if target is None else target))
+        return target
 
-        base = normalize_rel_path(base)
+    content = render_tokens(tokenize_markdown(content), rewrite_target)
 
-        # 如果源是空，保持原样；若为非.md，尝试回退到对应模块的README
-        if not base:
-            return match.group(0)
-        if not base.endswith(".md"):
-            from pathlib import PurePosixPath
-            import posixpath as _pp
-
-            base_dir = PurePosixPath(current_source_rel).parent
-            abs_rel = _pp.normpath(str(PurePosixPath(base_dir).joinpath(base)))
-
-            target = None
-            # 跨模块：回退到目标模块README
-            if abs_rel.startswith("../"):
-                parts = abs_rel.split("/")
-                if len(parts) >= 2 and parts[0] == "..":
-                    target_mod = parts[1]
-                    readme_key = f"{target_mod}/README.md"
-                    for k, v in global_links.items():
-                        if k == readme_key:
-                            target = v
-                            break
-            # 同模块：回退到本模块README
-            if not target:
-                readme_key = f"{module_id}/README.md"
-                target = global_links.get(readme_key)
-
-            if not target:
-                return match.group(0)
-            return f"[{text}]({target}{('#' + anchor) if anchor else ''})"
-
-        # 基于当前文件目录解析相对路径到 docs 下绝对模块路径（规范化 .. 和重复分隔符）
-        from pathlib import PurePosixPath
-        import posixpath as _pp
-
-        base_dir = PurePosixPath(current_source_rel).parent
-        abs_rel = _pp.normpath(str(PurePosixPath(base_dir).joinpath(base)))
-
-        # 组装全局查找 key
-        global_key = f"{module_id}/{abs_rel}"
-
-        target = None
-        if global_key in global_links:
-            target = global_links[global_key]
-        elif abs_rel in link_mapping:
-            # 同模块的直接映射（不带模块前缀）
-            target = link_mapping[abs_rel]
-        elif base in link_mapping:
-            # 退回原始相对键
-            target = link_mapping[base]
-        else:
-            # 跨模块相对路径，如 ../core/README.md
-            norm = _pp.normpath(abs_rel)
-            cross_key = f"{module_id}/{norm}"
-            target = global_links.get(cross_key)
-
-            # 额外别名修正：core/schedule.md → core/scheduler.md
-            if not target and (
-                norm.endswith("core/schedule.md") or norm == "core/schedule.md"
-            ):
-                alias_norm = norm.replace("core/schedule.md", "core/scheduler.md")
-                alias_key = f"{module_id}/{alias_norm}"
-                target = global_links.get(alias_key)
-
-            # 退化：若仍找不到且是跨模块引用，回退到目标模块README
-            if not target and norm.startswith("../"):
-                # 提取 '../<mod>/' 的模块名
-                parts = norm.split("/")
-                if len(parts) >= 2 and parts[0] == "..":
-                    target_mod = parts[1]
-                    readme_key = f"{target_mod}/README.md"
-                    # 在全局映射中查找该模块的主页
-                    for k, v in global_links.items():
-                        if k == readme_key:
-                            target = v
-                            break
-
-            # 退化：同模块内未知页面回退到本模块README
-            if not target:
-                readme_key = f"{module_id}/README.md"
-                if readme_key in global_links:
-                    target = global_links[readme_key]
+    # 移除 "返回目录" 链接
+    content = BACK_TO_INDEX_PATTERN.sub("", content)
 
-        if not target:
-            return match.group(0)
-
-        if anchor:
-            return f"[{text}]({target}#{anchor})"
-        return f"[{text}]({target})"
-
-    # 替换链接
-    content = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", replace_link, content)
-
-    # 标准化 “下一步” 链接格式
-    def repl_next(m):
-        raw_link = m.group(2)
-        # 复用上面的替换器逻辑（构造一个假的匹配对象不方便，这里尝试直接走全局映射）
-        link_only = raw_link.split("#", 1)[0]
-        link_only = normalize_rel_path(link_only)
-        from pathlib import PurePosixPath
-
-        abs_rel = str(
-            PurePosixPath(PurePosixPath(current_source_rel).parent)
-            .joinpath(link_only)
-            .as_posix()
-        )
-        global_key = f"{module_id}/{abs_rel}"
-        target = global_links.get(global_key, link_mapping.get(link_only, raw_link))
-        return f"---\n\n**下一步** → [{m.group(1)}]({target})"
+    return content
 
-    content = re.sub(
-        r"---\n\n\*\*下一步\*\* → \[([^\]]+)\]\(([^)]+)\)", repl_next, content
-    )
 
-    # 移除 "返回目录" 链接
-    content = re.sub(r"---\n\n\*\*返回目录\*\* → \[📚 README\]\([^)]+\)", "", content)
+def source_timestamp(source_root: Path) -> str | None:
+    """文档源的确定性更新时间（UTC）：优先 SOURCE_DATE_EPOCH，其次 source_root
+    最后一次提交的时间；都无法获得时返回 None
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(source_root), "log", "-1", "--format=%ct", "--", "."],
+                capture_output=True, text=True,
+            )
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        epoch = result.stdout.strip()
+    try:
+        moment = datetime.fromtimestamp(int(epoch), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return moment.strftime("%Y-%m-%d %H:%M:%S UTC")
 
-    return content
 
+def create_home_page(modules, updated_at=None):
+    """创建主页
 
-def create_home_page(modules):
-    """创建主页"""
-    """创建主页"""
+    updated_at 为页脚中的更新时间，默认取当前时间；增量构建时传入空串
+    计算不含时间戳的内容哈希，避免仅因时间变化就重写主页。
+    """
+    if updated_at is None:
+        updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     content = """# 📚 项目文档
 
@@ -467,7 +834,7 @@ def create_home_page(modules):
 
 📝 **文档更新**: 此文档由 GitHub Actions 自动同步
 🔄 **最后更新**: """
-        + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        + updated_at
         + """
 """
     )
@@ -604,151 +971,1075 @@ def create_sidebar(modules):
     return content
 
 
-def prepare_wiki_docs():
-    """准备 Wiki 文档"""
+def hash_text(text: str) -> str:
+    """计算文本内容的 SHA-256 哈希"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-    target_dir = Path("wiki")
 
-    # 创建目标目录
-    if target_dir.exists():
-        shutil.rmtree(target_dir)
-    target_dir.mkdir(parents=True)
+def generator_hash() -> str:
+    """本脚本自身的哈希：转换逻辑变化时使所有页面失效"""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
 
-    print("开始准备多模块 GitHub Wiki 文档...")
 
-    # 动态发现模块
-    print("🔍 扫描模块...")
-    modules = discover_modules()
+def load_manifest(manifest_path: Path) -> dict:
+    """读取构建清单，格式不兼容或损坏时返回空清单"""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    if not modules:
-        print("❌ 未发现任何模块，请检查docs目录结构")
-        return
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
 
-    print(f"✅ 发现 {len(modules)} 个模块: {', '.join(modules.keys())}")
 
-    # 创建主页
-    print("创建主页...")
-    home_content = create_home_page(modules)
-    with open(target_dir / "Home.md", "w", encoding="utf-8") as f:
-        f.write(home_content)
+def save_manifest(manifest_path: Path, manifest: dict):
+    """原子写入构建清单"""
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
 
-    # 创建侧边栏
-    print("创建侧边栏...")
-    sidebar_content = create_sidebar(modules)
-    with open(target_dir / "_Sidebar.md", "w", encoding="utf-8") as f:
-        f.write(sidebar_content)
 
-    # 构建全局链接映射：module_id/relative/path.md → Wiki页面名(无.md)
-    global_links: dict[str, str] = {}
-    for mid, mconf in modules.items():
-        for src_rel, tgt in mconf.get("files", {}).items():
-            key = f"{mid}/{src_rel}"
-            global_links[key] = tgt.replace(".md", "")
+def is_output_current(target_path: Path, entry: dict | None, input_hash: str) -> bool:
+    """输入哈希一致且输出文件未被外部修改（大小和修改时间与清单一致）"""
+    if not entry or entry.get("input") != input_hash:
+        return False
+    try:
+        stat = target_path.stat()
+    except OSError:
+        return False
+    return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
 
-    # 处理每个模块
-    for module_id, module_config in modules.items():
-        print(f"\n处理模块: {module_config['name']}")
 
-        source_dir = Path(f"docs/{module_id}")
-        if not source_dir.exists():
-            print(f"警告: 模块目录不存在: {source_dir}")
-            continue
+def write_output(target_path: Path, content: str, input_hash: str, entry: dict | None) -> tuple[dict, bool]:
+    """写入页面（输出内容与上次相同且文件完好时不重写），返回 (清单条目, 是否写入)"""
+    output_hash = hash_text(content)
+    written = False
 
-        file_mapping = module_config.get("files", {})
+    unchanged = (
+        entry is not None
+        and entry.get("output") == output_hash
+        and is_output_current(target_path, entry, entry.get("input"))
+    )
+    if not unchanged:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(target_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        written = True
 
-        # 处理模块的每个文件
-        for source_file, target_file in file_mapping.items():
-            source_path = source_dir / source_file
-            target_path = target_dir / target_file
+    stat = target_path.stat()
+    return {
+        "input": input_hash,
+        "output": output_hash,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }, written
 
-            if not source_path.exists():
-                print(f"警告: 源文件不存在: {source_path}")
-                continue
 
-            print(f"处理文件: {module_id}/{source_file} -> {target_file}")
+class RenderedPage(NamedTuple):
+    """内存中渲染完成、等待写盘的 Wiki 页面"""
+
+    name: str                # 输出文件名（如 GUI模块.md）
+    module: str | None       # 所属模块，主页/侧边栏为 None
+    source_rel: str | None   # 相对模块目录的源文件路径（如 api/pages.md）
+    source: str | None       # 源文件路径（如 docs/gui/README.md）
+    content: str
+    input_hash: str
+    links: tuple             # (源文件行号, 链接文本, 渲染后的链接目标)
+    anchors: frozenset = frozenset()  # 标题锚点（GitHub 规则）
+
 
-            # 读取源文件内容
-            with open(source_path, "r", encoding="utf-8") as f:
+class DocumentStore:
+    """构建期间的内存文档存储
+
+    每个源文件只从磁盘读取一次，所有页面渲染完成并通过链接验证后才写盘。
+    """
+
+    def __init__(self):
+        self.sources: dict[str, str] = {}
+        self.pages: dict[str, RenderedPage] = {}
+        self.assets: dict[str, Path] = {}  # 哈希路径（如 assets/xxxx.png）→ 源文件
+        self.reads = 0
+
+    def read(self, path: Path) -> str:
+        """读取源文件（已读取过时直接返回缓存内容）"""
+        key = path.as_posix()
+        content = self.sources.get(key)
+        if content is None:
+            with open(path, "r", encoding="utf-8") as f:
                 content = f.read()
+            self.sources[key] = content
+            self.reads += 1
+        return content
 
-            # 更新链接（带全局映射与当前上下文）
-            content = update_links_in_content(
-                content,
-                module_config,
-                module_id=module_id,
-                current_source_rel=source_file,
-                global_links=global_links,
-            )
+    def add_page(self, page: RenderedPage):
+        self.pages[page.name] = page
 
-            # 写入目标文件
-            with open(target_path, "w", encoding="utf-8") as f:
-                f.write(content)
+    def add_asset(self, name: str, path: Path):
+        self.assets.setdefault(name, path)
 
-    print("\nWiki 文档准备完成!")
-    print(f"输出目录: {target_dir.absolute()}")
+    def page_names(self) -> set[str]:
+        """所有页面名（不含 .md），用于链接验证"""
+        return {name[:-3] if name.endswith(".md") else name for name in self.pages}
 
-    # 显示文件列表
-    print("\n生成的文件:")
-    for file in sorted(target_dir.glob("*.md")):
-        print(f"  - {file.name}")
 
+def collect_links(content: str) -> tuple[tuple, frozenset[str]]:
+    """提取生成页面（主页、侧边栏）中的链接和标题锚点"""
+    tokens = tokenize_markdown(content)
+    links = tuple(
+        (token.line, token.label, token.target)
+        for token in tokens
+        if token.kind in ("link", "refdef")
+    )
+    return links, build_anchor_index(tokens)
 
-def validate_links():
-    """验证链接的有效性"""
 
-    wiki_dir = Path("wiki")
-    if not wiki_dir.exists():
-        print("错误: Wiki 目录不存在，请先运行 prepare_wiki_docs()")
-        return
+def hash_file(path: Path) -> str:
+    """按块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    print("\n验证链接...")
 
-    # 获取所有 Wiki 页面名称
-    wiki_pages = set()
-    for file in wiki_dir.glob("*.md"):
-        page_name = file.stem
-        wiki_pages.add(page_name)
+def collect_assets(
+    store: DocumentStore, sources, contents, source_root: Path
+) -> tuple[dict[str, str], list[tuple], list[tuple]]:
+    """收集页面引用的资源文件，按内容哈希登记到 store.assets
 
-    # 检查每个文件中的链接
-    broken_links = []
+    返回 (资源映射 docs 相对路径 → 哈希路径, 缺失资源, docs 目录之外的资源)，
+    后两者的元素均为 (源文件, 行号, 链接文本, 链接)。内容相同的文件（如多个
+    模块共用的截图）只保存一份；docs 目录之外的文件不会被发布。
+    """
+    assets: dict[str, str] = {}
+    missing: list[tuple] = []
+    outside: list[tuple] = []
+    for (module_id, _, source_file, _, source_path), content in zip(sources, contents):
+        source_dir = posixpath.dirname(source_file)
+        for token in tokenize_markdown(content):
+            if token.kind not in ("link", "refdef"):
+                continue
+            key = asset_key(module_id, source_dir, token.target.strip())
+            if key is None or key in assets:
+                continue
+            if key == ".." or key.startswith("../"):
+                outside.append((source_path.as_posix(), token.line, token.label, token.target))
+                continue
 
-    for file in wiki_dir.glob("*.md"):
-        with open(file, "r", encoding="utf-8") as f:
-            content = f.read()
+            path = Path(source_root) / key
+            if not path.is_file():
+                missing.append((source_path.as_posix(), token.line, token.label, token.target))
+                continue
+            name = f"{ASSET_DIR}/{hash_file(path)[:ASSET_HASH_LENGTH]}{path.suffix.lower()}"
+            assets[key] = name
+            store.add_asset(name, path)
+    return assets, missing, outside
 
-        # 查找所有链接
-        links = re.findall(r"\[([^\]]+)\]\(([^)]+)\)", content)
 
-        for text, link in links:
+def link_asset(source: Path, target: Path) -> bool:
+    """将资源文件放到输出位置：优先硬链接，跨文件系统等情况回退为复制
+
+    返回是否使用了硬链接。资源按内容哈希命名，目标已存在即内容相同。
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+        return True
+    except OSError:
+        temp_path = target.with_name(target.name + ".tmp")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+        return False
+
+
+# 所有页面共享的渲染上下文（模块配置、链接解析器、链接映射哈希），由
+# init_render_context 在每个工作进程/线程池启动时设置一次，不随任务传递
+_render_context: dict = {}
+
+
+def init_render_context(modules: dict, resolver: LinkResolver, link_map_hash: str):
+    """设置 render_page 使用的共享上下文（作为执行器的 initializer 调用）"""
+    _render_context["modules"] = modules
+    _render_context["resolver"] = resolver
+    _render_context["link_map_hash"] = link_map_hash
+
+
+def render_page(job) -> RenderedPage:
+    """在内存中渲染单个页面（更新链接并记录链接位置）
+
+    在线程池或进程池中执行，不访问磁盘。任务只包含页面自身的数据，
+    共享数据来自 init_render_context 设置的上下文。
+    """
+    module_id, source_file, target_file, source_path, content = job
+    module_config = _render_context["modules"][module_id]
+    resolver = _render_context["resolver"]
+    link_map_hash = _render_context["link_map_hash"]
+
+    # 输入哈希：源内容 + 链接映射 + 源路径（决定相对链接的解析）
+    input_hash = hash_text(f"{module_id}/{source_file}\0{link_map_hash}\0{content}")
+
+    # 标题锚点索引（标题文本不受链接改写影响，直接基于源文件分词）
+    anchors = build_anchor_index(tokenize_markdown(content))
+
+    # 更新链接（带全局映射与当前上下文）
+    links: list[tuple] = []
+    content = update_links_in_content(
+        content,
+        module_config,
+        module_id=module_id,
+        current_source_rel=source_file,
+        global_links=resolver.global_links,
+        resolver=resolver,
+        links=links,
+    )
+
+    return RenderedPage(
+        target_file,
+        module_id,
+        source_file,
+        source_path,
+        content,
+        input_hash,
+        tuple(links),
+        anchors,
+    )
+
+
+def validate_links(store: DocumentStore) -> tuple[list[tuple], list[tuple]]:
+    """在内存中验证所有页面的链接和锚点
+
+    返回 (无效链接, 无效锚点)，元素均为 (源文件, 行号, 链接文本, 链接)。
+    锚点（包括同页 #fragment）按目标页面的标题锚点索引查找。
+    """
+    wiki_pages = store.page_names()
+    broken_links = []
+    broken_anchors = []
+
+    for page in store.pages.values():
+        for line, text, link in page.links:
             # 跳过外部链接
             if link.startswith("http") or "://" in link:
                 continue
 
-            # 忽略锚点，取页面名部分
-            link_base = link.split("#", 1)[0]
+            # 分离页面名与锚点
+            link_base, _, fragment = link.partition("#")
+
+            # 资源链接已在收集阶段检查（缺失的资源另行报告）
+            if link_base in store.assets or "." in link_base and link_base not in wiki_pages:
+                continue
+
+            # 检查内部Wiki页面链接（空页面名表示当前页面）
+            if link_base and link_base not in wiki_pages:
+                broken_links.append((page.source or page.name, line, text, link))
+                continue
+
+            if fragment:
+                target_page = store.pages[f"{link_base}.md"] if link_base else page
+                if unquote(fragment).lower() not in target_page.anchors:
+                    broken_anchors.append((page.source or page.name, line, text, link))
+
+    return broken_links, broken_anchors
+
+
+def scan_kotlin_symbols(content: str) -> tuple[list, list]:
+    """单次词法扫描 Kotlin 源码，返回 (声明 [名称, 类型, 行号] 列表, import 的简单名称列表)
+
+    注释和字符串字面量中的内容被跳过；扩展函数/属性记录为成员名。
+    """
+    declarations = []
+    imports = []
+    line = 1
+    position = 0
+    for match in KOTLIN_LEXICAL_PATTERN.finditer(content):
+        if match.group("import"):
+            imports.append(match.group("alias") or match.group("import").rsplit(".", 1)[-1])
+        elif match.group("name") and match.group("name") not in KOTLIN_KEYWORDS:
+            line += content.count("\n", position, match.start("name"))
+            position = match.start("name")
+            declarations.append([match.group("name"), match.group("kind"), line])
+    return declarations, imports
+
+
+class SymbolIndex:
+    """项目 Kotlin 声明的索引，名称查找为 O(1)
+
+    declarations: 名称 → [(类型, 文件, 行号), ...]
+    imports: 源码中 import 过的简单名称（项目之外的已知 API）
+    external: 源码未 import 但已知存在的外部名称（内置列表 + 允许列表文件）
+    """
+
+    def __init__(self, files: dict[str, dict], external: set[str] | frozenset = KNOWN_EXTERNAL_SYMBOLS):
+        self.declarations: dict[str, list[tuple]] = {}
+        self.imports: set[str] = set()
+        self.external = set(external)
+        for path, entry in files.items():
+            for name, kind, line in entry["declarations"]:
+                self.declarations.setdefault(name, []).append((kind, path, line))
+            self.imports.update(entry["imports"])
+
+    def is_declared(self, name: str) -> bool:
+        return name in self.declarations
+
+    def is_known(self, name: str) -> bool:
+        return (
+            name in self.declarations
+            or name in self.imports
+            or name in self.external
+            or name.endswith(KNOWN_EXTERNAL_SUFFIXES)
+        )
+
+
+def load_symbol_allowlist(path: Path) -> set[str]:
+    """读取符号允许列表文件：每行一个名称，# 之后为注释"""
+    names = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            name = line.split("#", 1)[0].strip()
+            if name:
+                names.add(name)
+    return names
+
+
+def build_symbol_index(
+    kotlin_roots, cache_path: Path | None = None, allowlist: set[str] | None = None
+) -> SymbolIndex:
+    """扫描 kotlin_roots 下的 .kt/.kts 文件建立符号索引
+
+    传入 cache_path 时按文件缓存扫描结果：大小和修改时间未变的文件直接
+    复用缓存，只重新扫描新增或修改的文件。allowlist 中的名称与内置的
+    KNOWN_EXTERNAL_SYMBOLS 一起视为已知的外部名称。
+    """
+    if isinstance(kotlin_roots, (str, Path)):
+        kotlin_roots = [kotlin_roots]
+    cached_files = load_manifest(cache_path).get("files", {}) if cache_path is not None else {}
+    files: dict[str, dict] = {}
+    scanned = 0
+
+    def walk(path: Path):
+        nonlocal scanned
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in KOTLIN_SKIP_DIRS:
+                        walk(Path(entry.path))
+                    continue
+                if not entry.name.endswith((".kt", ".kts")):
+                    continue
+
+                stat = entry.stat()
+                rel = Path(entry.path).as_posix()
+                cached = cached_files.get(rel)
+                if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                    files[rel] = cached
+                    continue
+
+                with open(entry.path, "r", encoding="utf-8", errors="replace") as f:
+                    declarations, imports = scan_kotlin_symbols(f.read())
+                files[rel] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "declarations": declarations,
+                    "imports": sorted(set(imports)),
+                }
+                scanned += 1
+
+    for kotlin_root in kotlin_roots:
+        if Path(kotlin_root).is_dir():
+            walk(Path(kotlin_root))
+    if cache_path is not None and files != cached_files:
+        save_manifest(cache_path, {"version": MANIFEST_VERSION, "files": files})
+
+    print(f"🔣 Kotlin 符号索引: {len(files)} 个源文件（重新扫描 {scanned} 个）")
+    return SymbolIndex(files, KNOWN_EXTERNAL_SYMBOLS | (allowlist or set()))
+
+
+def find_stale_references(content: str, index: SymbolIndex) -> list[tuple[int, str]]:
+    """查找页面行内代码中已不存在的 API 引用，返回 [(行号, 引用), ...]
+
+    只检查可以在词法层面判断的引用：
+    - 类型名（大驼峰）：项目中没有声明，源码没有 import 过，也不是已知的外部类型
+    - Type.member：Type 是项目中的类型时，member 必须有声明（全大写的枚举
+      常量除外）
+    - name()：项目中没有声明且没有 import 过的函数
+    变量接收者（如 player.name()）、全限定名（如 org.bukkit.Sound）、全大写
+    常量、文件名和普通单词不做检查。
+    """
+    stale = []
+    for token in tokenize_markdown(content):
+        if token.kind != "code":
+            continue
+        reference = token.text.strip("`").strip()
+        match = API_REFERENCE_PATTERN.match(reference)
+        if not match or reference.endswith(API_REFERENCE_SKIP_SUFFIXES):
+            continue
+
+        head = match.group("head")
+        members = match.group("tail").split(".")[1:]
+        is_type = head[0].isupper() and not head.isupper()
+        if is_type:
+            if not index.is_known(head):
+                stale.append((token.line, reference))
+            elif (
+                members and index.is_declared(head)
+                and not members[0].isupper() and not index.is_known(members[0])
+            ):
+                stale.append((token.line, reference))
+        elif match.group("call") and not members and not index.is_known(head):
+            stale.append((token.line, reference))
+    return stale
+
+
+def validate_symbols(store: DocumentStore, index: SymbolIndex) -> dict[str, list[tuple[int, str]]]:
+    """按页面检查文档中的 API 引用，返回 源文件 → [(行号, 引用), ...]"""
+    stale = {}
+    for page in store.pages.values():
+        if page.module is None:
+            continue
+        references = find_stale_references(page.content, index)
+        if references:
+            stale[page.source] = references
+    return stale
+
+
+def git_blob_hash(data: bytes) -> str:
+    """计算 git blob 对象的 SHA-1"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def read_wiki_tip(wiki_repo: Path, branch: str) -> tuple[str | None, dict[str, str]]:
+    """读取 Wiki 仓库分支的最新提交及其文件树 (路径 → blob 哈希)"""
+    result = subprocess.run(
+        ["git", "-C", str(wiki_repo), "rev-parse", "--verify", "-q", f"refs/heads/{branch}^{{commit}}"],
+        capture_output=True, text=True,
+    )
+    tip = result.stdout.strip()
+    if result.returncode != 0 or not tip:
+        return None, {}
+
+    listing = subprocess.run(
+        ["git", "-C", str(wiki_repo), "ls-tree", "-r", "-z", tip],
+        capture_output=True, check=True,
+    ).stdout
+    tree = {}
+    for record in listing.split(b"\0"):
+        if not record:
+            continue
+        meta, path = record.split(b"\t", 1)
+        _, object_type, object_hash = meta.split()
+        if object_type == b"blob":
+            tree[path.decode("utf-8")] = object_hash.decode("ascii")
+    return tip, tree
+
+
+def is_home_unchanged(wiki_repo: Path, blob_hash: str, content: str) -> bool:
+    """主页只有页脚更新时间不同时视为未变化"""
+    previous = subprocess.run(
+        ["git", "-C", str(wiki_repo), "cat-file", "blob", blob_hash],
+        capture_output=True, check=True,
+    ).stdout.decode("utf-8", errors="replace")
+    return HOME_TIMESTAMP_PATTERN.sub("", previous) == HOME_TIMESTAMP_PATTERN.sub("", content)
+
+
+def search_terms(text: str):
+    """切分搜索词，逐个返回 (词, 在 text 中的偏移)
+
+    拉丁字母/数字按单词切分（小写，至少两个字符），中日韩文字按相邻
+    两字切分为二元组（单字的片段保留单字），查询和建索引使用同一规则。
+    """
+    for match in SEARCH_TERM_PATTERN.finditer(text):
+        word = match.group(0)
+        start = match.start()
+        if word.isascii():
+            yield word.lower(), start
+        elif len(word) == 1:
+            yield word, start
+        else:
+            for i in range(len(word) - 1):
+                yield word[i:i + 2], start + i
+
+
+def build_search_index(store: DocumentStore) -> dict[str, str]:
+    """为所有模块页面建立倒排索引，返回 索引文件名 → JSON 内容
+
+    词按 search_terms 切分，scripts/search-wiki.py 使用同一规则离线查询。
+
+    - meta.json：版本、分片数、权重和文档表（页面名、标题）
+    - shard-XX.json：按词的 CRC32 分片，词 → [[文档号, 得分, [偏移...]], ...]
+      得分为词频加权和（标题中的词按级别加权），偏移为渲染后页面中的字符
+      偏移，用于生成摘要；每个词的倒排表按得分降序排列
+    """
+    documents = []
+    postings: dict[str, dict[int, list]] = {}
+
+    for page in sorted(store.pages.values(), key=lambda p: p.name):
+        if page.module is None or not page.name.endswith(".md"):
+            continue
+
+        doc_id = len(documents)
+        title = None
+        offset = 0
+        heading_weight = 0
+        for token in tokenize_markdown(page.content):
+            if token.kind == "heading":
+                weight = SEARCH_HEADING_WEIGHTS.get(token.level, SEARCH_DEFAULT_HEADING_WEIGHT)
+                if token.level == 1 and title is None:
+                    title = heading_plain_text(token.label).strip() or None
+                heading_weight = weight
+                continue
+            if token.kind in ("fence", "refdef"):
+                offset += len(token.text)
+                continue
+
+            text = token.label if token.kind == "link" else token.text
+            base = offset + (1 if token.kind == "link" else 0)
+            weight = heading_weight or SEARCH_BODY_WEIGHT
+            for term, position in search_terms(text):
+                entry = postings.setdefault(term, {}).setdefault(doc_id, [0, []])
+                entry[0] += weight
+                if len(entry[1]) < SEARCH_MAX_OFFSETS:
+                    entry[1].append(base + position)
+
+            offset += len(token.text)
+            if token.text.endswith("\n"):
+                heading_weight = 0
+
+        documents.append({"page": page.name[:-3], "title": title or page.name[:-3]})
+
+    shards: list[dict[str, list]] = [{} for _ in range(SEARCH_INDEX_SHARDS)]
+    for term, docs in postings.items():
+        shards[search_shard(term)][term] = sorted(
+            ([doc_id, score, offsets] for doc_id, (score, offsets) in docs.items()),
+            key=lambda item: (-item[1], item[0]),
+        )
+
+    def dump(data) -> str:
+        return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    files = {
+        f"{SEARCH_INDEX_DIR}/meta.json": dump({
+            "version": SEARCH_INDEX_VERSION,
+            "shards": SEARCH_INDEX_SHARDS,
+            "documents": documents,
+        }),
+    }
+    for number, shard in enumerate(shards):
+        files[f"{SEARCH_INDEX_DIR}/shard-{number:02d}.json"] = dump(shard)
+    return files
+
+
+def search_shard(term: str) -> int:
+    """词所在的索引分片"""
+    return zlib.crc32(term.encode("utf-8")) % SEARCH_INDEX_SHARDS
+
+
+class FileSystemSink:
+    """输出到目录，基于构建清单增量写盘
+
+    构建清单（默认 build/wiki-manifest.json）记录每个页面的输入哈希（源
+    内容、全局链接映射、源路径）和输出文件哈希。输入未变化且输出完好的
+    页面不会被重写（修改时间保持不变）；full 为 True 时忽略清单全量重建。
+    """
+
+    def __init__(
+        self,
+        directory: Path = Path("wiki"),
+        manifest_path: Path = DEFAULT_MANIFEST_PATH,
+        full: bool = False,
+        workers: int | None = None,
+    ):
+        self.directory = directory
+        self.manifest_path = manifest_path
+        self.full = full
+        self.workers = workers
+
+    def describe(self) -> str:
+        return f"输出目录: {self.directory.absolute()}"
+
+    def publish(self, store: DocumentStore, modules: dict, link_map_hash: str) -> dict[str, int]:
+        """增量写盘：输入未变化且输出完好的页面保持原样，删除不再生成的旧页面"""
+        target_dir = self.directory
+        previous = {} if self.full else load_manifest(self.manifest_path)
+        generator = generator_hash()
+        if previous.get("generator") != generator:
+            previous = {}
+        previous_pages: dict[str, dict] = previous.get("pages", {})
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        def write_page(page: RenderedPage) -> tuple[dict, str]:
+            target_path = target_dir / page.name
+            entry = previous_pages.get(page.name)
+            if is_output_current(target_path, entry, page.input_hash):
+                return entry, "unchanged"
+            new_entry, written = write_output(target_path, page.content, page.input_hash, entry)
+            if page.source is not None:
+                new_entry["source"] = page.source
+            return new_entry, "written" if written else "unchanged"
+
+        pages: dict[str, dict] = {}
+        stats = {"written": 0, "unchanged": 0, "removed": 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(write_page, store.pages.values()))
+
+        current_module = None
+        for page, (entry, status) in zip(store.pages.values(), results):
+            if page.module is not None and page.module != current_module:
+                current_module = page.module
+                print(f"\n处理模块: {modules[page.module]['name']}")
+            if page.module is not None and status == "written":
+                print(f"处理文件: {page.module}/{page.source_rel} -> {page.name}")
+            pages[page.name] = entry
+            stats[status] += 1
+
+        # 资源文件按内容哈希命名，已存在的不再复制
+        for name, source in sorted(store.assets.items()):
+            target_path = target_dir / name
+            if target_path.exists():
+                stats["unchanged"] += 1
+                continue
+            method = "硬链接" if link_asset(source, target_path) else "复制"
+            print(f"资源文件: {source.as_posix()} -> {name} ({method})")
+            stats["written"] += 1
+
+        # 删除不再生成的旧页面和资源（包括目录中的其他残留文件和空目录）；
+        # 以 . 开头的文件和目录（如输出目录本身是 Wiki 仓库时的 .git）不动
+        for root, dirnames, filenames in os.walk(target_dir, topdown=False):
+            root_path = Path(root)
+            relative_root = root_path.relative_to(target_dir)
+            if any(part.startswith(".") for part in relative_root.parts):
+                continue
+            for filename in sorted(filenames):
+                name = (relative_root / filename).as_posix()
+                if filename.startswith(".") or name in pages or name in store.assets:
+                    continue
+                (root_path / filename).unlink()
+                stats["removed"] += 1
+                print(f"删除旧页面: {name}")
+            if relative_root.parts and not any(root_path.iterdir()):
+                root_path.rmdir()
+
+        save_manifest(self.manifest_path, {
+            "version": MANIFEST_VERSION,
+            "generator": generator,
+            "link_map": link_map_hash,
+            "pages": pages,
+        })
+        return stats
+
+
+class MemorySink:
+    """输出到内存字典（页面名 → 内容，资源文件为 bytes），用于测试和进程内工具"""
+
+    def __init__(self, files: dict[str, str | bytes] | None = None):
+        self.files: dict[str, str | bytes] = files if files is not None else {}
+
+    def describe(self) -> str:
+        return f"内存输出: {len(self.files)} 个页面"
+
+    def publish(self, store: DocumentStore, modules: dict, link_map_hash: str) -> dict[str, int]:
+        stats = {"written": 0, "unchanged": 0, "removed": 0}
+        for name in [name for name in self.files if name not in store.pages and name not in store.assets]:
+            del self.files[name]
+            stats["removed"] += 1
+        for page in store.pages.values():
+            if self.files.get(page.name) == page.content:
+                stats["unchanged"] += 1
+            else:
+                self.files[page.name] = page.content
+                stats["written"] += 1
+        for name, source in store.assets.items():
+            if name in self.files:
+                stats["unchanged"] += 1
+            else:
+                self.files[name] = source.read_bytes()
+                stats["written"] += 1
+        return stats
+
+
+class ZipSink:
+    """输出到 zip 归档（条目按名称排序、时间戳固定，页面内容相同则归档字节相同）
+
+    主页页脚的更新时间由 prepare_wiki_docs 的 updated_at 决定（默认为
+    source_timestamp），不取构建时的当前时间。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def describe(self) -> str:
+        return f"输出归档: {self.path.absolute()}"
+
+    def publish(self, store: DocumentStore, modules: dict, link_map_hash: str) -> dict[str, int]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in sorted([*store.pages, *store.assets]):
+                info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                if name in store.pages:
+                    archive.writestr(info, store.pages[name].content.encode("utf-8"))
+                else:
+                    archive.writestr(info, store.assets[name].read_bytes())
+        os.replace(temp_path, self.path)
+        return {"written": len(store.pages) + len(store.assets), "unchanged": 0, "removed": 0}
+
+
+class FastImportSink:
+    """输出相对 Wiki 仓库当前提交的 git fast-import 流
+
+    流中只包含变化页面的 blob 和一个提交（以当前分支提交为父提交），
+    不再生成的顶层 .md 页面、搜索索引和资源文件会被删除。资源文件按内容
+    哈希命名，仓库中已有同名文件时不再读取。没有任何变化时不输出任何内容。
+    发布时无需复制文件、git add 和重新哈希全部页面。
+    """
+
+    def __init__(self, stream, wiki_repo: Path, branch: str = DEFAULT_WIKI_BRANCH):
+        self.stream = stream
+        self.wiki_repo = wiki_repo
+        self.branch = branch
+
+    def describe(self) -> str:
+        return f"fast-import 流: {self.wiki_repo} ({self.branch})"
+
+    def publish(self, store: DocumentStore, modules: dict, link_map_hash: str) -> dict[str, int]:
+        tip, tree = read_wiki_tip(self.wiki_repo, self.branch)
 
-            # 忽略明显的非Wiki页面资源链接（含扩展名，如 .yml/.png/.kt 等）
-            if "." in link_base and link_base not in wiki_pages:
+        changed: list[tuple[str, bytes]] = []
+        for page in store.pages.values():
+            data = page.content.encode("utf-8")
+            existing = tree.get(page.name)
+            if existing == git_blob_hash(data):
                 continue
+            if existing and page.name == "Home.md" and is_home_unchanged(self.wiki_repo, existing, page.content):
+                continue
+            changed.append((page.name, data))
+        for name, source in sorted(store.assets.items()):
+            if name not in tree:
+                changed.append((name, source.read_bytes()))
+
+        deleted = sorted(
+            path for path in tree
+            if path not in store.pages and path not in store.assets
+            and (
+                ("/" not in path and path.endswith(".md"))
+                or path.startswith((f"{SEARCH_INDEX_DIR}/", f"{ASSET_DIR}/"))
+            )
+        )
+        stats = {
+            "written": len(changed),
+            "unchanged": len(store.pages) + len(store.assets) - len(changed),
+            "removed": len(deleted),
+        }
+        if not changed and not deleted:
+            return stats
+
+        stream = self.stream
+        name = os.environ.get("GIT_COMMITTER_NAME", DEFAULT_COMMITTER[0])
+        email = os.environ.get("GIT_COMMITTER_EMAIL", DEFAULT_COMMITTER[1])
+        source_commit = os.environ.get("GITHUB_SHA", "")
+        message = f"同步文档 {source_commit[:12]}".strip().encode("utf-8") + b"\n"
+
+        for mark, (_, data) in enumerate(changed, 1):
+            stream.write(b"blob\nmark :%d\ndata %d\n" % (mark, len(data)) + data + b"\n")
+
+        stream.write(f"commit refs/heads/{self.branch}\n".encode("utf-8"))
+        stream.write(f"committer {name} <{email}> {int(time.time())} +0000\n".encode("utf-8"))
+        stream.write(b"data %d\n" % len(message) + message)
+        if tip:
+            stream.write(f"from {tip}\n".encode("ascii"))
+        for mark, (path, _) in enumerate(changed, 1):
+            stream.write(f"M 100644 :{mark} {path}\n".encode("utf-8"))
+        for path in deleted:
+            stream.write(f"D {path}\n".encode("utf-8"))
+        stream.write(b"\n")
+        stream.flush()
+
+        return stats
+
+
+@dataclass
+class WikiBuildResult:
+    """一次 Wiki 构建的结果"""
+
+    success: bool
+    pages: dict[str, str] = field(default_factory=dict)      # 页面文件名 → 内容
+    assets: dict[str, str] = field(default_factory=dict)     # 资源哈希路径 → 源文件
+    link_map: dict[str, str] = field(default_factory=dict)   # module/path.md → 页面名
+    warnings: list[str] = field(default_factory=list)
+    broken_links: list[tuple] = field(default_factory=list)  # (源文件, 行号, 文本, 链接)
+    broken_anchors: list[tuple] = field(default_factory=list)
+    stale_symbols: dict[str, list[tuple]] = field(default_factory=dict)  # 源文件 → [(行号, 引用)]
+    stats: dict[str, int] = field(default_factory=dict)
+    sources_read: int = 0
+
+
+def prepare_wiki_docs(
+    source_root: Path = Path("docs"),
+    sink=None,
+    workers: int | None = None,
+    processes: bool = False,
+    fail_on_broken_links: bool = False,
+    index_cache: Path | None = None,
+    search_index: bool = True,
+    kotlin_roots=None,
+    symbol_cache: Path | None = None,
+    symbol_allowlist: Path | None = None,
+    updated_at: str | None = None,
+) -> WikiBuildResult:
+    """准备 Wiki 文档
+
+    先在内存中读取并渲染 source_root 下的全部页面、验证链接，再交给输出
+    目标 sink 发布（默认为 wiki/ 目录的增量写盘，也可以是 MemorySink、
+    ZipSink 或 FastImportSink）。页面渲染在 workers 个线程（processes 为
+    True 时为进程）中并行执行，输出内容和日志顺序与串行处理一致。
+    fail_on_broken_links 为 True 且存在无效链接时不发布任何内容，返回结果
+    的 success 为 False。index_cache 为 docs 目录树遍历缓存的路径（增量
+    构建时复用未变化目录的列表）。
+    search_index 为 True 时在 _search/ 下输出分片的全文搜索索引。
+    传入 kotlin_roots 时以其中 Kotlin 声明的符号索引（缓存于 symbol_cache）
+    检查文档行内代码中的 API 引用，过期引用按页面报告为警告；
+    symbol_allowlist 文件中列出的外部名称不报告。updated_at 为主页页脚的
+    更新时间；输出到 ZipSink/MemorySink 时默认取 source_timestamp（内容不变
+    时输出也不变），其余输出目标默认取当前时间。
+    """
+    source_root = Path(source_root)
+    if sink is None:
+        sink = FileSystemSink(workers=workers)
+    result = WikiBuildResult(success=False)
+
+    def warn(message: str):
+        result.warnings.append(message)
+        print(f"警告: {message}")
+
+    print("开始准备多模块 GitHub Wiki 文档...")
+
+    # 动态发现模块
+    print("🔍 扫描模块...")
+    store = DocumentStore()
+    modules = discover_modules(store, source_root, index_cache)
+
+    if not modules:
+        print("❌ 未发现任何模块，请检查docs目录结构")
+        return result
+
+    print(f"✅ 发现 {len(modules)} 个模块: {', '.join(modules.keys())}")
+
+    # 创建主页（哈希不包含页脚时间戳）
+    print("创建主页...")
+    if updated_at is None and isinstance(sink, (ZipSink, MemorySink)):
+        updated_at = source_timestamp(source_root)
+    home_content = create_home_page(modules, updated_at)
+    store.add_page(RenderedPage(
+        "Home.md", None, None, None, home_content,
+        hash_text(create_home_page(modules, updated_at="")), *collect_links(home_content),
+    ))
+
+    # 创建侧边栏
+    print("创建侧边栏...")
+    sidebar_content = create_sidebar(modules)
+    store.add_page(RenderedPage(
+        "_Sidebar.md", None, None, None, sidebar_content,
+        hash_text(sidebar_content), *collect_links(sidebar_content),
+    ))
 
-            # 检查内部Wiki页面链接
-            if link_base not in wiki_pages:
-                broken_links.append((file.name, text, link))
+    # 构建全局链接映射：module_id/relative/path.md → Wiki页面名(无.md)
+    global_links: dict[str, str] = {}
+    for mid, mconf in modules.items():
+        for src_rel, tgt in mconf.get("files", {}).items():
+            key = f"{mid}/{src_rel}"
+            global_links[key] = tgt.replace(".md", "")
+    result.link_map = global_links
 
-    if broken_links:
+    # 收集渲染任务（按模块和文件映射顺序，保证输出和日志顺序确定）
+    sources = []
+    for module_id, module_config in modules.items():
+        source_dir = source_root / module_id
+        if not source_dir.exists():
+            warn(f"模块目录不存在: {source_dir}")
+            continue
+
+        for source_file, target_file in module_config.get("files", {}).items():
+            source_path = source_dir / source_file
+            if not source_path.exists():
+                warn(f"源文件不存在: {source_path}")
+                continue
+            sources.append((module_id, module_config, source_file, target_file, source_path))
+
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = list(executor.map(lambda item: store.read(item[4]), sources))
+
+    # 收集引用的资源文件（按内容哈希命名，链接改写为哈希路径）
+    asset_links, missing_assets, outside_assets = collect_assets(store, sources, contents, source_root)
+    for source, line, text, link in outside_assets:
+        warn(f"{source}:{line}: [{text}]({link}) 指向 docs 目录之外，不发布该文件")
+    result.assets = {name: path.as_posix() for name, path in store.assets.items()}
+    if asset_links:
+        print(f"📎 资源文件: {len(asset_links)} 个引用，{len(store.assets)} 个不同内容")
+
+    link_map_hash = hash_text(json.dumps([global_links, asset_links], ensure_ascii=False, sort_keys=True))
+    resolver = LinkResolver(global_links, asset_links)
+
+    # 全局链接映射建立后各页面的渲染互不依赖，并行执行；结果按任务顺序汇总
+    # 解析器和模块配置通过 initializer 每个工作进程只传一次
+    jobs = [
+        (module_id, source_file, target_file, source_path.as_posix(), content)
+        for (module_id, _, source_file, target_file, source_path), content
+        in zip(sources, contents)
+    ]
+    with executor_class(
+        max_workers=workers,
+        initializer=init_render_context,
+        initargs=(modules, resolver, link_map_hash),
+    ) as executor:
+        for page in executor.map(render_page, jobs, chunksize=8):
+            store.add_page(page)
+
+    # 全文搜索索引随 Wiki 一起输出
+    if search_index:
+        for name, content in build_search_index(store).items():
+            store.add_page(RenderedPage(
+                name, None, None, None, content, hash_text(content), (), frozenset()
+            ))
+
+    result.pages = {name: page.content for name, page in store.pages.items()}
+    result.sources_read = store.reads
+
+    # 发布前在内存中验证链接
+    print("\n验证链接...")
+    result.broken_links, result.broken_anchors = validate_links(store)
+    result.broken_links = missing_assets + result.broken_links
+    if result.broken_links:
         print("发现无效链接:")
-        for file, text, link in broken_links:
-            print(f"  {file}: [{text}]({link})")
-    else:
+        for source, line, text, link in result.broken_links:
+            print(f"  {source}:{line}: [{text}]({link})")
+    if result.broken_anchors:
+        print("发现无效锚点:")
+        for source, line, text, link in result.broken_anchors:
+            print(f"  {source}:{line}: [{text}]({link})")
+    if not result.broken_links and not result.broken_anchors:
         print("所有链接都有效!")
 
+    # 检查文档中的 API 引用是否仍存在于源码
+    if kotlin_roots is not None:
+        print("\n检查 API 引用...")
+        allowlist = load_symbol_allowlist(symbol_allowlist) if symbol_allowlist is not None else None
+        symbol_index = build_symbol_index(kotlin_roots, symbol_cache, allowlist)
+        result.stale_symbols = validate_symbols(store, symbol_index)
+        for source, references in sorted(result.stale_symbols.items()):
+            warn(f"{source} 引用了 {len(references)} 个不存在的 API")
+            for line, reference in references:
+                print(f"  {source}:{line}: `{reference}`")
+
+    broken_count = len(result.broken_links) + len(result.broken_anchors)
+    if broken_count and fail_on_broken_links:
+        print(f"\n❌ 发现 {broken_count} 个无效链接或锚点，未写出任何文件")
+        return result
+
+    result.stats = sink.publish(store, modules, link_map_hash)
+    result.success = True
+
+    print("\nWiki 文档准备完成!")
+    print(sink.describe())
+    print(
+        f"读取 {store.reads} 个源文件，写入 {result.stats['written']} 个页面，"
+        f"未变化 {result.stats['unchanged']} 个，删除 {result.stats['removed']} 个"
+    )
+
+    # 显示文件列表
+    print("\n生成的文件:")
+    for name in sorted(store.pages):
+        print(f"  - {name}")
+
+    return result
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将 docs/ 多模块文档转换为 GitHub Wiki 格式")
+    parser.add_argument("--source", type=Path, default=Path("docs"), help="文档源目录 (默认 docs)")
+    parser.add_argument("--output", type=Path, default=Path("wiki"), help="Wiki 输出目录 (默认 wiki)")
+    parser.add_argument(
+        "--manifest", type=Path, default=DEFAULT_MANIFEST_PATH,
+        help=f"增量构建清单路径 (默认 {DEFAULT_MANIFEST_PATH.as_posix()})",
+    )
+    parser.add_argument(
+        "--index-cache", type=Path, default=DEFAULT_INDEX_CACHE_PATH,
+        help=f"docs 目录树遍历缓存路径 (默认 {DEFAULT_INDEX_CACHE_PATH.as_posix()})",
+    )
+    parser.add_argument(
+        "--kotlin-source", type=Path, action="append",
+        help="检查 API 引用的 Kotlin 源码目录，可重复指定 (默认 "
+        + "、".join(root.as_posix() for root in DEFAULT_KOTLIN_ROOTS) + ")",
+    )
+    parser.add_argument(
+        "--symbol-allowlist", type=Path, metavar="FILE",
+        help="API 引用检查的外部名称允许列表（每行一个名称，# 为注释）",
+    )
+    parser.add_argument(
+        "--symbol-cache", type=Path, default=DEFAULT_SYMBOL_CACHE_PATH,
+        help=f"Kotlin 符号索引缓存路径 (默认 {DEFAULT_SYMBOL_CACHE_PATH.as_posix()})",
+    )
+    parser.add_argument("--no-symbol-check", action="store_true", help="不检查文档中的 API 引用")
+    parser.add_argument("--full", action="store_true", help="忽略构建清单和遍历缓存，强制全量重建")
+    parser.add_argument("--no-search-index", action="store_true", help="不生成 _search/ 全文搜索索引")
+    parser.add_argument("--workers", type=int, help="并行转换的工作线程/进程数，默认由系统决定")
+    parser.add_argument("--processes", action="store_true", help="使用进程池代替线程池转换页面")
+    parser.add_argument(
+        "--fail-on-broken-links", action="store_true",
+        help="发现无效链接时中止构建，不写出任何文件",
+    )
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument("--zip", type=Path, metavar="FILE", help="输出为 zip 归档而不是目录")
+    output_group.add_argument(
+        "--fast-import", metavar="FILE",
+        help="输出 git fast-import 流（- 表示标准输出，此时日志写到标准错误）而不是写 wiki/ 目录",
+    )
+    parser.add_argument(
+        "--wiki-repo", type=Path, default=Path("wiki.git"),
+        help="--fast-import 比较的 Wiki 仓库路径 (默认 wiki.git)",
+    )
+    parser.add_argument(
+        "--wiki-branch", default=DEFAULT_WIKI_BRANCH,
+        help=f"--fast-import 提交的分支 (默认 {DEFAULT_WIKI_BRANCH})",
+    )
+    args = parser.parse_args()
+
     try:
-        prepare_wiki_docs()
-        validate_links()
+        with contextlib.ExitStack() as stack:
+            if args.fast_import == "-":
+                sink = FastImportSink(sys.stdout.buffer, args.wiki_repo, args.wiki_branch)
+                stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+            elif args.fast_import:
+                stream = stack.enter_context(open(args.fast_import, "wb"))
+                sink = FastImportSink(stream, args.wiki_repo, args.wiki_branch)
+            elif args.zip:
+                sink = ZipSink(args.zip)
+            else:
+                sink = FileSystemSink(args.output, args.manifest, args.full, args.workers)
+
+            build = prepare_wiki_docs(
+                args.source,
+                sink,
+                args.workers,
+                args.processes,
+                args.fail_on_broken_links,
+                index_cache=None if args.full else args.index_cache,
+                search_index=not args.no_search_index,
+                kotlin_roots=None if args.no_symbol_check else (args.kotlin_source or DEFAULT_KOTLIN_ROOTS),
+                symbol_cache=None if args.full else args.symbol_cache,
+                symbol_allowlist=args.symbol_allowlist,
+            )
     except Exception as e:
         print(f"❌ 脚本执行失败: {e}")
         import traceback
 
         traceback.print_exc()
+        sys.exit(1)
+
+    sys.exit(0 if build.success else 1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+离线查询 Wiki 全文搜索索引
+
+索引由 prepare-wiki-multi.py 生成在 wiki/_search/ 下。查询词使用与建索引
+相同的规则切分，只加载查询词所在的分片；所有词都出现的页面按得分之和
+排序，并从生成的页面中截取首个命中位置附近的文本作为摘要。
+
+用法: python scripts/search-wiki.py 数据库 事务 [--index wiki/_search] [--limit 10]
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+# 仓库根目录（脚本位于 scripts/ 下）
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PREPARE_SCRIPT = REPO_ROOT / "scripts" / "prepare-wiki-multi.py"
+
+# 摘要在命中位置前后截取的字符数
+SNIPPET_RADIUS = 40
+
+
+def load_prepare_module():
+    """加载 Wiki 准备脚本（文件名含连字符，不能直接 import）"""
+    spec = importlib.util.spec_from_file_location("prepare_wiki_multi", PREPARE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def search(index_dir: Path, query: str, prepare) -> tuple[list[dict], list]:
+    """查询索引，返回 (文档表, [(文档号, 得分, 首个偏移), ...]，按得分降序)"""
+    meta = load_json(index_dir / "meta.json")
+    if meta.get("version") != prepare.SEARCH_INDEX_VERSION:
+        raise ValueError(f"索引版本不匹配: {meta.get('version')}，请重新生成 Wiki")
+
+    terms = sorted({term for term, _ in prepare.search_terms(query)})
+    if not terms:
+        return meta["documents"], []
+
+    # 只加载查询词所在的分片
+    shards: dict[int, dict] = {}
+    matches = None
+    for term in terms:
+        number = prepare.search_shard(term)
+        if number not in shards:
+            shards[number] = load_json(index_dir / f"shard-{number:02d}.json")
+
+        postings = {doc_id: (score, offsets) for doc_id, score, offsets in shards[number].get(term, ())}
+        if matches is None:
+            matches = {doc_id: [score, offsets[0]] for doc_id, (score, offsets) in postings.items()}
+        else:
+            # 所有查询词都必须出现
+            matches = {
+                doc_id: [total + postings[doc_id][0], min(first, postings[doc_id][1][0])]
+                for doc_id, (total, first) in matches.items()
+                if doc_id in postings
+            }
+        if not matches:
+            break
+
+    ranked = sorted(
+        ((doc_id, score, first) for doc_id, (score, first) in (matches or {}).items()),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return meta["documents"], ranked
+
+
+def make_snippet(page_path: Path, offset: int) -> str:
+    """截取页面中命中位置附近的文本"""
+    try:
+        content = page_path.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    start = max(0, offset - SNIPPET_RADIUS)
+    snippet = " ".join(content[start:offset + SNIPPET_RADIUS].split())
+    return ("…" if start > 0 else "") + snippet + ("…" if offset + SNIPPET_RADIUS < len(content) else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询 Wiki 全文搜索索引")
+    parser.add_argument("query", nargs="+", help="查询词（多个词之间为“与”关系）")
+    parser.add_argument("--index", type=Path, default=Path("wiki") / "_search", help="索引目录，默认 wiki/_search")
+    parser.add_argument("--limit", type=int, default=10, help="最多显示的结果数，默认 10")
+    args = parser.parse_args()
+
+    if not (args.index / "meta.json").exists():
+        print(f"❌ 索引不存在: {args.index}，请先运行 prepare-wiki-multi.py")
+        sys.exit(1)
+
+    prepare = load_prepare_module()
+    query = " ".join(args.query)
+
+    started = time.perf_counter()
+    try:
+        documents, ranked = search(args.index, query, prepare)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"🔍 “{query}”: {len(ranked)} 个页面 ({elapsed:.1f} ms)")
+    for doc_id, score, offset in ranked[:args.limit]:
+        document = documents[doc_id]
+        print(f"\n  {document['title']}  [{document['page']}]  得分 {score}")
+        snippet = make_snippet(args.index.parent / f"{document['page']}.md", offset)
+        if snippet:
+            print(f"    {snippet}")
+
+    if not ranked:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
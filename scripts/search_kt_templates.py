@@ -1,113 +1,674 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-搜索modules目录中所有.kt文件中的模板模式
-模板模式: <%([a-zA-Z0-9_.]+)%>
+搜索 modules/ 和 plugins/ 目录中 Kotlin/Java 源码里的模板模式
+默认模板模式: <%([a-zA-Z0-9_.]+)%>
+
+支持同时搜索多个命名模式（语言模板、{0} 参数、MiniMessage 标签、
+%placeholder% 占位符以及自定义正则）。模式之间可能重叠（如 MiniMessage
+标签参数中的 {0}），每个模式单独扫描、重叠位置各自报告；每个文件只读取
+一次即可得到各模式的匹配及其行号、列号，增加模式不会增加对整个目录树的
+遍历次数。
+
+文件读取和匹配在线程池（或进程池）中并行执行，并先用字节级预过滤
+跳过不可能匹配的文件，整个仓库的搜索足够在每次保存时运行。
+
+--rewrite 模式会把插件代码中直接写出的 <%key%> 字面量替换为该插件
+LanguageKeys.kt 中对应的常量引用，并在需要时补充 import。整个改写只遍历
+一次目录树，文件并行处理，写入使用临时文件 + os.replace 保证原子性；
+配合 --dry-run 只输出统一 diff 而不修改文件。
 """
 
+import argparse
+import difflib
+import json
 import os
 import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-def search_templates_in_kt_files():
+# 内置的命名模式: 名称 → (正则, 预过滤字节)
+# 正则的第一个捕获组作为 key；没有捕获组时使用整个匹配
+BUILTIN_PATTERNS = {
+    'template': (rb"<%([a-zA-Z0-9_.]+)%>", b"<%"),
+    'argument': (rb"\{(\d+)\}", None),  # "{" 几乎出现在每个 Kotlin 文件中，不做预过滤
+    'minimessage': (rb"</?([a-z][a-z0-9_-]*)(?::[^<>\r\n]*)?>", b"<"),
+    'placeholder': (rb"(?<![<\w])%([a-zA-Z][a-zA-Z0-9_.-]*)%(?!>)", b"%"),
+}
+DEFAULT_PATTERN_NAMES = ['template']
+
+# 仓库根目录（脚本位于 scripts/ 下）
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 默认搜索的目录和文件扩展名
+DEFAULT_ROOTS = ["modules", "plugins"]
+DEFAULT_EXTENSIONS = (".kt", ".java", ".kts")
+# --rewrite 生成 Kotlin 字符串模板和无分号的 import，只能用于 Kotlin 源码
+REWRITE_EXTENSIONS = (".kt", ".kts")
+
+# 遍历时跳过的目录
+SKIP_DIRS = {".git", ".gradle", ".idea", "build", "out", "node_modules", "__pycache__"}
+
+# LanguageKeys.kt 解析
+LANGUAGE_KEYS_FILE = "LanguageKeys.kt"
+KOTLIN_PACKAGE_PATTERN = re.compile(r"^package\s+([\w.]+)", re.MULTILINE)
+KOTLIN_OBJECT_PATTERN = re.compile(r"^\s*object\s+(\w+)\s*\{")
+KOTLIN_CONST_PATTERN = re.compile(r'^\s*const\s+val\s+(\w+)\s*=\s*"<%([a-zA-Z0-9_.]+)%>"')
+KOTLIN_IMPORT_PATTERN = re.compile(r"^import\s+[\w.*]+")
+TEMPLATE_TEXT_PATTERN = re.compile(r"<%([a-zA-Z0-9_.]+)%>")
+
+
+class PatternSet:
     """
-    在modules目录中搜索所有.kt文件，查找符合模板模式的内容
+    多个命名模式的单次读取扫描
+
+    模式之间可能重叠（如 MiniMessage 标签 <click:run_command:/tpa {0}>
+    中的 {0} 参数），因此每个模式各自编译、在同一份内容上单独扫描，重叠
+    位置按各模式分别报告，反向引用 (\\1) 按原样生效。文件内容只读取一次，
+    所有模式的匹配按位置合并后计算行号、列号。
     """
-    # 定义模板模式
-    template_pattern = re.compile(r"<%([a-zA-Z0-9_.]+)%>")
 
-    # 获取当前脚本所在目录
-    current_dir = Path(__file__).parent
-    modules_dir = current_dir / "modules"
+    def __init__(self, patterns):
+        """
+        patterns: 名称 → (正则字节串, 预过滤字节或None)
+        """
+        self.names = []
+        self.compiled = []  # (名称, 编译后的正则, key 所在的组号)
+        self.prefilters = []
 
-    # 检查modules目录是否存在
-    if not modules_dir.exists():
-        print(f"错误: modules目录不存在: {modules_dir}")
-        return
+        for name, (regex, prefilter) in patterns.items():
+            if not name.isidentifier():
+                raise ValueError(f"模式名称 {name} 必须是合法的标识符")
+            compiled = re.compile(regex)
+            self.compiled.append((name, compiled, 1 if compiled.groups else 0))
 
-    # 搜索所有.kt文件
-    kt_files = []
-    for root, dirs, files in os.walk(modules_dir):
-        for file in files:
-            if file.endswith('.kt'):
-                kt_files.append(os.path.join(root, file))
+            self.names.append(name)
+            if self.prefilters is not None:
+                if prefilter:
+                    self.prefilters.append(prefilter)
+                else:
+                    self.prefilters = None  # 没有特征前缀的模式无法预过滤
 
-    print(f"找到 {len(kt_files)} 个.kt文件")
-    print("=" * 60)
+    def might_match(self, content):
+        """字节级预过滤：内容中不含任何模式的前缀时跳过"""
+        if self.prefilters is None:
+            return True
+        return any(prefix in content for prefix in self.prefilters)
 
-    # 存储结果
-    found_files = []
-    total_templates = 0
+    def _iter_matches(self, content):
+        """按位置顺序返回 (起始偏移, 名称, key 字节)，同一位置按模式顺序"""
+        matches = []
+        for order, (name, compiled, group) in enumerate(self.compiled):
+            for match in compiled.finditer(content):
+                matches.append((match.start(), order, name, match.group(group) or b""))
+        if len(self.compiled) > 1:
+            matches.sort(key=lambda item: item[:2])
+        return [(start, name, key) for start, _, name, key in matches]
+
+    def scan(self, content):
+        """
+        单次扫描内容，返回 名称 → [(key, 行号, 列号)]
+
+        行号、列号均从 1 开始，列号按字符计算。
+        """
+        results = {}
+        line = 1
+        line_start = 0
+        position = 0
+
+        for start, name, key in self._iter_matches(content):
+            # 增量统计换行符，总计只遍历一次内容
+            newlines = content.count(b"\n", position, start)
+            if newlines:
+                line += newlines
+                line_start = content.rfind(b"\n", position, start) + 1
+            position = start
 
-    # 遍历每个.kt文件
-    for kt_file in kt_files:
+            column = len(content[line_start:start].decode('utf-8', errors='replace')) + 1
+            results.setdefault(name, []).append((key.decode('utf-8', errors='replace'), line, column))
+
+        return results
+
+
+def parse_pattern_options(pattern_names, custom_patterns):
+    """根据命令行参数组装命名模式"""
+    patterns = {}
+    for name in pattern_names:
+        if name == 'all':
+            patterns.update(BUILTIN_PATTERNS)
+            continue
+        if name not in BUILTIN_PATTERNS:
+            raise ValueError(f"未知的内置模式: {name}（可用: {', '.join(BUILTIN_PATTERNS)}, all）")
+        patterns[name] = BUILTIN_PATTERNS[name]
+
+    for option in custom_patterns or []:
+        name, sep, regex = option.partition('=')
+        if not sep or not name or not regex:
+            raise ValueError(f"自定义模式格式应为 name=REGEX: {option}")
+        patterns[name] = (regex.encode('utf-8'), None)
+
+    return patterns
+
+
+def iter_source_files(roots, extensions):
+    """使用 os.scandir 递归列出所有源码文件"""
+    stack = [str(root) for root in roots]
+    while stack:
+        directory = stack.pop()
         try:
-            with open(kt_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(extensions):
+                        yield entry.path
+        except (FileNotFoundError, PermissionError):
+            continue
+
+
+def scan_file(file_path, pattern_set):
+    """
+    读取单个文件并查找所有模式
+
+    返回 (文件路径, 名称 → [(key, 行号, 列号)], 错误信息)
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        return file_path, {}, str(e)
+
+    # 字节级预过滤：绝大多数文件不包含模板
+    if not pattern_set.might_match(content):
+        return file_path, {}, None
+
+    return file_path, pattern_set.scan(content), None
 
-            # 查找所有匹配的模板
-            matches = template_pattern.findall(content)
 
-            if matches:
-                # 计算相对路径（相对于modules目录）
-                relative_path = os.path.relpath(kt_file, modules_dir)
+def _scan_file_job(job):
+    """进程池任务入口（需要可序列化的参数）"""
+    file_path, patterns = job
+    return scan_file(file_path, _get_pattern_set(patterns))
 
-                # 去除重复的key
-                unique_keys = list(set(matches))
-                unique_keys.sort()
 
-                found_files.append({
-                    'file': relative_path,
-                    'full_path': kt_file,
-                    'keys': unique_keys,
-                    'total_count': len(matches)
-                })
+_PATTERN_SET_CACHE = {}
 
-                total_templates += len(matches)
 
-        except Exception as e:
-            print(f"读取文件时出错 {kt_file}: {e}")
+def _get_pattern_set(patterns):
+    """每个进程只编译一次模式"""
+    cache_key = tuple(patterns.items())
+    if cache_key not in _PATTERN_SET_CACHE:
+        _PATTERN_SET_CACHE[cache_key] = PatternSet(patterns)
+    return _PATTERN_SET_CACHE[cache_key]
+
+
+def search_templates_in_kt_files(roots=None, extensions=DEFAULT_EXTENSIONS, workers=None,
+                                 use_processes=False, patterns=None):
+    """
+    在指定目录中搜索所有源码文件，查找符合模式的内容
+
+    返回 (搜索的文件数, 包含匹配的文件信息列表, 错误列表)
+    """
+    if roots is None:
+        roots = [REPO_ROOT / root for root in DEFAULT_ROOTS]
+    roots = [Path(root) for root in roots]
+    if patterns is None:
+        patterns = {name: BUILTIN_PATTERNS[name] for name in DEFAULT_PATTERN_NAMES}
+
+    files = sorted(iter_source_files(roots, tuple(extensions)))
+
+    if use_processes:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            scanned = list(executor.map(
+                _scan_file_job, [(f, patterns) for f in files], chunksize=64
+            ))
+    else:
+        pattern_set = PatternSet(patterns)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            scanned = list(executor.map(lambda f: scan_file(f, pattern_set), files))
+
+    found_files = []
+    errors = []
+    for file_path, matches, error in scanned:
+        if error:
+            errors.append({'file': file_path, 'error': error})
+            continue
+        if not matches:
+            continue
+
+        found_files.append({
+            'file': relative_to_repo(file_path),
+            'full_path': file_path,
+            'patterns': {
+                name: {
+                    'keys': sorted({key for key, _, _ in pattern_matches}),
+                    'total_count': len(pattern_matches),
+                    'matches': [
+                        {'key': key, 'line': line, 'column': column}
+                        for key, line, column in pattern_matches
+                    ],
+                }
+                for name, pattern_matches in matches.items()
+            },
+        })
+
+    return len(files), found_files, errors
+
+
+def relative_to_repo(file_path):
+    """计算相对仓库根目录的路径（不在仓库内时返回原路径）"""
+    try:
+        return Path(file_path).resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return file_path
+
+
+def summarize(found_files):
+    """按模式汇总: 名称 → (文件数, 实例数, 唯一key集合)"""
+    summary = {}
+    for file_info in found_files:
+        for name, info in file_info['patterns'].items():
+            files, total, keys = summary.get(name, (0, 0, set()))
+            keys.update(info['keys'])
+            summary[name] = (files + 1, total + info['total_count'], keys)
+    return summary
+
+
+def print_report(total_files, found_files, errors, show_locations=False):
+    """打印人类可读的搜索结果"""
+    print(f"找到 {total_files} 个源码文件")
+    print("=" * 60)
+
+    for error in errors:
+        print(f"读取文件时出错 {error['file']}: {error['error']}")
+
+    summary = summarize(found_files)
+    total_matches = sum(total for _, total, _ in summary.values())
 
     # 打印结果
     if found_files:
-        print(f"找到 {len(found_files)} 个包含模板的文件，共 {total_templates} 个模板实例:\n")
+        print(f"找到 {len(found_files)} 个包含匹配的文件，共 {total_matches} 个实例:\n")
 
         for i, file_info in enumerate(found_files, 1):
             print(f"{i}. 文件: {file_info['file']}")
             print(f"   完整路径: {file_info['full_path']}")
-            print(f"   模板数量: {file_info['total_count']}")
-            print(f"   包含的Key:")
-            for key in file_info['keys']:
-                print(f"     - {key}")
+            for name, info in file_info['patterns'].items():
+                print(f"   [{name}] 数量: {info['total_count']}")
+                if show_locations:
+                    for match in info['matches']:
+                        print(f"     - {match['key']}  ({match['line']}:{match['column']})")
+                else:
+                    for key in info['keys']:
+                        print(f"     - {key}")
             print()
     else:
-        print("未找到任何包含模板模式的.kt文件")
+        print("未找到任何包含匹配的文件")
 
     # 打印统计信息
     print("=" * 60)
     print("统计信息:")
-    print(f"总共搜索的.kt文件数: {len(kt_files)}")
-    print(f"包含模板的文件数: {len(found_files)}")
-    print(f"模板实例总数: {total_templates}")
+    print(f"总共搜索的文件数: {total_files}")
+    print(f"包含匹配的文件数: {len(found_files)}")
+    print(f"匹配实例总数: {total_matches}")
 
-    if found_files:
-        # 统计所有唯一的key
-        all_keys = set()
-        for file_info in found_files:
-            all_keys.update(file_info['keys'])
-
-        print(f"唯一模板Key总数: {len(all_keys)}")
-        print("\n所有唯一的模板Key:")
-        for key in sorted(all_keys):
+    for name, (files, total, keys) in summary.items():
+        print(f"\n[{name}] 文件数: {files}，实例数: {total}，唯一Key数: {len(keys)}")
+        for key in sorted(keys):
             print(f"  - {key}")
 
+
+def parse_language_keys(file_path):
+    """
+    解析 LanguageKeys.kt，返回 (包名, key → 常量引用表达式)
+
+    常量引用形如 LanguageKeys.Core.Plugin.RELOAD_FAILED，对象嵌套通过
+    逐行跟踪 object 声明和花括号得到。
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    package_match = KOTLIN_PACKAGE_PATTERN.search(content)
+    package = package_match.group(1) if package_match else ""
+
+    constants = {}
+    stack = []  # (对象名, 声明所在的花括号深度)
+    depth = 0
+    for line in content.splitlines():
+        object_match = KOTLIN_OBJECT_PATTERN.match(line)
+        if object_match:
+            stack.append((object_match.group(1), depth))
+        else:
+            const_match = KOTLIN_CONST_PATTERN.match(line)
+            if const_match and stack:
+                name, key = const_match.groups()
+                path = ".".join(obj for obj, _ in stack)
+                constants.setdefault(key, f"{path}.{name}")
+
+        depth += line.count("{") - line.count("}")
+        while stack and depth <= stack[-1][1]:
+            stack.pop()
+
+    return package, constants
+
+
+def plugin_root_of(file_path):
+    """
+    源码文件所属的模块根目录（src 目录的上一级）
+
+    在相对仓库根目录的路径中查找 src，仓库本身位于名为 src 的目录下时
+    也不会把所有文件归到同一个根目录。
+    """
+    path = Path(file_path).resolve()
+    try:
+        base = REPO_ROOT
+        parts = path.relative_to(REPO_ROOT).parts
+    except ValueError:
+        base = Path(path.anchor)
+        parts = path.parts[1:]
+    if "src" not in parts:
+        return None
+    return str(base.joinpath(*parts[:parts.index("src")]))
+
+
+def _template_context(line, start, end):
+    """
+    判断 line[start:end] 处的模板所在的上下文
+
+    返回 'literal'（整个字符串字面量就是模板）、'embedded'（普通字符串中的
+    一部分）或 None（注释、原始字符串等不安全改写的位置）
+    """
+    stripped = line.lstrip()
+    if stripped.startswith(("*", "/*", "//")):
+        return None
+
+    in_string = False
+    string_start = -1
+    i = 0
+    while i < start:
+        char = line[i]
+        if in_string:
+            if char == "\\":
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif line.startswith('"""', i):
+            return None
+        elif line.startswith("//", i):
+            return None
+        elif char == '"':
+            in_string = True
+            string_start = i
+        i += 1
+
+    if not in_string:
+        return None
+    if string_start == start - 1 and line[end:end + 1] == '"':
+        return 'literal'
+    return 'embedded'
+
+
+def _add_import(lines, import_line):
+    """按字母顺序插入 import 语句（已存在时不做修改）"""
+    imports = [i for i, line in enumerate(lines) if KOTLIN_IMPORT_PATTERN.match(line)]
+    if any(lines[i].strip() == import_line for i in imports):
+        return lines
+
+    if imports:
+        position = imports[-1] + 1
+        for i in imports:
+            if lines[i].strip() > import_line:
+                position = i
+                break
+        return lines[:position] + [import_line] + lines[position:]
+
+    for i, line in enumerate(lines):
+        if KOTLIN_PACKAGE_PATTERN.match(line):
+            return lines[:i + 1] + ["", import_line] + lines[i + 1:]
+    return [import_line, ""] + lines
+
+
+def rewrite_file(file_path, package, constants, dry_run=False):
+    """
+    将单个文件中的 <%key%> 字面量替换为 LanguageKeys 常量
+
+    返回 {'file', 'replaced', 'skipped', 'diff', 'error'}
+    """
+    result = {'file': relative_to_repo(file_path), 'replaced': 0, 'skipped': [], 'diff': "", 'error': None}
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            original = f.read()
+    except OSError as e:
+        result['error'] = str(e)
+        return result
+
+    if "<%" not in original:
+        return result
+
+    newline = "\r\n" if "\r\n" in original else "\n"
+    lines = original.split(newline)
+    for index, line in enumerate(lines):
+        if "<%" not in line:
+            continue
+
+        pieces = []
+        position = 0
+        for match in TEMPLATE_TEXT_PATTERN.finditer(line):
+            key = match.group(1)
+            start, end = match.span()
+            constant = constants.get(key)
+            context = _template_context(line, start, end)
+            if constant is None or context is None:
+                if context is not None:
+                    result['skipped'].append({
+                        'key': key, 'line': index + 1, 'column': start + 1,
+                        'reason': "LanguageKeys 中没有对应常量",
+                    })
+                continue
+
+            if context == 'literal':
+                pieces.append(line[position:start - 1])
+                pieces.append(constant)
+                position = end + 1
+            else:
+                pieces.append(line[position:start])
+                pieces.append("${" + constant + "}")
+                position = end
+            result['replaced'] += 1
+
+        if pieces:
+            pieces.append(line[position:])
+            lines[index] = "".join(pieces)
+
+    if not result['replaced']:
+        return result
+
+    file_package_match = KOTLIN_PACKAGE_PATTERN.search(original)
+    file_package = file_package_match.group(1) if file_package_match else ""
+    if package and package != file_package:
+        lines = _add_import(lines, f"import {package}.LanguageKeys")
+
+    rewritten = newline.join(lines)
+    result['diff'] = "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), rewritten.splitlines(keepends=True),
+        fromfile=f"a/{result['file']}", tofile=f"b/{result['file']}",
+    ))
+
+    if not dry_run:
+        try:
+            _atomic_write(file_path, rewritten)
+        except OSError as e:
+            result['error'] = str(e)
+    return result
+
+
+def _atomic_write(file_path, content):
+    """写入同目录下的临时文件后 os.replace，避免中断时留下半个文件"""
+    directory = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".rewrite-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def rewrite_templates(roots=None, extensions=REWRITE_EXTENSIONS, workers=None, dry_run=False):
+    """
+    单次遍历目录树，把各插件中的 <%key%> 字面量改写为 LanguageKeys 常量
+
+    只支持 Kotlin 源码（REWRITE_EXTENSIONS），传入其他扩展名时抛出 ValueError。
+    返回每个被处理文件的结果列表（只包含有替换、跳过或错误的文件）
+    """
+    unsupported = [ext for ext in extensions if ext not in REWRITE_EXTENSIONS]
+    if unsupported:
+        raise ValueError(f"--rewrite 只支持 Kotlin 源码 ({' '.join(REWRITE_EXTENSIONS)})，不支持: {' '.join(unsupported)}")
+    if roots is None:
+        roots = [REPO_ROOT / root for root in DEFAULT_ROOTS]
+    files = sorted(iter_source_files([Path(root) for root in roots], tuple(extensions)))
+
+    # 同一次遍历中找出 LanguageKeys.kt 并建立 插件根目录 → 映射
+    mappings = {}
+    for file_path in files:
+        if os.path.basename(file_path) == LANGUAGE_KEYS_FILE:
+            root = plugin_root_of(file_path)
+            if root is not None and root not in mappings:
+                mappings[root] = parse_language_keys(file_path)
+
+    jobs = []
+    for file_path in files:
+        if os.path.basename(file_path) == LANGUAGE_KEYS_FILE:
+            continue
+        mapping = mappings.get(plugin_root_of(file_path))
+        if mapping is not None:
+            jobs.append((file_path, mapping))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda job: rewrite_file(job[0], job[1][0], job[1][1], dry_run), jobs
+        ))
+
+    return [r for r in results if r['replaced'] or r['skipped'] or r['error']]
+
+
+def print_rewrite_report(results, dry_run):
+    """打印改写结果；dry-run 时输出统一 diff"""
+    total_replaced = 0
+    for result in results:
+        if result['error']:
+            print(f"[XX] {result['file']}: {result['error']}", file=sys.stderr)
+            continue
+        if dry_run and result['diff']:
+            sys.stdout.write(result['diff'])
+        elif result['replaced']:
+            print(f"[OK] {result['file']}: 替换 {result['replaced']} 处")
+        for skipped in result['skipped']:
+            print(
+                f"[!!] {result['file']}:{skipped['line']}:{skipped['column']} "
+                f"<%{skipped['key']}%> 未改写: {skipped['reason']}",
+                file=sys.stderr,
+            )
+        total_replaced += result['replaced']
+
+    action = "可替换" if dry_run else "已替换"
+    changed = sum(1 for r in results if r['replaced'])
+    print(f"{action} {total_replaced} 处模板字面量，涉及 {changed} 个文件", file=sys.stderr)
+
+
 def main():
     """主函数"""
-    print("开始搜索modules目录中.kt文件的模板模式...")
-    print("模板模式: <%([a-zA-Z0-9_.]+)%>")
-    print()
+    parser = argparse.ArgumentParser(description="搜索源码中的 <%key%> 模板及其他占位符模式")
+    parser.add_argument(
+        'roots', nargs='*',
+        help=f"要搜索的目录，默认为仓库中的 {', '.join(DEFAULT_ROOTS)}"
+    )
+    parser.add_argument(
+        '--ext', nargs='+',
+        help=f"要搜索的文件扩展名(默认 {' '.join(DEFAULT_EXTENSIONS)}，--rewrite 时默认且只能为 {' '.join(REWRITE_EXTENSIONS)})"
+    )
+    parser.add_argument(
+        '--patterns', nargs='+', default=DEFAULT_PATTERN_NAMES,
+        help=f"要搜索的内置模式: {', '.join(BUILTIN_PATTERNS)} 或 all (默认 template)"
+    )
+    parser.add_argument(
+        '--pattern', action='append', metavar='NAME=REGEX',
+        help="追加自定义命名模式，第一个捕获组作为 key，可重复指定"
+    )
+    parser.add_argument('--locations', action='store_true', help="输出每个匹配的行号和列号")
+    parser.add_argument(
+        '--rewrite', action='store_true',
+        help="将 <%%key%%> 字面量改写为插件 LanguageKeys 常量并补充 import"
+    )
+    parser.add_argument('--dry-run', action='store_true', help="配合 --rewrite，只输出统一 diff 不修改文件")
+    parser.add_argument('--workers', type=int, help="并行工作线程/进程数，默认由系统决定")
+    parser.add_argument('--processes', action='store_true', help="使用进程池代替线程池")
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument('--json', action='store_true', help="以 JSON 格式输出结果")
+    output_group.add_argument('--count-only', action='store_true', help="只输出统计数量")
+    args = parser.parse_args()
+
+    try:
+        patterns = parse_pattern_options(args.patterns, args.pattern)
+        PatternSet(patterns)
+    except (ValueError, re.error) as e:
+        print(f"错误: {e}")
+        return 2
+
+    default_extensions = REWRITE_EXTENSIONS if args.rewrite else DEFAULT_EXTENSIONS
+    extensions = [ext if ext.startswith('.') else f'.{ext}' for ext in args.ext or default_extensions]
+    roots = args.roots or None
+
+    if args.dry_run and not args.rewrite:
+        parser.error("--dry-run 只能与 --rewrite 一起使用")
+    if args.rewrite:
+        try:
+            results = rewrite_templates(roots, extensions, args.workers, args.dry_run)
+        except ValueError as e:
+            print(f"错误: {e}")
+            return 2
+        print_rewrite_report(results, args.dry_run)
+        return 1 if any(r['error'] for r in results) else 0
+
+    if not args.json and not args.count_only:
+        print("开始搜索源码文件中的模板模式...")
+        for name, (regex, _) in patterns.items():
+            print(f"模式 {name}: {regex.decode('utf-8')}")
+        print()
+
+    total_files, found_files, errors = search_templates_in_kt_files(
+        roots, extensions, args.workers, args.processes, patterns
+    )
+
+    if args.json:
+        summary = summarize(found_files)
+        json.dump({
+            'total_files': total_files,
+            'files': found_files,
+            'patterns': {
+                name: {'files': files, 'total_count': total, 'unique_keys': sorted(keys)}
+                for name, (files, total, keys) in summary.items()
+            },
+            'errors': errors,
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.count_only:
+        summary = summarize(found_files)
+        total_matches = sum(total for _, total, _ in summary.values())
+        print(f"{total_files} {len(found_files)} {total_matches}")
+        if len(patterns) > 1:
+            for name, (files, total, _) in summary.items():
+                print(f"{name} {files} {total}")
+    else:
+        print_report(total_files, found_files, errors, args.locations)
+
+    return 1 if errors else 0
 
-    search_templates_in_kt_files()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
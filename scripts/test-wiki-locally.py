@@ -2,42 +2,35 @@
 """
 本地测试 Wiki 文档生成
 用于在提交前验证 Wiki 文档的生成和链接
+
+构建在进程内完成并输出到内存（MemorySink），不需要从仓库根目录运行，
+也不会读写 wiki/ 目录。
 """
 
-import os
+import importlib.util
 import sys
-import subprocess
 from pathlib import Path
 
+# 仓库根目录（脚本位于 scripts/ 下），测试不依赖当前工作目录
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PREPARE_SCRIPT = REPO_ROOT / "scripts" / "prepare-wiki-multi.py"
+DOCS_DIR = REPO_ROOT / "docs"
+MODULES_DIR = REPO_ROOT / "modules"
+BUILD_SRC_DIR = REPO_ROOT / "buildSrc"
 
-def run_command(cmd, cwd=None):
-    """运行命令并返回结果"""
-    try:
-        # 设置环境变量
-        env = os.environ.copy()
-        env["PYTHONIOENCODING"] = "utf-8"
-
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            check=True,
-            env=env,
-            encoding="utf-8",
-            errors="ignore",
-        )
-        return result.stdout.strip() if result.stdout else ""
-    except subprocess.CalledProcessError as e:
-        print(f"❌ 命令执行失败: {cmd}")
-        stderr_text = e.stderr if e.stderr else "未知错误"
-        print(f"错误: {stderr_text}")
-        return None
-    except Exception as e:
-        print(f"❌ 执行异常: {cmd}")
-        print(f"异常: {str(e)}")
-        return None
+
+def load_prepare_module():
+    """加载 Wiki 准备脚本（文件名含连字符，不能直接 import）"""
+    spec = importlib.util.spec_from_file_location("prepare_wiki_multi", PREPARE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_wiki_in_memory():
+    """在进程内构建完整 Wiki（输出到内存，不读写 wiki/ 目录）"""
+    prepare = load_prepare_module()
+    return prepare.prepare_wiki_docs(DOCS_DIR, prepare.MemorySink(), kotlin_roots=(MODULES_DIR, BUILD_SRC_DIR))
 
 
 def test_wiki_generation():
@@ -46,27 +39,27 @@ def test_wiki_generation():
     print("🧪 开始本地测试 Wiki 文档生成...")
 
     # 检查必要文件
-    required_files = ["scripts/prepare-wiki-multi.py", "docs/gui/README.md"]
+    required_files = [PREPARE_SCRIPT, DOCS_DIR / "gui" / "README.md"]
 
     for file in required_files:
-        if not Path(file).exists():
-            print(f"❌ 缺少必要文件: {file}")
+        if not file.exists():
+            print(f"❌ 缺少必要文件: {file.relative_to(REPO_ROOT)}")
             return False
 
-    # 运行 Wiki 准备脚本
-    print("\n📝 运行 Wiki 准备脚本...")
-    result = run_command("python scripts/prepare-wiki-multi.py")
-
-    if result is None:
-        print("❌ Wiki 准备脚本执行失败")
+    # 在进程内运行 Wiki 构建
+    print("\n📝 运行 Wiki 构建...")
+    try:
+        result = build_wiki_in_memory()
+    except Exception as e:
+        print(f"❌ Wiki 构建异常: {e}")
         return False
 
-    # 检查生成的文件
-    wiki_dir = Path("wiki")
-    if not wiki_dir.exists():
-        print("❌ Wiki 目录未生成")
+    if not result.success:
+        print("❌ Wiki 构建失败")
         return False
 
+    pages = result.pages
+
     expected_files = [
         "Home.md",
         "_Sidebar.md",
@@ -79,8 +72,7 @@ def test_wiki_generation():
     print("\n📋 检查生成的文件...")
     missing_files = []
     for file in expected_files:
-        file_path = wiki_dir / file
-        if file_path.exists():
+        if file in pages:
             print(f"✅ {file}")
         else:
             print(f"❌ {file}")
@@ -92,9 +84,7 @@ def test_wiki_generation():
 
     # 检查文件内容
     print("\n🔍 检查文件内容...")
-    home_file = wiki_dir / "Home.md"
-    with open(home_file, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = pages["Home.md"]
 
     # 检查是否包含预期的链接格式
     if "[GUI模块](GUI模块)" in content or "GUI模块-快速开始" in content:
@@ -104,10 +94,14 @@ def test_wiki_generation():
         return False
 
     # 统计生成的文件
-    md_files = list(wiki_dir.glob("*.md"))
     print(f"\n📊 生成统计:")
-    print(f"  - 总文件数: {len(md_files)}")
-    print(f"  - 总大小: {sum(f.stat().st_size for f in md_files) / 1024:.1f} KB")
+    print(f"  - 总文件数: {len(pages)}")
+    print(f"  - 总大小: {sum(len(c.encode('utf-8')) for c in pages.values()) / 1024:.1f} KB")
+    print(f"  - 无效链接: {len(result.broken_links)}，无效锚点: {len(result.broken_anchors)}")
+    stale_count = sum(len(references) for references in result.stale_symbols.values())
+    print(f"  - 过期 API 引用: {stale_count}（{len(result.stale_symbols)} 个页面）")
+    for warning in result.warnings:
+        print(f"  - 警告: {warning}")
 
     print("\n✅ 本地测试通过!")
     return True
@@ -116,19 +110,17 @@ def test_wiki_generation():
 def preview_wiki():
     """预览 Wiki 文档"""
 
-    wiki_dir = Path("wiki")
-    if not wiki_dir.exists():
-        print("❌ Wiki 目录不存在，请先运行测试")
+    result = build_wiki_in_memory()
+    if not result.success:
+        print("❌ Wiki 构建失败")
         return
 
     print("📖 Wiki 文档预览:")
     print("=" * 50)
 
     # 显示 Home.md 的前几行
-    home_file = wiki_dir / "Home.md"
-    if home_file.exists():
-        with open(home_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+    if "Home.md" in result.pages:
+        lines = result.pages["Home.md"].splitlines()
 
         print("🏠 Home.md 预览:")
         for i, line in enumerate(lines[:15]):
@@ -138,18 +130,21 @@ def preview_wiki():
             print(f"  ... (还有 {len(lines) - 15} 行)")
 
     print("\n📁 所有文件:")
-    for file in sorted(wiki_dir.glob("*.md")):
-        size = file.stat().st_size
-        print(f"  - {file.name:<25} ({size:>6} bytes)")
+    for name in sorted(result.pages):
+        size = len(result.pages[name].encode("utf-8"))
+        print(f"  - {name:<25} ({size:>6} bytes)")
 
 
 def clean_wiki():
     """清理生成的 Wiki 文件"""
 
-    wiki_dir = Path("wiki")
-    if wiki_dir.exists():
-        import shutil
+    import shutil
 
+    wiki_dir = REPO_ROOT / "wiki"
+    manifest = REPO_ROOT / "build" / "wiki-manifest.json"
+    if manifest.exists():
+        manifest.unlink()
+    if wiki_dir.exists():
         shutil.rmtree(wiki_dir)
         print("🧹 已清理 Wiki 目录")
     else: